@@ -0,0 +1,20 @@
+"""
+Headless benchmarks for Wonderland's UI layout, hit-testing and draw paths.
+
+Importing this package swaps arcade for the recording stand-in from wonderland.headless, so the
+benchmarks run without a display or GPU. Run them with ``python -m benchmarks``. Input logs recorded
+with ``python -m wonderland --record session.wlin`` are replayed with ``--replay session.wlin``.
+``--startup`` launches the game headless in fresh interpreters and fails when it takes longer than
+``--startup-budget`` seconds to draw its first frame. ``--check`` runs the correctness checks of
+benchmarks.checks instead of timing anything, the only automated checks the repository has.
+
+"""
+
+from wonderland import headless
+
+recorder = headless.install()
+
+from wonderland.ui.faces import card_faces  # noqa: E402
+
+# Scenarios that measure the disk cache point it at a directory of their own
+card_faces.directory = None
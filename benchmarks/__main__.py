@@ -0,0 +1,124 @@
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from benchmarks import harness, scenarios  # noqa: F401 - registers the scenarios
+from benchmarks.checks import checks
+from benchmarks.replay import replay
+from benchmarks.startup import DEFAULT_BUDGET, startup
+
+DEFAULT_BASELINE: str = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run Wonderland's headless benchmarks.")
+    parser.add_argument("names", nargs="*", help="run only the scenarios containing one of these names")
+    parser.add_argument("--repeat", type=int, default=1, help="multiply each scenario's iterations")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON file with the results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run's results as the baseline")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed slowdown or memory growth over the baseline"
+    )
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    parser.add_argument(
+        "--replay",
+        action="append",
+        default=list(),
+        metavar="LOG",
+        help="replay an input log recorded with python -m wonderland --record, instead of the scenarios",
+    )
+    parser.add_argument("--realtime", action="store_true", help="replay logs at the pace they were recorded at")
+    parser.add_argument(
+        "--startup", action="store_true", help="time launching the game headless, instead of the scenarios"
+    )
+    parser.add_argument(
+        "--startup-budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        metavar="SECONDS",
+        help="fail when the median launch takes longer than this to draw its first frame",
+    )
+    parser.add_argument(
+        "--check", action="store_true", help="run the correctness checks the benchmarks rely on, instead of timing"
+    )
+    args = parser.parse_args(argv)
+
+    if args.check:
+        return run_checks(args.names)
+
+    # Replays and the startup check run instead of the scenarios, unless scenarios are named as well
+    scenarios_wanted = bool(args.names) or not (args.replay or args.startup)
+    selected = [
+        benchmark
+        for name, benchmark in harness.scenarios.items()
+        if scenarios_wanted and (not args.names or any(pattern in name for pattern in args.names))
+    ]
+    if args.list:
+        for benchmark in selected:
+            print("{:<28} {}".format(benchmark.name, benchmark.description))
+        return 0
+
+    baseline = harness.load_baseline(args.baseline) or dict()
+    results = list()
+    regressions = list()
+    over_budget = False
+    print(
+        "{:<28} {:>12} {:>10} {:>10} {:>10} {:>12}".format(
+            "scenario", "ops/s", "p50 ms", "p95 ms", "p99 ms", "peak KiB"
+        )
+    )
+
+    def report(result: harness.Result) -> None:
+        results.append(result)
+        print(
+            "{:<28} {:>12.1f} {:>10.3f} {:>10.3f} {:>10.3f} {:>12.1f}".format(
+                result.name, result.throughput, result.p50_ms, result.p95_ms, result.p99_ms, result.peak_kib
+            )
+        )
+        if result.name in baseline:
+            regressions.extend(harness.compare(result, baseline[result.name], args.tolerance))
+
+    for benchmark in selected:
+        report(harness.run(benchmark, repeat=args.repeat))
+    for path in args.replay:
+        for result in replay(path, realtime=args.realtime):
+            report(result)
+    if args.startup:
+        for result in startup(runs=5 * args.repeat):
+            report(result)
+            if result.name == "startup:first_frame" and result.p50_ms > args.startup_budget * 1000:
+                over_budget = True
+
+    if args.save_baseline:
+        harness.save_baseline(args.baseline, results)
+        print("Saved baseline to {}".format(args.baseline))
+    elif not baseline:
+        print("No baseline at {}, run with --save-baseline to create one".format(args.baseline))
+    if over_budget:
+        print("\nThe first frame took longer than the budget of {:.0f} ms".format(args.startup_budget * 1000))
+    if regressions:
+        print("\nRegressions over the baseline:")
+        for regression in regressions:
+            print("  " + regression)
+    return 1 if regressions or over_budget else 0
+
+
+def run_checks(names: List[str]) -> int:
+    """Run the checks containing one of the names, or all of them, and return 1 if any of them failed."""
+    failed = 0
+    for check in checks.values():
+        if names and not any(pattern in check.name for pattern in names):
+            continue
+        try:
+            check.run()
+        except AssertionError as error:
+            failed += 1
+            print("{:<28} FAILED: {}".format(check.name, error))
+        else:
+            print("{:<28} ok".format(check.name))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import os
+import statistics
+import tempfile
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Sequence
+
+from benchmarks.startup import DEFAULT_BUDGET, measure_startup
+from wonderland.model import CardRecord, EntityStore, EntityType, SaveFile, save
+
+# Runs the check, raises AssertionError saying what is wrong when it fails
+Check = Callable[[], None]
+
+
+class CheckInfo(NamedTuple):
+    name: str
+    description: str
+    run: Check
+
+
+checks: "OrderedDict[str, CheckInfo]" = OrderedDict()
+
+
+def check(name: str, description: str) -> Callable[[Check], Check]:
+    """Register a check, run with python -m benchmarks --check, under the given name."""
+
+    def register(run: Check) -> Check:
+        checks[name] = CheckInfo(name, description, run)
+        return run
+
+    return register
+
+
+def verify_save(path: str, world: EntityStore, deck: Sequence[CardRecord]) -> None:
+    """Raise AssertionError naming the first record the save file at path doesn't load back as saved."""
+    expected = list(world)
+    with SaveFile(path) as save_file:
+        loaded = list(save_file.load_world())
+        if len(loaded) != len(expected):
+            raise AssertionError("Saved {} entities, loaded {}".format(len(expected), len(loaded)))
+        for record, loaded_record in zip(expected, loaded):
+            if loaded_record != record:
+                raise AssertionError("Saved {!r}, loaded {!r}".format(record, loaded_record))
+            if save_file.find_entity(record.id) != record:
+                raise AssertionError("Looking up entity {} doesn't find {!r}".format(record.id, record))
+        cards = list(save_file.cards())
+        if cards != list(deck):
+            raise AssertionError("Saved the deck {!r}, loaded {!r}".format(list(deck), cards))
+
+
+@check("save_round_trip", "Saving a world and a deck and loading them back gives the same records")
+def save_round_trip() -> None:
+    world = EntityStore()
+    places = [
+        world.add(EntityType.PLACE, "Tea Party"),
+        world.add(EntityType.PLACE, "Château de la Reine", tags=["royal", "croquet ground"]),
+    ]
+    characters: List[CardRecord] = list()
+    for i in range(3 * 4096):
+        record = world.add(
+            EntityType.CHARACTER if i % 3 == 0 else EntityType.THING,
+            "Entity {} ✂".format(i),
+            archetype="A Critter" if i % 3 == 0 else "",
+            tags=["tag{}".format(j) for j in range(i % 4)],
+            location=places[i % 2].id if i % 5 else None,
+        )
+        if record.type is EntityType.CHARACTER:
+            characters.append(CardRecord(record.type, record.name, record.archetype, record.id))
+    # Gaps in the ids have to survive the binary search of find_entity
+    for record in world.of_type(EntityType.THING)[::7]:
+        world.remove(record.id)
+    deck = characters[:60] + [CardRecord(EntityType.PLACE, "Anywhere", "")]
+    with tempfile.TemporaryDirectory(prefix="wonderland-check-") as directory:
+        path = os.path.join(directory, "world.wonderland")
+        save(path, world, deck)
+        verify_save(path, world, deck)
+        # Saving over an existing file replaces it
+        removed = world.of_type(EntityType.THING)[-1]
+        world.remove(removed.id)
+        save(path, world, deck[:1])
+        verify_save(path, world, deck[:1])
+        with SaveFile(path) as save_file:
+            if save_file.find_entity(removed.id) is not None:
+                raise AssertionError("A removed entity is still found in the save file")
+
+
+@check("startup_budget", "The median of 3 headless launches draws its first frame within startup.DEFAULT_BUDGET")
+def startup_budget() -> None:
+    reports = [measure_startup() for _ in range(3)]
+    if any(report["first_screen"] is None for report in reports):
+        raise AssertionError("A launch didn't show its first screen")
+    first_frame = statistics.median(report["first_frame"] for report in reports)
+    if first_frame > DEFAULT_BUDGET:
+        raise AssertionError(
+            "The first frame took {:.0f} ms, over the budget of {:.0f} ms".format(
+                first_frame * 1000, DEFAULT_BUDGET * 1000
+            )
+        )
@@ -0,0 +1,118 @@
+import json
+import os
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Build the scenario's state and return the step that gets timed
+Setup = Callable[[], Callable[[], None]]
+
+# Metrics where a higher number is worse, compared against the baseline
+COMPARED_METRICS = ("p50_ms", "p95_ms", "peak_kib")
+
+
+class Scenario(NamedTuple):
+    name: str
+    description: str
+    setup: Setup
+    iterations: int
+    # How many operations one step performs, e.g. the mouse events of a hover sweep
+    operations: int
+
+
+class Result(NamedTuple):
+    name: str
+    iterations: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_kib: float
+
+    def as_dict(self) -> Dict[str, float]:
+        return {metric: getattr(self, metric) for metric in self._fields if metric != "name"}
+
+
+scenarios: "OrderedDict[str, Scenario]" = OrderedDict()
+
+
+def scenario(name: str, description: str, iterations: int = 50, operations: int = 1) -> Callable[[Setup], Setup]:
+    """Register a scenario setup function under the given name."""
+
+    def register(setup: Setup) -> Setup:
+        scenarios[name] = Scenario(name, description, setup, iterations, operations)
+        return setup
+
+    return register
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+def run(benchmark: Scenario, repeat: int = 1, warmup: int = 3) -> Result:
+    """
+    Time the scenario's step and measure the memory it allocates at its peak.
+
+    Setup and warm-up runs are not timed. The allocation peak is taken from a separate run, so that
+    tracemalloc's overhead doesn't end up in the timings.
+
+    """
+    step = benchmark.setup()
+    for _ in range(warmup):
+        step()
+    timings: List[float] = list()
+    for _ in range(benchmark.iterations * repeat):
+        start = time.perf_counter()
+        step()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        step()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return summarize(benchmark.name, timings, benchmark.operations, peak / 1024)
+
+
+def summarize(name: str, timings: List[float], operations: int = 1, peak_kib: float = 0.0) -> Result:
+    """Turn the timings of steps into a Result."""
+    return Result(
+        name=name,
+        iterations=len(timings),
+        throughput=len(timings) * operations / sum(timings),
+        p50_ms=percentile(timings, 50) * 1000,
+        p95_ms=percentile(timings, 95) * 1000,
+        p99_ms=percentile(timings, 99) * 1000,
+        peak_kib=peak_kib,
+    )
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Dict[str, float]]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(path: str, results: List[Result]) -> None:
+    baseline = load_baseline(path) or dict()
+    baseline.update({result.name: result.as_dict() for result in results})
+    with open(path, "w") as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+
+
+def compare(result: Result, baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Describe every metric that got worse than the baseline by more than the tolerance."""
+    regressions = list()
+    for metric in COMPARED_METRICS:
+        reference = baseline.get(metric)
+        if reference and getattr(result, metric) > reference * (1 + tolerance):
+            regressions.append(
+                "{}: {} {:.3f} -> {:.3f} ({:+.0%})".format(
+                    result.name, metric, reference, getattr(result, metric), getattr(result, metric) / reference - 1
+                )
+            )
+    return regressions
@@ -0,0 +1,36 @@
+import os
+import tempfile
+from typing import List
+
+from benchmarks.harness import Result, summarize
+from wonderland.game import Wonderland
+from wonderland.recording import InputReplayer, read_recording
+
+
+def replay(path: str, realtime: bool = False) -> List[Result]:
+    """Play an input log back headless and sum up the timings of its frames and of each type of event."""
+    recording = read_recording(path)
+    game = Wonderland(recording.width, recording.height, seed=recording.seed)
+    # Leaving the card creator saves its card, which must not replace the one of the player
+    directory = tempfile.mkdtemp(prefix="wonderland-replay-")
+    screens = game.screen_manager
+    screens["card_creator"].save_path = os.path.join(directory, "save.wlnd")  # type: ignore
+    game.setup()
+    # The game sets itself up in the first update after it drew the loading screen
+    game.on_draw()
+    game.simulate(0.0, [])
+    for name in screens.names:
+        screens.assets.wait(screens.assets.request(screens[name].assets))
+    timings = InputReplayer(recording, realtime).replay(game)
+    game.close()
+    if not timings.frames:
+        return []
+    name = "replay:" + os.path.splitext(os.path.basename(path))[0]
+    results = [
+        summarize(name + ":frame", timings.frames),
+        summarize(name + ":update", timings.updates),
+        summarize(name + ":draw", timings.draws),
+    ]
+    for event_type, event_timings in timings.events.items():
+        results.append(summarize("{}:{}".format(name, event_type.name.lower()), event_timings))
+    return results
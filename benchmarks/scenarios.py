@@ -0,0 +1,414 @@
+import json
+import os
+import random
+import tempfile
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import arcade
+
+from benchmarks.checks import verify_save
+from benchmarks.harness import scenario
+from wonderland.assets import AssetPipeline, scan_resources
+from wonderland.input import InputEventType, InputQueue
+from wonderland.model import CardRecord, EntityRecord, EntityStore, EntityType, SaveFile, save
+from wonderland.screens.scene import Scene
+from wonderland.ui import ButtonChooser, Card, CardRow, CardType, UIContainer, Word, WordCloud, animator
+from wonderland.ui import Snapshot, SnapshotRenderer
+from wonderland.ui.snapshots import DrawState
+from wonderland.ui.faces import card_faces
+
+WINDOW_SIZE: Tuple[int, int] = (1248, 702)
+CARD_TYPES: List[CardType] = list(CardType)
+
+
+class Group(UIContainer):
+    """
+    Plain container for building deep UI trees.
+
+    """
+
+
+def _cards(count: int) -> List[Card]:
+    return [Card(CARD_TYPES[i % len(CARD_TYPES)], "Card {}".format(i), "Subtitle") for i in range(count)]
+
+
+def _card_row(count: int, width: float = 724) -> CardRow:
+    return CardRow(WINDOW_SIZE[0] / 2, WINDOW_SIZE[1] * 0.2, width, cards=_cards(count))
+
+
+def _word_cloud(count: int) -> WordCloud:
+    width, height = WINDOW_SIZE
+    words = [Word("word{}".format(i % 997)) for i in range(count)]
+    return WordCloud(width / 2, height * 0.8, width * 0.6, height * 0.2, words=words, seed=0)
+
+
+def _sweep(points: List[Tuple[float, float]], handler: Callable[[float, float], None]) -> Callable[[], None]:
+    def step() -> None:
+        for x, y in points:
+            handler(x, y)
+
+    return step
+
+
+def _scene(cacheable: bool) -> Scene:
+    arcade.Window(*WINDOW_SIZE)
+    scene = Scene()
+    scene.cacheable = cacheable
+    scene.setup(*WINDOW_SIZE)
+    return scene
+
+
+def _player_hand(scene: Scene) -> CardRow:
+    if scene.player_hand is None:
+        raise RuntimeError("The scene has no player hand once it is set up")
+    return scene.player_hand
+
+
+@scenario("card_row_arrange_500", "CardRow._arrange_cards over 500 cards")
+def card_row_arrange() -> Callable[[], None]:
+    return _card_row(500)._arrange_cards
+
+
+@scenario("card_row_refill_500", "Emptying a CardRow and filling it with 500 cards again", iterations=20)
+def card_row_refill() -> Callable[[], None]:
+    row = _card_row(0)
+    cards = _cards(500)
+
+    def step() -> None:
+        row.clear()
+        row.extend(cards)
+
+    return step
+
+
+@scenario("word_cloud_arrange_10k", "WordCloud._arrange_words over 10,000 words", iterations=20)
+def word_cloud_arrange() -> Callable[[], None]:
+    return _word_cloud(10_000)._arrange_words
+
+
+@scenario("word_cloud_append_1k", "Filling a WordCloud one word at a time", iterations=5, operations=1000)
+def word_cloud_append() -> Callable[[], None]:
+    width, height = WINDOW_SIZE
+    words = [Word("word{}".format(i % 997)) for i in range(1000)]
+
+    def step() -> None:
+        cloud = WordCloud(width / 2, height * 0.8, width * 0.6, height * 0.2, seed=0)
+        for word in words:
+            cloud.append(word)
+
+    return step
+
+
+@scenario("asset_pipeline_manifest", "Decoding every image of the game on worker threads", iterations=10)
+def asset_pipeline_manifest() -> Callable[[], None]:
+    manifest = scan_resources()
+
+    def step() -> None:
+        # The fake upload skips the texture cache, so every run decodes the images again
+        pipeline = AssetPipeline(upload=lambda path, variants: variants[1.0].size)
+        pipeline.wait(pipeline.request(manifest))
+        pipeline.shutdown()
+
+    return step
+
+
+def _world(count: int) -> EntityStore:
+    random.seed(0)
+    world = EntityStore()
+    places = [
+        world.add(EntityType.PLACE, "Place {}".format(i), tags=["region{}".format(i % 10)]) for i in range(count // 10)
+    ]
+    for i in range(count - len(places)):
+        world.add(
+            EntityType.THING if i % 3 else EntityType.CHARACTER,
+            "Entity {}".format(i),
+            archetype="" if i % 3 else "A Critter",
+            tags=["tag{}".format(i % 50)],
+            location=random.choice(places).id,
+        )
+    return world
+
+
+def _save_files(count: int) -> Tuple[str, str]:
+    """Save a world and a deck in the binary format and as JSON, and check that both load back unchanged."""
+    world = _world(count)
+    deck = [
+        CardRecord(record.type, record.name, record.archetype, record.id)
+        for record in world.of_type(EntityType.CHARACTER)
+    ]
+    directory = tempfile.mkdtemp(prefix="wonderland-benchmark-")
+    binary_path = os.path.join(directory, "world.wonderland")
+    json_path = os.path.join(directory, "world.json")
+    save(binary_path, world, deck)
+    with open(json_path, "w") as file:
+        json.dump(
+            {
+                "entities": [dict(record._asdict(), type=record.type.value) for record in world],
+                "deck": [dict(card._asdict(), type=card.type.value) for card in deck],
+            },
+            file,
+        )
+    verify_save(binary_path, world, deck)
+    if list(_load_json(json_path)) != list(world):
+        raise AssertionError("The JSON file doesn't load back what was saved")
+    return binary_path, json_path
+
+
+def _load_json(path: str) -> EntityStore:
+    with open(path) as file:
+        data = json.load(file)
+    world = EntityStore()
+    world.load(
+        EntityRecord(**dict(record, type=EntityType(record["type"]), tags=tuple(record["tags"])))
+        for record in data["entities"]
+    )
+    return world
+
+
+def _refresh_faces(cards: List[Card], directory: Optional[str]) -> Callable[[], None]:
+    def step() -> None:
+        card_faces.clear()
+        card_faces.directory = directory
+        try:
+            for card in cards:
+                card._invalidate_face()
+                card.update_face()
+        finally:
+            card_faces.directory = None
+
+    return step
+
+
+@scenario("card_faces_compose_20", "Composing the faces of 20 cards", iterations=10, operations=20)
+def card_faces_compose() -> Callable[[], None]:
+    return _refresh_faces(_cards(20), None)
+
+
+@scenario("card_faces_from_disk_20", "Reading 20 card faces back from the disk cache", iterations=10, operations=20)
+def card_faces_from_disk() -> Callable[[], None]:
+    cards = _cards(20)
+    step = _refresh_faces(cards, tempfile.mkdtemp(prefix="wonderland-benchmark-"))
+    # Fills the disk cache
+    step()
+    return step
+
+
+@scenario("entity_store_queries_10k", "Index lookups in a world of 10,000 entities", operations=300)
+def entity_store_queries() -> Callable[[], None]:
+    world = _world(10_000)
+    places = world.of_type(EntityType.PLACE)
+    place_ids = [place.id for place in random.sample(places, 100)]
+
+    def step() -> None:
+        for place_id in place_ids:
+            world.located_in(place_id)
+        for i in range(100):
+            world.with_tag("tag{}".format(i % 50))
+        for _ in range(100):
+            world.unique_archetypes_in_use()
+
+    return step
+
+
+@scenario("load_world_binary_10k", "Loading a saved world of 10,000 entities from the binary format", iterations=20)
+def load_world_binary() -> Callable[[], None]:
+    binary_path, _ = _save_files(10_000)
+
+    def step() -> None:
+        with SaveFile(binary_path) as save_file:
+            save_file.load_world()
+
+    return step
+
+
+@scenario("load_world_json_10k", "Loading the same world from JSON, as the baseline", iterations=20)
+def load_world_json() -> Callable[[], None]:
+    _, json_path = _save_files(10_000)
+
+    def step() -> None:
+        _load_json(json_path)
+
+    return step
+
+
+@scenario("open_deck_binary_10k", "Opening a save of 10,000 entities and reading one card and entity", operations=100)
+def open_deck_binary() -> Callable[[], None]:
+    binary_path, _ = _save_files(10_000)
+
+    def step() -> None:
+        for _ in range(100):
+            with SaveFile(binary_path) as save_file:
+                entity_id = save_file.card(save_file.card_count // 2).entity_id
+                if entity_id is not None:
+                    save_file.find_entity(entity_id)
+
+    return step
+
+
+@scenario("word_click_highlight_5k", "Clicking words that highlight some of 5,000 indexed cards", operations=100)
+def word_click_highlight() -> Callable[[], None]:
+    width, height = WINDOW_SIZE
+    # Mostly words matching a card or two, then every card, none and a partial match
+    texts = [str(i * 37) for i in range(97)] + ["card", "Card 42", "subt"]
+    words = [Word(text) for text in texts]
+    cloud = WordCloud(width / 2, height * 0.8, width * 0.6, height * 0.2, words=words, seed=0)
+    screen = Group()
+    screen.ui_elements.append(_card_row(5_000))
+    screen.ui_elements.append(cloud)
+    clicks = [(word.center_x, word.center_y) for word in words]
+
+    def step() -> None:
+        for x, y in clicks:
+            screen.on_mouse_press(x, y, arcade.MOUSE_BUTTON_LEFT)
+
+    return step
+
+
+@scenario("nested_hover_depth_6", "on_mouse_motion through 6 levels of UIContainers, 4 children each", operations=100)
+def nested_hover() -> Callable[[], None]:
+    random.seed(0)
+    width, height = WINDOW_SIZE
+
+    def build(depth: int) -> UIContainer:
+        group = Group()
+        for _ in range(4):
+            if depth > 1:
+                group.ui_elements.append(build(depth - 1))
+            else:
+                group.ui_elements.append(Word("leaf", random.random() * width, random.random() * height))
+        return group
+
+    root = build(6)
+    points = [(random.random() * width, random.random() * height) for _ in range(100)]
+    return _sweep(points, root.on_mouse_motion)
+
+
+@scenario("card_row_hover_sweep_500", "Mouse sweeping across a 500-card CardRow", operations=200)
+def card_row_hover_sweep() -> Callable[[], None]:
+    row = _card_row(500, width=WINDOW_SIZE[0] * 0.9)
+    left = WINDOW_SIZE[0] * 0.05
+    points = [(left + WINDOW_SIZE[0] * 0.9 * i / 100, row.center_y) for i in range(100)]
+    return _sweep(points + points[::-1], row.on_mouse_motion)
+
+
+@scenario("word_cloud_hover_sweep_10k", "Mouse sweeping across a 10,000-word WordCloud", operations=200)
+def word_cloud_hover_sweep() -> Callable[[], None]:
+    cloud = _word_cloud(10_000)
+    left = cloud.center_x - cloud.width / 2
+    points = [(left + cloud.width * i / 100, cloud.center_y) for i in range(100)]
+    return _sweep(points + points[::-1], cloud.on_mouse_motion)
+
+
+@scenario("button_menu_hover_24", "Mouse sweeping over a 24-button ButtonChooser, drawn after every motion")
+def button_menu_hover() -> Callable[[], None]:
+    width = WINDOW_SIZE[0] * 0.9
+    chooser = ButtonChooser({"Option {}".format(i): i for i in range(24)}, WINDOW_SIZE[0] / 2, 100, width)
+    left = WINDOW_SIZE[0] * 0.05
+    points = [(left + width * i / 100, 100) for i in range(101)]
+    position = 0
+
+    def step() -> None:
+        nonlocal position
+        chooser.on_mouse_motion(*points[position % len(points)])
+        chooser.draw()
+        position += 1
+
+    return step
+
+
+@scenario("animate_500_cards", "One frame of scale and position tweens running on 500 cards")
+def animate_cards() -> Callable[[], None]:
+    row = _card_row(500)
+    animator.clear()
+
+    def step() -> None:
+        if not len(animator):
+            for card in row._cards:
+                if card.scale == 1.0:
+                    row._card_on_hover(card)
+                else:
+                    row._card_on_hover_end(card)
+        animator.update(1 / 60)
+
+    return step
+
+
+@scenario("scene_draw", "Full redraw of the Scene screen every frame")
+def scene_draw() -> Callable[[], None]:
+    return _scene(cacheable=False).draw
+
+
+@scenario("scene_draw_cached_hover", "Scene drawn through its cached layer while the mouse hovers the cards")
+def scene_draw_cached_hover() -> Callable[[], None]:
+    scene = _scene(cacheable=True)
+    hand = _player_hand(scene)
+    points: Iterator[Tuple[float, float]] = iter([])
+
+    def step() -> None:
+        nonlocal points
+        point = next(points, None)
+        if point is None:
+            left = hand.center_x - hand.width / 2
+            points = iter([(left + hand.width * i / 20, hand.center_y) for i in range(21)])
+            point = next(points)
+        scene.on_mouse_motion(*point)
+        animator.update(1 / 60)
+        scene.draw()
+
+    return step
+
+
+@scenario("scene_motion_burst", "Frames of 30 mouse motions and a click over the Scene, through an InputQueue")
+def scene_motion_burst() -> Callable[[], None]:
+    scene = _scene(cacheable=True)
+    hand = _player_hand(scene)
+    left = hand.center_x - hand.width / 2
+    points = [(left + hand.width * i / 90, hand.center_y) for i in range(91)]
+    queue = InputQueue()
+    frames: Iterator[List[Tuple[float, float]]] = iter([])
+
+    def step() -> None:
+        nonlocal frames
+        frame = next(frames, None)
+        if frame is None:
+            frames = iter([points[i : i + 30] for i in range(0, 90, 30)])
+            frame = next(frames)
+        for x, y in frame:
+            queue.mouse_motion(x, y)
+        queue.mouse_press(x, y, arcade.MOUSE_BUTTON_LEFT)
+        for event in queue.drain():
+            if event.type is InputEventType.MOUSE_MOTION:
+                scene.on_mouse_motion(event.x, event.y)
+            else:
+                scene.on_mouse_press(event.x, event.y, event.button)
+        animator.update(1 / 60)
+        scene.draw()
+
+    return step
+
+
+@scenario("scene_snapshot", "Taking a snapshot of the Scene, as the simulation thread does after every tick")
+def scene_snapshot() -> Callable[[], None]:
+    scene = _scene(cacheable=False)
+    return lambda: scene.snapshot(list())
+
+
+@scenario("scene_snapshot_draw_hover", "Scene drawn from snapshots while the mouse hovers the cards")
+def scene_snapshot_draw_hover() -> Callable[[], None]:
+    scene = _scene(cacheable=False)
+    hand = _player_hand(scene)
+    left = hand.center_x - hand.width / 2
+    points = [(left + hand.width * i / 20, hand.center_y) for i in range(21)]
+    renderer = SnapshotRenderer()
+    tick = 0
+
+    def step() -> None:
+        nonlocal tick
+        scene.on_mouse_motion(*points[tick % len(points)])
+        animator.update(1 / 60)
+        items: List[DrawState] = list()
+        scene.snapshot(items)
+        tick += 1
+        renderer.draw(Snapshot(tick, tuple(items)))
+
+    return step
@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+from benchmarks.harness import Result, summarize
+
+# Seconds the headless game may take from launch to drawing its first frame
+DEFAULT_BUDGET: float = 0.5
+
+# Launches the game headless the way python -m wonderland --profile-startup does, and draws frames at 60 fps
+# until the first screen shows. The report goes to the last line of the output, as JSON.
+_CHILD = """
+import json
+import sys
+import time
+
+from wonderland.startup import StartupProfile
+
+startup = StartupProfile()
+startup.install()
+
+from wonderland import headless
+
+headless.install()
+
+from wonderland.__main__ import parser, start
+
+game = start(parser.parse_args(["--profile-startup"]), startup)
+deadline = time.perf_counter() + float(sys.argv[1])
+while not startup.complete and time.perf_counter() < deadline:
+    game.update(1 / 60)
+    game.on_draw()
+    time.sleep(1 / 60)
+game.close()
+print(json.dumps(startup.report()))
+"""
+
+
+def measure_startup(timeout: float = 30.0) -> Dict[str, Any]:
+    """
+    Start the game headless in a fresh interpreter and return its StartupProfile report.
+
+    Every launch gets an empty home and cache directory of its own, so nothing an earlier launch saved,
+    like font metrics or card faces, makes it faster than a first start.
+
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory(prefix="wonderland-startup-") as home:
+        environment = dict(os.environ)
+        environment.update(
+            HOME=home,
+            XDG_CACHE_HOME=os.path.join(home, ".cache"),
+            PYTHONPATH=os.pathsep.join(filter(None, [root, environment.get("PYTHONPATH")])),
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", _CHILD, str(timeout)],
+            cwd=home,
+            env=environment,
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def startup(runs: int = 5) -> List[Result]:
+    """Launch the game runs times and sum up its time to the first frame, to the first screen and of each phase."""
+    reports = [measure_startup() for _ in range(runs)]
+    incomplete = sum(report["first_screen"] is None for report in reports)
+    if incomplete:
+        raise RuntimeError("{} of {} launches didn't show a screen in time".format(incomplete, runs))
+    results = [
+        summarize("startup:first_frame", [report["first_frame"] for report in reports]),
+        summarize("startup:first_screen", [report["first_screen"] for report in reports]),
+    ]
+    for phase in reports[0]["phases"]:
+        results.append(summarize("startup:" + phase, [report["phases"][phase] for report in reports]))
+    for screen in reports[0]["setup"]:
+        results.append(summarize("startup:setup:" + screen, [report["setup"][screen] for report in reports]))
+    return results
@@ -1,10 +1,88 @@
-import arcade
+import argparse
+import random
+import sys
+from typing import Any, List, Optional
 
-from wonderland.game import Wonderland
+# Only what parsing the arguments needs is imported up front, the game itself is imported by start()
+from wonderland.startup import StartupProfile
 
 SCREEN_WIDTH = 1248
 SCREEN_HEIGHT = 702
 
-game = Wonderland(SCREEN_WIDTH, SCREEN_HEIGHT)
-game.setup()
-arcade.run()
+parser = argparse.ArgumentParser(prog="python -m wonderland")
+parser.add_argument("--profile", action="store_true", help="time frames, draws and input handling")
+# Without one the profiler writes to its own default, profiling.DEFAULT_TRACE_FILE
+parser.add_argument("--trace-file", help="where to write the Chrome trace when profiling")
+parser.add_argument(
+    "--profile-startup",
+    action="store_true",
+    help="report the import time of each module, screen setup and time to first frame once a screen shows",
+)
+parser.add_argument(
+    "--threaded", action="store_true", help="run the game logic on a thread of its own, at a fixed tick rate"
+)
+parser.add_argument("--record", metavar="PATH", help="log the input of the session, to replay it as a benchmark")
+parser.add_argument("--seed", type=int, help="seed of the random layouts, picked at random when recording")
+
+
+def start(args: argparse.Namespace, startup: StartupProfile) -> Any:
+    """Create the window and set the game up to show its first frame, returns the Wonderland window."""
+    with startup.phase("imports"):
+        from wonderland.game import Wonderland
+        from wonderland.profiling import profiler
+
+    if args.profile:
+        profiler.enable(args.trace_file)
+    seed = args.seed
+    if seed is None and args.record:
+        # A replay lays the words out the same way only with the seed of the recording
+        seed = random.getrandbits(32)
+
+    with startup.phase("window"):
+        game = Wonderland(SCREEN_WIDTH, SCREEN_HEIGHT, threaded=args.threaded, seed=seed)
+    with startup.phase("setup"):
+        game.setup()
+    if args.record:
+        game.start_recording(args.record)
+    if args.profile_startup:
+        game.startup = startup
+    return game
+
+
+def finish(game: Any, args: argparse.Namespace) -> None:
+    """Shut the game down after its window was closed."""
+    from wonderland.assets import asset_pipeline
+    from wonderland.profiling import profiler
+    from wonderland.ui import font_metrics
+
+    game.simulation.stop()
+    game.stop_recording()
+    # Screens save their state when they are left, which closing the game does as well
+    if game.current_screen is not None:
+        game.current_screen.on_exit()
+    asset_pipeline.shutdown()
+    if font_metrics.changed:
+        font_metrics.save()
+
+    if profiler.enabled:
+        print("Wrote trace to", profiler.write_trace())
+    if args.record:
+        print("Recorded input to", args.record)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    startup = StartupProfile()
+    args = parser.parse_args(argv)
+    if args.profile_startup:
+        startup.install()
+    game = start(args, startup)
+
+    import arcade
+
+    arcade.run()
+    finish(game, args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import functools
+import os
+import queue
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import PIL.Image
+
+from wonderland.config import RESOURCE_PATH, TEXTURE_VARIANT_SCALES
+
+Decode = Callable[[str], Any]
+Upload = Callable[[str, Any], Any]
+
+IMAGE_EXTENSIONS: Tuple[str, ...] = (".png", ".jpg", ".jpeg")
+
+
+def scan_resources(root: str = RESOURCE_PATH, extensions: Tuple[str, ...] = IMAGE_EXTENSIONS) -> List[str]:
+    """Paths of all images below root, as the manifest of assets the game may need."""
+    return sorted(
+        os.path.join(directory, name)
+        for directory, _, names in os.walk(root)
+        for name in names
+        if name.lower().endswith(extensions)
+    )
+
+
+def decode_image(path: str) -> PIL.Image.Image:
+    """Read and fully decode an image into an RGBA pixel buffer."""
+    image = PIL.Image.open(path)
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    image.load()
+    return image
+
+
+def scale_image(image: PIL.Image.Image, scale: float, resample: int = PIL.Image.LANCZOS) -> PIL.Image.Image:
+    if scale == 1.0:
+        return image
+    return image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), resample=resample)
+
+
+def decode_variants(path: str, scales: Tuple[float, ...] = TEXTURE_VARIANT_SCALES) -> Dict[float, PIL.Image.Image]:
+    """
+    Decode an image and scale it down to each of the scales, each from the next larger one.
+
+    Box filtering each level from the one above, like a mipmap chain, is several times faster than
+    filtering every level from the full size image with Lanczos, and as good for halving.
+
+    """
+    image = decode_image(path)
+    variants = dict()
+    source, source_scale = image, 1.0
+    for scale in sorted(scales, reverse=True):
+        source = variants[scale] = scale_image(source, scale / source_scale, resample=PIL.Image.BOX)
+        source_scale = scale
+    return variants
+
+
+def upload_texture(path: str, variants: Dict[float, PIL.Image.Image]) -> Any:
+    """
+    Turn the decoded variants of an image into textures in the texture cache, where cards look them up.
+
+    This only wraps the pixels in arcade.Texture objects. arcade 2.1.3 has no per-texture GPU upload: a
+    SpriteList copies the images of its sprites into a texture atlas of its own the first time it is
+    drawn, so the GPU transfer happens then, on the thread that draws.
+
+    """
+    # Imported here, so that the pipeline can be used with a fake upload step without arcade
+    from wonderland.ui.textures import texture_cache
+
+    textures = {scale: texture_cache.add(path, image, scale) for scale, image in variants.items()}
+    return textures.get(1.0)
+
+
+class AssetGroup:
+    """
+    The assets requested together, for example the ones a screen needs.
+
+    """
+
+    def __init__(self, futures: Dict[str, "Future[Any]"]) -> None:
+        self.futures: Dict[str, "Future[Any]"] = futures
+
+    def __len__(self) -> int:
+        return len(self.futures)
+
+    @property
+    def progress(self) -> float:
+        """Share of the assets that are uploaded, from 0 to 1."""
+        if not self.futures:
+            return 1.0
+        return sum(future.done() for future in self.futures.values()) / len(self.futures)
+
+    @property
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures.values())
+
+    def result(self) -> Dict[str, Any]:
+        """What the upload step returned for each asset. Raises the first error that occurred loading one."""
+        return {path: future.result(timeout=0) for path, future in self.futures.items()}
+
+
+class AssetPipeline:
+    """
+    Decode images on worker threads and upload them on the main thread, a few per frame.
+
+    request() hands the decoding, and scaling the images to their variants, to a thread pool and returns
+    an AssetGroup of futures. Pillow's decoders release the GIL, so the threads decode in parallel, and
+    the decoded images are passed back as they are, without copying or pickling them like a process pool
+    would. process_uploads(), called once per frame on the thread that owns the GL context, runs the
+    upload step for decoded images until its time budget is spent, and resolves the futures, so their
+    callbacks run on the main thread too. With upload_texture() as the upload step, the budget covers
+    creating the textures and adding them to the texture cache, not the GPU transfer, which happens when
+    a sprite list first draws them.
+
+    The decode and upload steps can be swapped, for a fake upload to run the pipeline headless.
+
+    """
+
+    def __init__(
+        self,
+        upload: Upload = upload_texture,
+        decode: Decode = decode_variants,
+        max_workers: Optional[int] = None,
+        upload_budget: float = 0.004,
+        max_uploads_per_frame: int = 8,
+    ) -> None:
+        self.upload: Upload = upload
+        self.decode: Decode = decode
+        self.max_workers: Optional[int] = max_workers
+        self.upload_budget: float = upload_budget
+        self.max_uploads_per_frame: int = max_uploads_per_frame
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[str, "Future[Any]"] = dict()
+        self._decoded: "queue.Queue[Tuple[str, Future[Any]]]" = queue.Queue()
+
+    @property
+    def progress(self) -> Tuple[int, int]:
+        """Number of uploaded and requested assets."""
+        return sum(future.done() for future in self._futures.values()), len(self._futures)
+
+    def request(self, paths: Iterable[str]) -> AssetGroup:
+        """Start loading the assets that aren't loading yet and return the futures of all of them."""
+        group = dict()
+        for path in paths:
+            if path not in self._futures:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="wonderland-assets")
+                self._futures[path] = Future()
+                decoding = self._executor.submit(self.decode, path)
+                decoding.add_done_callback(functools.partial(self._queue_upload, path))
+            group[path] = self._futures[path]
+        return AssetGroup(group)
+
+    def _queue_upload(self, path: str, decoding: "Future[Any]") -> None:
+        # Runs on the worker thread that decoded the image
+        self._decoded.put((path, decoding))
+
+    def process_uploads(self, budget: Optional[float] = None) -> int:
+        """Upload decoded images until the time budget is spent and return how many were uploaded."""
+        budget = self.upload_budget if budget is None else budget
+        start = time.perf_counter()
+        uploaded = 0
+        while uploaded < self.max_uploads_per_frame and (uploaded == 0 or time.perf_counter() - start < budget):
+            try:
+                path, decoding = self._decoded.get_nowait()
+            except queue.Empty:
+                break
+            future = self._futures[path]
+            error = decoding.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                try:
+                    future.set_result(self.upload(path, decoding.result()))
+                except Exception as upload_error:
+                    future.set_exception(upload_error)
+            uploaded += 1
+        return uploaded
+
+    def wait(self, group: AssetGroup, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Block until the group is loaded, uploading on the calling thread without a budget."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while not group.done:
+            if self.process_uploads(budget=float("inf")):
+                continue
+            remaining = None if deadline is None else max(deadline - time.perf_counter(), 0)
+            try:
+                # Wait for the next decoded image and leave it for process_uploads()
+                self._decoded.put(self._decoded.get(timeout=remaining))
+            except queue.Empty:
+                raise TimeoutError("Assets didn't load within {} seconds".format(timeout))
+        return group.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+asset_pipeline: AssetPipeline = AssetPipeline()
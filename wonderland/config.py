@@ -1,3 +1,11 @@
 import os
+from typing import Tuple
 
 RESOURCE_PATH: str = os.path.join(os.path.dirname(__file__), "resources")
+SAVE_PATH: str = os.path.join(os.path.expanduser("~"), ".wonderland", "save.wonderland")
+FONT_METRICS_PATH: str = os.path.join(os.path.expanduser("~"), ".wonderland", "font_metrics.json")
+CARD_FACE_CACHE_PATH: str = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "wonderland", "card_faces"
+)
+# Scales every image is kept at once loaded, like the levels of a mipmap
+TEXTURE_VARIANT_SCALES: Tuple[float, ...] = (1.0, 0.5, 0.25)
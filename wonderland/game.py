@@ -1,26 +1,83 @@
-from typing import Dict
+from typing import Dict, List, Optional
 
 import arcade
 
-from wonderland.screens import Screen, Scene, CardCreator
+from wonderland.assets import scan_resources
+from wonderland.input import InputEvent, InputEventType, InputQueue
+from wonderland.profiling import profiler
+from wonderland.recording import InputRecorder
+from wonderland.screens.manager import ScreenManager
+from wonderland.screens.screen_base import Screen
+from wonderland.simulation import Simulation
+from wonderland.startup import StartupProfile
+from wonderland.ui.animation import animator
+from wonderland.ui.config import FONT
+from wonderland.ui.snapshots import DrawState, Snapshot, SnapshotRenderer
 
 SCREEN_TITLE: str = "Wonderland Prototype"
 
 
+# The screens, and the widgets and model they use, are imported when they are first needed, after the
+# window showed its first frame
+
+
+def _create_scene(seed: Optional[int]) -> Screen:
+    from wonderland.screens.scene import Scene
+
+    return Scene(seed=seed)
+
+
+def _create_card_creator() -> Screen:
+    from wonderland.screens.card_creator import CardCreator
+
+    return CardCreator()
+
+
 class Wonderland(arcade.Window):
     """
     Main application class of the Wonderland prototype.
+
+    With threaded, the game logic runs on a simulation thread at a fixed tick rate, and the window only
+    draws the snapshots it publishes. Otherwise it runs in update(), once per frame. Passing a seed
+    makes the game play out the same way for the same input.
+
+    The first frame only shows the loading screen. Everything else is set up by the first update after
+    it, so that the window has something to show as early as possible.
     """
 
-    def __init__(self, width: int, height: int, title: str = SCREEN_TITLE) -> None:
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        title: str = SCREEN_TITLE,
+        threaded: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
         super().__init__(width, height, title)
 
         arcade.set_background_color(arcade.color.BLACK)
 
-        # If you have sprite lists, you should create them here,
-        # and set them to None
-        self.screens: Dict[str, Screen] = {"scene": Scene(), "card_creator": CardCreator()}
-        self.current_screen: Screen = self.screens["card_creator"]
+        # Screens are only set up once they are activated or preloaded
+        self.screen_manager: ScreenManager = ScreenManager(width, height)
+        self.screen_manager.add("scene", lambda: _create_scene(seed))
+        self.screen_manager.add("card_creator", _create_card_creator)
+        # The screens created so far
+        self.screens: Dict[str, Screen] = self.screen_manager.screens
+        self.threaded: bool = threaded
+        self.seed: Optional[int] = seed
+        self.simulation: Simulation = Simulation(self.simulate, capture=self.capture if threaded else None)
+        self.renderer: SnapshotRenderer = SnapshotRenderer(on_loading_drawn=self.screen_manager.loading_screen_drawn)
+        # Input is collected as it comes in and handled once per tick
+        self.input_queue: InputQueue = self.simulation.input_queue
+        # Reports what startup took once the first screen is drawn, with --profile-startup
+        self.startup: Optional[StartupProfile] = None
+        self._setup_pending: bool = False
+        # Started by start_recording() while the setup is pending, attached once it has finished
+        self._pending_recorder: Optional[InputRecorder] = None
+
+    @property
+    def current_screen(self) -> Optional[Screen]:
+        return self.screen_manager.current
 
     @property
     def width(self) -> int:
@@ -31,21 +88,54 @@ class Wonderland(arcade.Window):
         return self.get_size()[1]
 
     def setup(self) -> None:
-        # Create your sprites and sprite lists here
-        for screen in self.screens.values():
-            screen.setup(self.width, self.height)
+        self.screen_manager.show_loading()
+        self._setup_pending = True
+        if self.threaded:
+            self.simulation.start()
+
+    def _finish_setup(self) -> None:
+        from wonderland.ui import Button, Card, Word, font_metrics
+
+        self._setup_pending = False
+        # Elements size themselves from measured glyphs, measured on an earlier launch if they were saved
+        font_metrics.load()
+        font_metrics.warm_up(FONT, sorted({Word.font_size, Button.font_size, Card.title_font_size}))
+        font_metrics.warm_up(FONT, [Card.subtitle_font_size], italic=True)
+        # Decode every image of the game in the background, screens wait for the ones they need
+        self.screen_manager.assets.request(scan_resources())
+        self.screen_manager.activate("card_creator")
+        # ENTER switches to the scene, so it is set up while the card creator is shown
+        self.screen_manager.preload("scene")
+        # A replay sets the game up before its first frame, so the frames before this one aren't logged
+        if self._pending_recorder is not None:
+            self.simulation.recorder, self._pending_recorder = self._pending_recorder, None
 
     def on_draw(self) -> None:
         """
         Render the screen.
         """
 
-        # This command should happen before we start drawing. It will clear
-        # the screen to the background color, and erase what we drew last frame.
-        arcade.start_render()
+        if profiler.enabled:
+            profiler.frame_started()
+        with profiler.span("on_draw", "frame"):
+            # This command should happen before we start drawing. It will clear
+            # the screen to the background color, and erase what we drew last frame.
+            arcade.start_render()
 
-        # Call draw() on all your sprite lists below
-        self.current_screen.draw()
+            if self.threaded:
+                with profiler.span("snapshot.draw", "draw"):
+                    self.renderer.draw(self.simulation.snapshots.latest)
+            else:
+                # Call draw() on all your sprite lists below
+                with profiler.span(type(self.screen_manager.displayed).__name__ + ".draw", "draw"):
+                    self.screen_manager.draw()
+        if profiler.enabled:
+            profiler.draw_overlay(self.height)
+        if self.startup is not None:
+            shown = self.current_screen is not None and not self.screen_manager.is_loading
+            if self.startup.frame_drawn(shown, self.screen_manager.setup_times):
+                print(self.startup.format())
+                self.startup = None
 
     def update(self, delta_time: float) -> None:
         """
@@ -53,7 +143,72 @@ class Wonderland(arcade.Window):
         Normally, you'll call update() on the sprite lists that
         need it.
         """
-        pass
+        # Uploads and the futures they resolve stay on the thread that draws, however the game logic runs
+        with profiler.span("asset uploads", "update"):
+            self.screen_manager.assets.process_uploads()
+        if self.threaded:
+            self.simulation.check()
+        else:
+            self.simulation.step(delta_time)
+
+    def simulate(self, delta_time: float, events: List[InputEvent]) -> None:
+        """Advance the game logic by a tick, on whichever thread the simulation runs on."""
+        if self._setup_pending and self.screen_manager.loading_drawn:
+            with profiler.span("setup", "setup"):
+                self._finish_setup()
+        with profiler.span("update", "frame"):
+            with profiler.span("input", "input"):
+                for event in events:
+                    self.handle_input(event)
+            with profiler.span("animations", "update"):
+                animator.update(delta_time)
+            self.screen_manager.update(delta_time)
+
+    def capture(self, tick: int) -> Snapshot:
+        """Take a snapshot of what the screen manager would draw."""
+        items: List[DrawState] = list()
+        self.screen_manager.snapshot(items)
+        loading = self.screen_manager.displayed is self.screen_manager.loading_screen
+        return Snapshot(tick, tuple(items), self.screen_manager.loading_shown if loading else 0)
+
+    def start_recording(self, path: str) -> InputRecorder:
+        """Log the input of every frame from now on, or from the end of the pending setup, for InputReplayer."""
+        self.stop_recording()
+        recorder = InputRecorder(path, self.seed, self.screen_manager.width, self.screen_manager.height)
+        if self._setup_pending:
+            self._pending_recorder = recorder
+        else:
+            self.simulation.recorder = recorder
+        return recorder
+
+    def stop_recording(self) -> None:
+        for recorder in (self.simulation.recorder, self._pending_recorder):
+            if recorder is not None:
+                recorder.close()
+        self.simulation.recorder = self._pending_recorder = None
+
+    def close(self) -> None:
+        # The simulation thread must not be in the middle of a tick while the game shuts down
+        self.simulation.stop()
+        self.stop_recording()
+        super().close()
+
+    def handle_input(self, event: InputEvent) -> None:
+        """Handle an input event taken from the input queue."""
+        if self._setup_pending:
+            return
+        if event.type is InputEventType.KEY_PRESS:
+            if event.key == arcade.key.ENTER:
+                if self.screen_manager.current_name == "scene":
+                    self.screen_manager.activate("card_creator")
+                else:
+                    self.screen_manager.activate("scene")
+        elif self.screen_manager.is_loading or self.current_screen is None:
+            return
+        elif event.type is InputEventType.MOUSE_MOTION:
+            self.current_screen.on_mouse_motion(event.x, event.y)
+        elif event.type is InputEventType.MOUSE_PRESS:
+            self.current_screen.on_mouse_press(event.x, event.y, event.button)
 
     def on_key_press(self, key, key_modifiers):
         """
@@ -62,32 +217,28 @@ class Wonderland(arcade.Window):
         For a full list of keys, see:
         http://arcade.academy/arcade.key.html
         """
-        if key == arcade.key.ENTER:
-            if self.current_screen is self.screens["scene"]:
-                self.current_screen = self.screens["card_creator"]
-            else:
-                self.current_screen = self.screens["scene"]
+        self.input_queue.key_press(key, key_modifiers)
 
     def on_key_release(self, key, key_modifiers):
         """
         Called whenever the user lets off a previously pressed key.
         """
-        pass
+        self.input_queue.key_release(key, key_modifiers)
 
     def on_mouse_motion(self, x, y, delta_x, delta_y):
         """
         Called whenever the mouse moves.
         """
-        self.current_screen.on_mouse_motion(x, y)
+        self.input_queue.mouse_motion(x, y)
 
     def on_mouse_press(self, x, y, button, key_modifiers):
         """
         Called when the user presses a mouse button.
         """
-        self.current_screen.on_mouse_press(x, y, button)
+        self.input_queue.mouse_press(x, y, button, key_modifiers)
 
     def on_mouse_release(self, x, y, button, key_modifiers):
         """
         Called when a user releases a mouse button.
         """
-        pass
+        self.input_queue.mouse_release(x, y, button, key_modifiers)
@@ -0,0 +1,425 @@
+"""
+Headless stand-in for arcade and the parts of pyglet's GL bindings that Wonderland touches.
+
+install() has to run before anything from wonderland.ui, wonderland.screens or wonderland.game is
+imported. Afterwards the game's UI code runs on machines without a display or GPU: drawing calls
+only count themselves in the DrawRecorder, while sprite geometry, hit boxes and textures behave
+like arcade's, so layout, hit-testing and the draw paths up to the GPU can be exercised and timed.
+
+"""
+
+import ctypes
+import sys
+import types
+from collections import Counter
+from typing import Any, Iterator, List, Optional, Tuple
+
+Color = Tuple[int, ...]
+
+
+class DrawRecorder:
+    """
+    Count the drawing calls issued against the stand-in.
+
+    """
+
+    def __init__(self) -> None:
+        self.calls: Counter = Counter()
+
+    def record(self, name: str) -> None:
+        self.calls[name] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self) -> None:
+        self.calls.clear()
+
+
+recorder: DrawRecorder = DrawRecorder()
+
+
+class _Constants:
+    """Attribute namespace with a few known values, handing out stable placeholders for everything else."""
+
+    def __init__(self, default: Any, **values: Any) -> None:
+        self.__dict__.update(values)
+        self._default = default
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = self._default(name) if callable(self._default) else self._default
+        setattr(self, name, value)
+        return value
+
+
+color = _Constants(
+    (255, 255, 255),
+    BLACK=(0, 0, 0),
+    WHITE=(255, 255, 255),
+    BEIGE=(245, 245, 220),
+    DARK_VANILLA=(209, 190, 168),
+    GRAY=(128, 128, 128),
+    DARK_GRAY=(169, 169, 169),
+    BALL_BLUE=(33, 171, 205),
+    ALICE_BLUE=(240, 248, 255),
+    YELLOW=(255, 255, 0),
+)
+
+# Same values as pyglet.window.key, so recorded input stays meaningful
+key = _Constants(
+    lambda name: 0x10000 + sum(ord(char) for char in name),
+    ENTER=65293,
+    RETURN=65293,
+    ESCAPE=65307,
+    SPACE=32,
+    BACKSPACE=65288,
+    TAB=65289,
+    LEFT=65361,
+    UP=65362,
+    RIGHT=65363,
+    DOWN=65364,
+)
+
+# The arcade version the stand-in mimics, the one poetry.lock pins
+VERSION: str = "2.1.3"
+
+MOUSE_BUTTON_LEFT: int = 1
+MOUSE_BUTTON_MIDDLE: int = 2
+MOUSE_BUTTON_RIGHT: int = 4
+
+
+class Texture:
+    def __init__(self, name: str, image: Any = None) -> None:
+        self.name: str = name
+        self.image: Any = image
+        self.scale: float = 1
+        self.width: int = image.width if image else 0
+        self.height: int = image.height if image else 0
+
+    def draw(self, center_x: float, center_y: float, width: float, height: float, *args: Any, **kwargs: Any) -> None:
+        recorder.record("Texture.draw")
+
+
+class Sprite:
+    def __init__(
+        self, filename: Optional[str] = None, scale: float = 1, center_x: float = 0, center_y: float = 0, **kwargs: Any
+    ) -> None:
+        self.sprite_lists: List["SpriteList"] = list()
+        self._texture: Optional[Texture] = None
+        self._scale: float = scale
+        self._width: float = 0
+        self._height: float = 0
+        self._position: List[float] = [center_x, center_y]
+        self._alpha: int = 255
+        self._color: Color = (255, 255, 255)
+        self.angle: float = 0.0
+        if filename is not None:
+            import PIL.Image
+
+            self.texture = Texture(filename, PIL.Image.open(filename))
+            self.scale = scale
+
+    def _updated(self) -> None:
+        for sprite_list in self.sprite_lists:
+            sprite_list.update_position(self)
+
+    @property
+    def texture(self) -> Optional[Texture]:
+        return self._texture
+
+    @texture.setter
+    def texture(self, texture: Texture) -> None:
+        self._texture = texture
+        self._width = texture.width * texture.scale
+        self._height = texture.height * texture.scale
+        for sprite_list in self.sprite_lists:
+            sprite_list.update_texture(self)
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+    @scale.setter
+    def scale(self, value: float) -> None:
+        self._scale = value
+        if self._texture is not None:
+            self._width = self._texture.width * value
+            self._height = self._texture.height * value
+        self._updated()
+
+    @property
+    def width(self) -> float:
+        return self._width
+
+    @width.setter
+    def width(self, value: float) -> None:
+        self._width = value
+        self._updated()
+
+    @property
+    def height(self) -> float:
+        return self._height
+
+    @height.setter
+    def height(self, value: float) -> None:
+        self._height = value
+        self._updated()
+
+    @property
+    def position(self) -> List[float]:
+        return self._position
+
+    @position.setter
+    def position(self, value: Tuple[float, float]) -> None:
+        self._position[0], self._position[1] = value
+        self._updated()
+
+    @property
+    def center_x(self) -> float:
+        return self._position[0]
+
+    @center_x.setter
+    def center_x(self, value: float) -> None:
+        self._position[0] = value
+        self._updated()
+
+    @property
+    def center_y(self) -> float:
+        return self._position[1]
+
+    @center_y.setter
+    def center_y(self, value: float) -> None:
+        self._position[1] = value
+        self._updated()
+
+    @property
+    def alpha(self) -> int:
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, value: int) -> None:
+        self._alpha = value
+        self._updated()
+
+    @property
+    def color(self) -> Color:
+        return self._color
+
+    @color.setter
+    def color(self, value: Color) -> None:
+        self._color = value
+        self._updated()
+
+    def register_sprite_list(self, sprite_list: "SpriteList") -> None:
+        self.sprite_lists.append(sprite_list)
+
+    def remove_from_sprite_lists(self) -> None:
+        for sprite_list in list(self.sprite_lists):
+            sprite_list.remove(self)
+        self.sprite_lists.clear()
+
+    kill = remove_from_sprite_lists
+
+    def collides_with_point(self, point: Tuple[float, float]) -> bool:
+        return abs(point[0] - self.center_x) <= self.width / 2 and abs(point[1] - self.center_y) <= self.height / 2
+
+    def draw(self) -> None:
+        recorder.record("Sprite.draw")
+
+
+class SpriteList:
+    def __init__(self, use_spatial_hash: bool = False, spatial_hash_cell_size: int = 128, is_static: bool = False):
+        self.sprite_list: List[Sprite] = list()
+        self.sprite_idx: dict = dict()
+        self.vao: Any = None
+
+    def append(self, sprite: Sprite) -> None:
+        self.sprite_idx[sprite] = len(self.sprite_list)
+        self.sprite_list.append(sprite)
+        sprite.register_sprite_list(self)
+        self.vao = None
+
+    def remove(self, sprite: Sprite) -> None:
+        self.sprite_list.remove(sprite)
+        self.sprite_idx = {sprite: i for i, sprite in enumerate(self.sprite_list)}
+        self.vao = None
+
+    def move(self, change_x: float, change_y: float) -> None:
+        for sprite in self.sprite_list:
+            sprite.center_x += change_x
+            sprite.center_y += change_y
+
+    def update_position(self, sprite: Sprite) -> None:
+        pass
+
+    update_location = update_angle = update_texture = update_position
+
+    def draw(self) -> None:
+        if self.sprite_list:
+            # Mirrors arcade rebuilding its vertex buffer after the list changed
+            self.vao = self.vao or object()
+            recorder.record("SpriteList.draw")
+
+    def __len__(self) -> int:
+        return len(self.sprite_list)
+
+    def __iter__(self) -> Iterator[Sprite]:
+        return iter(self.sprite_list)
+
+    def __getitem__(self, index: int) -> Sprite:
+        return self.sprite_list[index]
+
+    def __contains__(self, sprite: Sprite) -> bool:
+        return sprite in self.sprite_idx
+
+
+class ShapeElementList:
+    def __init__(self) -> None:
+        self.shapes: List[Any] = list()
+
+    def append(self, shape: Any) -> None:
+        self.shapes.append(shape)
+
+    def draw(self) -> None:
+        recorder.record("ShapeElementList.draw")
+
+
+def create_rectangle_filled(center_x: float, center_y: float, width: float, height: float, color: Color, **kwargs):
+    return ("rectangle_filled", center_x, center_y, width, height, color)
+
+
+def create_rectangle_outline(center_x: float, center_y: float, width: float, height: float, color: Color, **kwargs):
+    return ("rectangle_outline", center_x, center_y, width, height, color)
+
+
+def draw_text(text: str, start_x: float, start_y: float, color: Color, *args: Any, **kwargs: Any) -> None:
+    recorder.record("draw_text")
+
+
+def draw_texture_rectangle(
+    center_x: float, center_y: float, width: float, height: float, texture: Texture, *args: Any
+):
+    texture.draw(center_x, center_y, width, height)
+
+
+def start_render() -> None:
+    recorder.record("start_render")
+
+
+def set_background_color(color: Color) -> None:
+    pass
+
+
+_window: Optional["Window"] = None
+
+
+class Window:
+    def __init__(self, width: int = 800, height: int = 600, title: str = "", *args: Any, **kwargs: Any) -> None:
+        global _window
+        self._size: Tuple[int, int] = (width, height)
+        self.title: str = title
+        _window = self
+
+    def get_size(self) -> Tuple[int, int]:
+        return self._size
+
+    def get_framebuffer_size(self) -> Tuple[int, int]:
+        return self._size
+
+    def set_size(self, width: int, height: int) -> None:
+        self._size = (width, height)
+
+    def close(self) -> None:
+        pass
+
+
+def get_window() -> Optional[Window]:
+    return _window
+
+
+def run() -> None:
+    pass
+
+
+class _GL(_Constants):
+    """OpenGL functions become no-ops, constants become distinct integers."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            None,
+            GLuint=ctypes.c_uint,
+            GL_FRAMEBUFFER_COMPLETE=0x8CD5,
+            glCheckFramebufferStatus=lambda target: 0x8CD5,
+        )
+        self._next_constant: int = 1
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        if name.startswith("GL_"):
+            value: Any = self._next_constant
+            self._next_constant += 1
+        else:
+
+            def value(*args: Any, **kwargs: Any) -> int:
+                return 0
+
+        setattr(self, name, value)
+        return value
+
+
+def install() -> DrawRecorder:
+    """Put the stand-in in place of arcade and pyglet.gl and return the recorder counting drawing calls."""
+    if getattr(sys.modules.get("arcade"), "__headless__", False):
+        return recorder
+    imported = [name for name in ("wonderland.ui", "wonderland.screens", "wonderland.game") if name in sys.modules]
+    if imported:
+        raise RuntimeError("wonderland.headless.install() has to run before {} is imported".format(imported[0]))
+
+    arcade = types.ModuleType("arcade")
+    arcade.__headless__ = True  # type: ignore
+    for name in (
+        "Texture",
+        "Sprite",
+        "SpriteList",
+        "ShapeElementList",
+        "Window",
+        "create_rectangle_filled",
+        "create_rectangle_outline",
+        "draw_text",
+        "draw_texture_rectangle",
+        "start_render",
+        "set_background_color",
+        "get_window",
+        "run",
+        "color",
+        "key",
+        "MOUSE_BUTTON_LEFT",
+        "MOUSE_BUTTON_MIDDLE",
+        "MOUSE_BUTTON_RIGHT",
+        "VERSION",
+    ):
+        setattr(arcade, name, globals()[name])
+    arcade_types = types.ModuleType("arcade.arcade_types")
+    arcade_types.Color = Color  # type: ignore
+    arcade_types.Point = Tuple[float, float]  # type: ignore
+    arcade.arcade_types = arcade_types  # type: ignore
+
+    pyglet = types.ModuleType("pyglet")
+    gl = _GL()
+    pyglet.gl = gl  # type: ignore
+
+    sys.modules.update(
+        {
+            "arcade": arcade,
+            "arcade.arcade_types": arcade_types,
+            "arcade.color": color,  # type: ignore
+            "arcade.key": key,  # type: ignore
+            "pyglet": pyglet,
+            "pyglet.gl": gl,  # type: ignore
+        }
+    )
+    return recorder
@@ -0,0 +1,76 @@
+from collections import deque
+from enum import Enum
+from typing import Deque, List, NamedTuple
+
+
+class InputEventType(Enum):
+    MOUSE_MOTION = 1
+    MOUSE_PRESS = 2
+    MOUSE_RELEASE = 3
+    KEY_PRESS = 4
+    KEY_RELEASE = 5
+
+
+class InputEvent(NamedTuple):
+    type: InputEventType
+    x: float = 0.0
+    y: float = 0.0
+    button: int = 0
+    key: int = 0
+    modifiers: int = 0
+
+
+class InputQueue:
+    """
+    Collect the input events of a frame, to be handled once per frame instead of as they come in.
+
+    The window can report dozens of mouse motions per frame. Consecutive motions are merged into the
+    last one, as only where the cursor ended up matters. Presses and releases of buttons and keys are
+    kept in the order they happened, and a motion before a press is still handled before it.
+
+    Events can be pushed on one thread and drained on another without a lock: pushing only appends to
+    a deque and draining only pops from its other end, both of which are atomic. Motions are merged
+    while draining, so len() counts them unmerged.
+
+    """
+
+    def __init__(self) -> None:
+        self._events: Deque[InputEvent] = deque()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def push(self, event: InputEvent) -> None:
+        self._events.append(event)
+
+    def mouse_motion(self, x: float, y: float) -> None:
+        self.push(InputEvent(InputEventType.MOUSE_MOTION, x, y))
+
+    def mouse_press(self, x: float, y: float, button: int, modifiers: int = 0) -> None:
+        self.push(InputEvent(InputEventType.MOUSE_PRESS, x, y, button=button, modifiers=modifiers))
+
+    def mouse_release(self, x: float, y: float, button: int, modifiers: int = 0) -> None:
+        self.push(InputEvent(InputEventType.MOUSE_RELEASE, x, y, button=button, modifiers=modifiers))
+
+    def key_press(self, key: int, modifiers: int = 0) -> None:
+        self.push(InputEvent(InputEventType.KEY_PRESS, key=key, modifiers=modifiers))
+
+    def key_release(self, key: int, modifiers: int = 0) -> None:
+        self.push(InputEvent(InputEventType.KEY_RELEASE, key=key, modifiers=modifiers))
+
+    def drain(self) -> List[InputEvent]:
+        """Take the events collected since the last call, oldest first."""
+        events: List[InputEvent] = list()
+        pop = self._events.popleft
+        # Events pushed while draining are left for the next call
+        for _ in range(len(self._events)):
+            event = pop()
+            if event.type is InputEventType.MOUSE_MOTION and events:
+                if events[-1].type is InputEventType.MOUSE_MOTION:
+                    events[-1] = event
+                    continue
+            events.append(event)
+        return events
+
+    def clear(self) -> None:
+        self._events.clear()
@@ -0,0 +1,30 @@
+import importlib
+import sys
+from typing import Any, Dict, Tuple
+
+
+def export_lazily(namespace: Dict[str, Any], exports: Dict[str, Tuple[str, ...]]) -> None:
+    """
+    Re-export names from the modules of a package, importing each module only when one of its names is used.
+
+    Called with the globals() of the package's __init__ and the names to export by module. The package
+    gets a module level __getattr__ that imports the module a name lives in on first access, so importing
+    one light module of the package doesn't import all of the others. Python 3.6 doesn't call a module's
+    __getattr__, so there the modules are imported right away.
+
+    """
+    owners = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module = owners.get(name)
+        if module is None:
+            raise AttributeError("module {!r} has no attribute {!r}".format(namespace["__name__"], name))
+        value = namespace[name] = getattr(importlib.import_module(module), name)
+        return value
+
+    namespace["__all__"] = list(owners)
+    if sys.version_info >= (3, 7):
+        namespace["__getattr__"] = __getattr__
+    else:
+        for name in owners:
+            __getattr__(name)
@@ -1 +1,4 @@
-from wonderland.model.entities import Character
+from wonderland.model.entities import Character, CharacterArchetype, EntityRecord, EntityType
+from wonderland.model.search import WordIndex, entity_words, tokenize
+from wonderland.model.store import EntityStore
+from wonderland.model.save import CardRecord, SaveFile, SaveFormatError, save
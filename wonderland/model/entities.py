@@ -1,4 +1,27 @@
-from typing import List
+from enum import Enum
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class EntityType(Enum):
+    CHARACTER = 1
+    PLACE = 2
+    THING = 3
+
+
+class EntityRecord(NamedTuple):
+    """
+    Compact record of a character, place or thing of the world, as kept by the EntityStore.
+
+    """
+
+    id: int
+    type: EntityType
+    name: str
+    # Name of the CharacterArchetype, characters only
+    archetype: str = ""
+    tags: Tuple[str, ...] = ()
+    # Id of the place the entity is located in
+    location: Optional[int] = None
 
 
 class CharacterArchetype:
@@ -19,6 +42,13 @@ class Character:
         self.name: str = name
         self.archetype: CharacterArchetype = archetype
 
+    @classmethod
+    def archetype_named(cls, name: str) -> CharacterArchetype:
+        for archetype in cls.archetypes:
+            if archetype.name == name:
+                return archetype
+        raise KeyError("No archetype named '{}'".format(name))
+
 
 class Place:
     pass
@@ -0,0 +1,269 @@
+import bisect
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from wonderland.model.entities import EntityRecord, EntityType
+from wonderland.model.store import EntityStore
+
+MAGIC: bytes = b"WLND"
+FORMAT_VERSION: int = 1
+
+# magic, version, entity count, card count, string count,
+# offsets of the string index, the string data, the entity records and the card records
+_HEADER = struct.Struct("<4sHxxIIIQQQQ")
+# offset into the string data, length in bytes
+_STRING = struct.Struct("<II")
+# id, type, name, archetype, tags, location or 0
+_ENTITY = struct.Struct("<IBxxxIIII")
+# type, title, subtitle, entity id or 0
+_CARD = struct.Struct("<BxxxIII")
+# Tags are stored as one string, joined with the ASCII unit separator
+_TAG_SEPARATOR: str = "\x1f"
+# Records read at once when streaming
+_CHUNK_SIZE: int = 4096
+_ENTITY_TYPES: Dict[int, EntityType] = {entity_type.value: entity_type for entity_type in EntityType}
+
+
+class CardRecord(NamedTuple):
+    """
+    What a save file keeps of a card of a deck.
+
+    """
+
+    type: EntityType
+    title: str
+    subtitle: str
+    # Id of the EntityRecord the card shows
+    entity_id: Optional[int] = None
+
+
+class SaveFormatError(Exception):
+    pass
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.strings: List[str] = [""]
+        self._index: Dict[str, int] = {"": 0}
+
+    def add(self, string: str) -> int:
+        index = self._index.get(string)
+        if index is None:
+            index = self._index[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+
+def save(path: str, entities: Iterable[EntityRecord] = (), deck: Sequence[CardRecord] = ()) -> None:
+    """
+    Write the entities of a world and the cards of a deck to a save file.
+
+    The file starts with a header holding the offsets of its sections. Every string is stored once, in a
+    string table, and referred to by its index. Entities, sorted by id, and cards are fixed-size records
+    that refer to their strings, so any of them can be read by its position alone. The file is written
+    next to the target and moved over it, so an interrupted save leaves the old file intact.
+
+    """
+    strings = _StringTable()
+    entity_data = bytearray()
+    for record in sorted(entities, key=lambda record: record.id):
+        entity_data += _ENTITY.pack(
+            record.id,
+            record.type.value,
+            strings.add(record.name),
+            strings.add(record.archetype),
+            strings.add(_TAG_SEPARATOR.join(record.tags)),
+            record.location or 0,
+        )
+    card_data = bytearray()
+    for card in deck:
+        card_data += _CARD.pack(
+            card.type.value, strings.add(card.title), strings.add(card.subtitle), card.entity_id or 0
+        )
+    string_index = bytearray()
+    string_data = bytearray()
+    for string in strings.strings:
+        encoded = string.encode("utf-8")
+        string_index += _STRING.pack(len(string_data), len(encoded))
+        string_data += encoded
+
+    string_index_offset = _HEADER.size
+    string_data_offset = string_index_offset + len(string_index)
+    entities_offset = string_data_offset + len(string_data)
+    cards_offset = entities_offset + len(entity_data)
+    header = _HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(entity_data) // _ENTITY.size,
+        len(deck),
+        len(strings.strings),
+        string_index_offset,
+        string_data_offset,
+        entities_offset,
+        cards_offset,
+    )
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        for section in (header, string_index, string_data, entity_data, card_data):
+            file.write(section)
+    os.replace(temporary_path, path)
+
+
+class SaveFile:
+    """
+    A save file, opened as a memory map.
+
+    Opening one only reads its header. Records are decoded when they are asked for, and the pages of the
+    file they are in are only read by then, so single cards or entities can be looked at without loading
+    everything. Entities are found by id with a binary search over the sorted records.
+
+    Opening a file also checks that the sections its header points to fit into it. A damaged file raises
+    SaveFormatError, on opening or when the damaged records are read.
+
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._file = open(path, "rb")
+        try:
+            self._map: mmap.mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SaveFormatError("{} is empty".format(path))
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise SaveFormatError("{} is not a Wonderland save file".format(path))
+        (
+            magic,
+            self.version,
+            self.entity_count,
+            self.card_count,
+            self.string_count,
+            self._string_index_offset,
+            self._string_data_offset,
+            self._entities_offset,
+            self._cards_offset,
+        ) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise SaveFormatError("{} is not a Wonderland save file".format(path))
+        if self.version != FORMAT_VERSION:
+            self.close()
+            raise SaveFormatError("{} has format version {}, expected {}".format(path, self.version, FORMAT_VERSION))
+        sections = (
+            (self._string_index_offset, self.string_count * _STRING.size),
+            (self._string_data_offset, 0),
+            (self._entities_offset, self.entity_count * _ENTITY.size),
+            (self._cards_offset, self.card_count * _CARD.size),
+        )
+        if any(offset < _HEADER.size or offset + length > len(self._map) for offset, length in sections):
+            self.close()
+            raise SaveFormatError("{} is truncated or damaged".format(path))
+        self._strings: Dict[int, str] = dict()
+
+    def __enter__(self) -> "SaveFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def string(self, index: int) -> str:
+        string = self._strings.get(index)
+        if string is None:
+            if not 0 <= index < self.string_count:
+                raise SaveFormatError("{} refers to string {} of {}".format(self.path, index, self.string_count))
+            offset, length = _STRING.unpack_from(self._map, self._string_index_offset + index * _STRING.size)
+            start = self._string_data_offset + offset
+            if start + length > len(self._map):
+                raise SaveFormatError("{} is truncated or damaged".format(self.path))
+            try:
+                string = self._strings[index] = self._map[start : start + length].decode("utf-8")
+            except UnicodeDecodeError:
+                raise SaveFormatError("{} has a string that isn't UTF-8".format(self.path))
+        return string
+
+    def entity(self, position: int) -> EntityRecord:
+        """The entity record at a position, counting from 0 in the order of their ids."""
+        if not 0 <= position < self.entity_count:
+            raise IndexError("Entity position {} out of range".format(position))
+        return self._entity(_ENTITY.unpack_from(self._map, self._entities_offset + position * _ENTITY.size))
+
+    def find_entity(self, entity_id: int) -> Optional[EntityRecord]:
+        """The entity record with an id, or None if there is none."""
+        ids = _EntityIds(self)
+        position = bisect.bisect_left(ids, entity_id)  # type: ignore
+        if position < self.entity_count and ids[position] == entity_id:
+            return self.entity(position)
+        return None
+
+    def entities(self) -> Iterator[EntityRecord]:
+        """Stream the entity records in the order of their ids, reading the file a chunk at a time."""
+        for fields in self._records(self._entities_offset, self.entity_count, _ENTITY):
+            yield self._entity(fields)
+
+    def card(self, position: int) -> CardRecord:
+        if not 0 <= position < self.card_count:
+            raise IndexError("Card position {} out of range".format(position))
+        return self._card(_CARD.unpack_from(self._map, self._cards_offset + position * _CARD.size))
+
+    def cards(self) -> Iterator[CardRecord]:
+        for fields in self._records(self._cards_offset, self.card_count, _CARD):
+            yield self._card(fields)
+
+    def _records(self, offset: int, count: int, record: struct.Struct) -> Iterator[Tuple[int, ...]]:
+        for start in range(0, count, _CHUNK_SIZE):
+            end = min(start + _CHUNK_SIZE, count)
+            yield from record.iter_unpack(self._map[offset + start * record.size : offset + end * record.size])
+
+    def _entity(self, fields: Tuple[int, ...]) -> EntityRecord:
+        entity_id, entity_type, name, archetype, tags, location = fields
+        tags_string = self.string(tags)
+        return EntityRecord(
+            entity_id,
+            self._entity_type(entity_type),
+            self.string(name),
+            self.string(archetype),
+            tuple(tags_string.split(_TAG_SEPARATOR)) if tags_string else (),
+            location or None,
+        )
+
+    def _card(self, fields: Tuple[int, ...]) -> CardRecord:
+        card_type, title, subtitle, entity_id = fields
+        return CardRecord(self._entity_type(card_type), self.string(title), self.string(subtitle), entity_id or None)
+
+    def _entity_type(self, value: int) -> EntityType:
+        entity_type = _ENTITY_TYPES.get(value)
+        if entity_type is None:
+            raise SaveFormatError("{} has a record of unknown type {}".format(self.path, value))
+        return entity_type
+
+    def load_world(self) -> EntityStore:
+        world = EntityStore()
+        try:
+            world.load(self.entities())
+        except ValueError as error:
+            raise SaveFormatError("{} holds an invalid world: {}".format(self.path, error))
+        return world
+
+
+class _EntityIds:
+    """The ids of the entity records of a save file, read from the file as they are indexed."""
+
+    def __init__(self, save_file: SaveFile) -> None:
+        self._save_file: SaveFile = save_file
+
+    def __len__(self) -> int:
+        return self._save_file.entity_count
+
+    def __getitem__(self, position: int) -> int:
+        save_file = self._save_file
+        return struct.unpack_from("<I", save_file._map, save_file._entities_offset + position * _ENTITY.size)[0]
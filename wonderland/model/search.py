@@ -0,0 +1,114 @@
+import re
+import unicodedata
+from typing import Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from wonderland.model.entities import EntityRecord
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into words, lowercased and stripped of accents, so that "Café" and "cafe" match."""
+    text = text.casefold()
+    try:
+        text.encode("ascii")
+    except UnicodeEncodeError:
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(character for character in text if not unicodedata.combining(character))
+    return _TOKEN.findall(text)
+
+
+def entity_words(record: EntityRecord) -> Tuple[str, ...]:
+    """The texts of an entity that words are matched against."""
+    return (record.name, record.archetype) + record.tags
+
+
+class WordIndex:
+    """
+    Find items by the words of their texts, with an inverted index from words to items.
+
+    Every word of an item's texts, and every prefix of it at least min_prefix characters long, is a key
+    of the index, so exact and partial matches are a lookup each and cost time in the number of items
+    they return. Items are added, updated and removed one at a time. Matches come back in the order the
+    items were added.
+
+    """
+
+    min_prefix: int = 2
+
+    def __init__(self) -> None:
+        self._words: Dict[Hashable, Tuple[str, ...]] = dict()
+        self._exact: Dict[str, Dict[Hashable, None]] = dict()
+        # For each item, how many of its words start with the prefix
+        self._prefixes: Dict[str, Dict[Hashable, int]] = dict()
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._words
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._words)
+
+    def words(self, item: Hashable) -> Tuple[str, ...]:
+        return self._words[item]
+
+    def add(self, item: Hashable, texts: Iterable[str]) -> None:
+        """Index an item under the words of its texts, replacing what it was indexed under before."""
+        if item in self._words:
+            self.remove(item)
+        words = tuple(dict.fromkeys(word for text in texts for word in tokenize(text)))
+        self._words[item] = words
+        for word in words:
+            self._exact.setdefault(word, dict())[item] = None
+            for end in range(self.min_prefix, len(word) + 1):
+                counts = self._prefixes.setdefault(word[:end], dict())
+                counts[item] = counts.get(item, 0) + 1
+
+    def remove(self, item: Hashable) -> None:
+        for word in self._words.pop(item):
+            bucket = self._exact[word]
+            del bucket[item]
+            if not bucket:
+                del self._exact[word]
+            for end in range(self.min_prefix, len(word) + 1):
+                prefix = word[:end]
+                counts = self._prefixes[prefix]
+                if counts[item] > 1:
+                    counts[item] -= 1
+                else:
+                    del counts[item]
+                    if not counts:
+                        del self._prefixes[prefix]
+
+    def discard(self, item: Hashable) -> None:
+        if item in self._words:
+            self.remove(item)
+
+    def clear(self) -> None:
+        self._words.clear()
+        self._exact.clear()
+        self._prefixes.clear()
+
+    def match(self, text: str, prefix: bool = False) -> List[Hashable]:
+        """
+        Items that have every word of the text. With prefix, the last word of the text only has to be
+        the start of one of theirs, as while it is being typed.
+
+        """
+        words = tokenize(text)
+        if not words:
+            return []
+        buckets: List[Optional[Mapping[Hashable, object]]] = [self._exact.get(word) for word in words[:-1]]
+        if prefix and len(words[-1]) >= self.min_prefix:
+            buckets.append(self._prefixes.get(words[-1]))
+        else:
+            buckets.append(self._exact.get(words[-1]))
+        if not all(buckets):
+            return []
+        if len(buckets) == 1:
+            return list(buckets[0])  # type: ignore
+        # Only the smallest bucket is walked, the others are only checked for membership
+        smallest = min(buckets, key=len)  # type: ignore
+        return [item for item in smallest if all(item in bucket for bucket in buckets)]  # type: ignore
@@ -0,0 +1,197 @@
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, cast
+
+from wonderland.model.entities import Character, EntityRecord, EntityType
+from wonderland.model.search import WordIndex, entity_words
+
+# Ids of the entities under an index key, in the order they were added
+_Bucket = Dict[int, None]
+
+
+class EntityStore:
+    """
+    The characters, places and things of a world, as EntityRecords with secondary indexes.
+
+    Records are looked up by id, and by type, archetype, tag and the place they are located in through
+    indexes that are kept up to date as records are added, changed and removed. Queries therefore cost
+    time in the number of records they return, not in the size of the world. Queries return records in
+    the order they were added.
+
+    A unique archetype can only be used by one character at a time.
+
+    Records can also be searched by the words of their names, archetypes and tags. That index is built on
+    the first search, so loading a world doesn't pay for it, and kept up to date from then on.
+
+    """
+
+    def __init__(self) -> None:
+        self._records: Dict[int, EntityRecord] = dict()
+        self._next_id: int = 1
+        self._by_type: Dict[EntityType, _Bucket] = {entity_type: dict() for entity_type in EntityType}
+        self._by_archetype: Dict[str, _Bucket] = dict()
+        self._by_tag: Dict[str, _Bucket] = dict()
+        self._by_location: Dict[int, _Bucket] = dict()
+        self._words: Optional[WordIndex] = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, entity_id: int) -> bool:
+        return entity_id in self._records
+
+    def __iter__(self) -> Iterator[EntityRecord]:
+        return iter(self._records.values())
+
+    def __getitem__(self, entity_id: int) -> EntityRecord:
+        return self._records[entity_id]
+
+    def get(self, entity_id: int) -> Optional[EntityRecord]:
+        return self._records.get(entity_id)
+
+    def add(
+        self,
+        entity_type: EntityType,
+        name: str,
+        archetype: str = "",
+        tags: Iterable[str] = (),
+        location: Optional[int] = None,
+    ) -> EntityRecord:
+        """Create a record with a new id and return it."""
+        record = EntityRecord(self._next_id, entity_type, name, archetype, tuple(tags), location)
+        self._check(record)
+        self._next_id += 1
+        self._insert(record)
+        return record
+
+    def load(self, records: Iterable[EntityRecord]) -> None:
+        """
+        Add records that keep their ids, like the ones read from a save file.
+
+        Either all of the records are added or, if one of them is invalid, none are.
+
+        """
+        records = list(records)
+        next_id = self._next_id
+        inserted: List[int] = list()
+        try:
+            for record in records:
+                if record.id in self._records:
+                    raise ValueError("There already is an entity with id {}".format(record.id))
+                self._insert(record)
+                inserted.append(record.id)
+                self._next_id = max(self._next_id, record.id + 1)
+            # Records can refer to ones that come after them, so they are checked once all are in
+            for record in records:
+                self._check(record)
+        except Exception:
+            for entity_id in reversed(inserted):
+                self._take_out(entity_id)
+            self._next_id = next_id
+            raise
+
+    def update(self, entity_id: int, **changes: Any) -> EntityRecord:
+        """Change fields of a record other than its id and type, and return the new record."""
+        if "id" in changes or "type" in changes:
+            raise ValueError("The id and type of an entity can't be changed")
+        if "tags" in changes:
+            changes["tags"] = tuple(changes["tags"])
+        record = self._records[entity_id]._replace(**changes)
+        self._check(record)
+        self._take_out(entity_id)
+        self._insert(record)
+        return record
+
+    def remove(self, entity_id: int) -> None:
+        if self._by_location.get(entity_id):
+            raise ValueError("Entity {} still has entities located in it".format(entity_id))
+        self._take_out(entity_id)
+
+    def clear(self) -> None:
+        self._records.clear()
+        for bucket in self._by_type.values():
+            bucket.clear()
+        self._by_archetype.clear()
+        self._by_tag.clear()
+        self._by_location.clear()
+        self._words = None
+
+    def of_type(self, entity_type: EntityType) -> List[EntityRecord]:
+        return self._lookup(self._by_type, entity_type)
+
+    def with_archetype(self, archetype: str) -> List[EntityRecord]:
+        return self._lookup(self._by_archetype, archetype)
+
+    def with_tag(self, tag: str) -> List[EntityRecord]:
+        return self._lookup(self._by_tag, tag)
+
+    def located_in(self, place_id: int) -> List[EntityRecord]:
+        return self._lookup(self._by_location, place_id)
+
+    def matching(self, text: str, prefix: bool = False) -> List[EntityRecord]:
+        """Records with every word of the text in their name, archetype or tags, see WordIndex.match()."""
+        if self._words is None:
+            self._words = WordIndex()
+            for record in self._records.values():
+                self._words.add(record.id, entity_words(record))
+        return [self._records[cast(int, entity_id)] for entity_id in self._words.match(text, prefix)]
+
+    def archetypes_in_use(self) -> Set[str]:
+        return set(self._by_archetype)
+
+    def unique_archetypes_in_use(self) -> Set[str]:
+        """Names of the unique archetypes a character already has, which no other character can take."""
+        return {name for name in self._by_archetype if Character.archetype_named(name).unique}
+
+    def tags(self) -> Set[str]:
+        return set(self._by_tag)
+
+    def _lookup(self, index: Dict[Any, _Bucket], key: Hashable) -> List[EntityRecord]:
+        return [self._records[entity_id] for entity_id in index.get(key, ())]
+
+    def _check(self, record: EntityRecord) -> None:
+        if record.archetype:
+            if record.type is not EntityType.CHARACTER:
+                raise ValueError("Only characters have an archetype")
+            try:
+                archetype = Character.archetype_named(record.archetype)
+            except KeyError:
+                raise ValueError("There is no archetype named '{}'".format(record.archetype))
+            if archetype.unique:
+                holders = self._by_archetype.get(record.archetype, ())
+                if any(holder != record.id for holder in holders):
+                    raise ValueError("The unique archetype '{}' is already taken".format(record.archetype))
+        if record.location is not None:
+            place = self._records.get(record.location)
+            if place is None or place.type is not EntityType.PLACE:
+                raise ValueError("Entity {} is not a place".format(record.location))
+
+    def _insert(self, record: EntityRecord) -> None:
+        self._records[record.id] = record
+        self._by_type[record.type][record.id] = None
+        if record.archetype:
+            self._by_archetype.setdefault(record.archetype, dict())[record.id] = None
+        for tag in record.tags:
+            self._by_tag.setdefault(tag, dict())[record.id] = None
+        if record.location is not None:
+            self._by_location.setdefault(record.location, dict())[record.id] = None
+        if self._words is not None:
+            self._words.add(record.id, entity_words(record))
+
+    def _take_out(self, entity_id: int) -> None:
+        record = self._records.pop(entity_id)
+        del self._by_type[record.type][entity_id]
+        if record.archetype:
+            self._discard(self._by_archetype, record.archetype, entity_id)
+        for tag in record.tags:
+            self._discard(self._by_tag, tag, entity_id)
+        if record.location is not None:
+            self._discard(self._by_location, record.location, entity_id)
+        if self._words is not None:
+            self._words.remove(entity_id)
+
+    @staticmethod
+    def _discard(index: Dict[Any, _Bucket], key: Hashable, entity_id: int) -> None:
+        bucket = index[key]
+        del bucket[entity_id]
+        # Empty buckets are dropped, so the keys of an index are the values in use
+        if not bucket:
+            del index[key]
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+PROFILE_ENV_VAR: str = "WONDERLAND_PROFILE"
+DEFAULT_TRACE_FILE: str = "wonderland-trace.json"
+
+
+class _Span:
+    __slots__ = ("_profiler", "_name", "_category", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str, category: str) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._category = category
+        self._start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._profiler.record(self._name, self._category, self._start, time.perf_counter())
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """
+    Opt-in frame profiler.
+
+    Spans are kept in a bounded buffer and can be written out as a Chrome trace, which opens in
+    chrome://tracing or Perfetto. Rolling frame times feed an FPS / p50 / p99 overlay.
+
+    Hot code paths check the enabled flag before opening spans, so a disabled profiler costs
+    a single attribute lookup.
+
+    """
+
+    def __init__(self, enabled: bool = False, max_spans: int = 500_000, frame_window: int = 240) -> None:
+        self.enabled: bool = enabled
+        self.trace_file: str = DEFAULT_TRACE_FILE
+        self._spans: Deque[Dict[str, Any]] = deque(maxlen=max_spans)
+        self._frame_times: Deque[float] = deque(maxlen=frame_window)
+        self._last_frame_start: Optional[float] = None
+        self._origin: float = time.perf_counter()
+        self._pid: int = os.getpid()
+        self._overlay_text: str = ""
+        self._overlay_updated: float = 0.0
+
+    def enable(self, trace_file: Optional[str] = None) -> None:
+        self.enabled = True
+        if trace_file is not None:
+            self.trace_file = trace_file
+
+    def span(self, name: str, category: str = "wonderland") -> Any:
+        """Context manager timing the code it wraps."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category)
+
+    def record(self, name: str, category: str, start: float, end: float) -> None:
+        self._spans.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+            }
+        )
+
+    def frame_started(self) -> None:
+        now = time.perf_counter()
+        if self._last_frame_start is not None:
+            self._frame_times.append(now - self._last_frame_start)
+        self._last_frame_start = now
+
+    @property
+    def fps(self) -> float:
+        if not self._frame_times:
+            return 0.0
+        return len(self._frame_times) / sum(self._frame_times)
+
+    def frame_time_percentile(self, percentile: float) -> float:
+        """Frame time in seconds below which the given percentage of the recent frames fall."""
+        if not self._frame_times:
+            return 0.0
+        frame_times = sorted(self._frame_times)
+        return frame_times[min(int(len(frame_times) * percentile / 100), len(frame_times) - 1)]
+
+    def draw_overlay(self, height: float) -> None:
+        # Imported here, so that the profiler itself does not depend on arcade
+        import arcade
+        from wonderland.ui.labels import draw_label
+        from wonderland.ui.config import FONT
+
+        # Refreshing the text a few times a second keeps the label cache from filling up with numbers
+        now = time.perf_counter()
+        if now - self._overlay_updated > 0.5:
+            self._overlay_text = "FPS {:.1f}   p50 {:.1f} ms   p99 {:.1f} ms".format(
+                self.fps, self.frame_time_percentile(50) * 1000, self.frame_time_percentile(99) * 1000
+            )
+            self._overlay_updated = now
+        draw_label(
+            text=self._overlay_text,
+            start_x=10,
+            start_y=height - 10,
+            color=arcade.color.YELLOW,
+            font_size=12,
+            font_name=FONT,
+            anchor_y="top",
+        )
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        return list(self._spans)
+
+    def write_trace(self, path: Optional[str] = None) -> str:
+        path = path if path is not None else self.trace_file
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, trace_file)
+        return path
+
+
+profiler: Profiler = Profiler(enabled=bool(os.environ.get(PROFILE_ENV_VAR)))
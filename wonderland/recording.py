@@ -0,0 +1,189 @@
+import os
+import struct
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from wonderland.input import InputEvent, InputEventType
+
+MAGIC: bytes = b"WLIN"
+FORMAT_VERSION: int = 1
+
+# magic, version, whether there is a seed, seed, window width and height
+_HEADER = struct.Struct("<4sHBxIII")
+# seconds since the recording started, event type or 0 for the end of a frame, button, modifiers, key, x, y.
+# The end of a frame keeps its delta time in x.
+_RECORD = struct.Struct("<dBBHQdd")
+_END_OF_FRAME: int = 0
+_EVENT_TYPES: Dict[int, InputEventType] = {event_type.value: event_type for event_type in InputEventType}
+
+
+class RecordingFormatError(Exception):
+    pass
+
+
+class Frame(NamedTuple):
+    """
+    A frame or tick of a recorded session: when it ran, the time it advanced the game by and its input.
+
+    """
+
+    time: float
+    delta_time: float
+    events: Sequence[InputEvent]
+
+
+class Recording(NamedTuple):
+    """
+    A session read back from an input log.
+
+    """
+
+    # Seed of the random layouts, None if the session was played without one
+    seed: Optional[int]
+    width: int
+    height: int
+    frames: Sequence[Frame]
+
+    @property
+    def event_count(self) -> int:
+        return sum(len(frame.events) for frame in self.frames)
+
+    @property
+    def duration(self) -> float:
+        return self.frames[-1].time if self.frames else 0.0
+
+
+class InputRecorder:
+    """
+    Write the input a game handles to a compact binary log, frame by frame, for InputReplayer to play back.
+
+    The log starts with a header holding the seed of the game's random layouts and the size of the
+    window. Events and the ends of frames follow as fixed-size records, stamped with the time since
+    the recording started. Events are recorded as the frame that handles them takes them from the
+    input queue, after consecutive motions were merged, so a replay hands every frame the same events.
+    A log cut short by a crash is read up to its last complete frame.
+
+    """
+
+    def __init__(
+        self,
+        path: str,
+        seed: Optional[int],
+        width: int,
+        height: int,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.path: str = path
+        self.seed: Optional[int] = seed
+        self._clock: Callable[[], float] = clock
+        self._start: float = clock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, seed is not None, seed or 0, width, height))
+        self.frames: int = 0
+        self.events: int = 0
+
+    def __enter__(self) -> "InputRecorder":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def record(self, delta_time: float, events: Sequence[InputEvent]) -> None:
+        """Log a frame that advanced the game by delta_time and handled the events."""
+        now = self._clock() - self._start
+        pack = _RECORD.pack
+        data = bytearray()
+        for event in events:
+            data += pack(now, event.type.value, event.button, event.modifiers, event.key, event.x, event.y)
+        data += pack(now, _END_OF_FRAME, 0, 0, 0, delta_time, 0.0)
+        self._file.write(data)
+        self.frames += 1
+        self.events += len(events)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_recording(path: str) -> Recording:
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < _HEADER.size:
+        raise RecordingFormatError("{} is not a Wonderland input log".format(path))
+    magic, version, has_seed, seed, width, height = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise RecordingFormatError("{} is not a Wonderland input log".format(path))
+    if version != FORMAT_VERSION:
+        raise RecordingFormatError("{} has format version {}, expected {}".format(path, version, FORMAT_VERSION))
+    # A record cut short by a crash is dropped, and so are the events of a frame that never ended
+    end = _HEADER.size + (len(data) - _HEADER.size) // _RECORD.size * _RECORD.size
+    frames: List[Frame] = list()
+    events: List[InputEvent] = list()
+    for record_time, event_type, button, modifiers, key, x, y in _RECORD.iter_unpack(data[_HEADER.size : end]):
+        if event_type == _END_OF_FRAME:
+            frames.append(Frame(record_time, x, tuple(events)))
+            events = list()
+        else:
+            events.append(InputEvent(_EVENT_TYPES[event_type], x, y, button=button, key=key, modifiers=modifiers))
+    return Recording(seed if has_seed else None, width, height, frames)
+
+
+class ReplayTimings(NamedTuple):
+    """
+    How long a replay took, per frame and per handled event.
+
+    """
+
+    # Whole frames: input, update and draw
+    frames: List[float]
+    # Handling single events, by their type
+    events: "OrderedDict[InputEventType, List[float]]"
+    # Updates and draws, without the input of the frame
+    updates: List[float]
+    draws: List[float]
+
+
+class InputReplayer:
+    """
+    Play a recorded session back through a game's input handling, update and draw, timing each.
+
+    Every frame hands the game the events it handled when it was recorded, one at a time through
+    handle_input(), then advances it by the recorded delta time with simulate() and draws it with
+    on_draw(). The game should be made with the recording's seed and window size, without threading,
+    and have its assets loaded, so that how fast images decode doesn't change when screens show up.
+    Replays run as fast as they can, or, with realtime, wait for each frame to come up at the time it
+    was recorded.
+
+    """
+
+    def __init__(self, recording: Recording, realtime: bool = False) -> None:
+        self.recording: Recording = recording
+        self.realtime: bool = realtime
+
+    def replay(self, game: Any) -> ReplayTimings:
+        timings = ReplayTimings(list(), OrderedDict(), list(), list())
+        clock = time.perf_counter
+        start = clock()
+        for frame in self.recording.frames:
+            if self.realtime:
+                delay = start + frame.time - clock()
+                if delay > 0:
+                    time.sleep(delay)
+            frame_start = clock()
+            for event in frame.events:
+                event_start = clock()
+                game.handle_input(event)
+                timings.events.setdefault(event.type, list()).append(clock() - event_start)
+            update_start = clock()
+            game.simulate(frame.delta_time, [])
+            draw_start = clock()
+            game.on_draw()
+            end = clock()
+            timings.updates.append(draw_start - update_start)
+            timings.draws.append(end - draw_start)
+            timings.frames.append(end - frame_start)
+        return timings
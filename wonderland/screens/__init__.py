@@ -1,3 +1,22 @@
-from wonderland.screens.screen_base import Screen
-from wonderland.screens.scene import Scene
-from wonderland.screens.card_creator import CardCreator
+from typing import TYPE_CHECKING
+
+from wonderland.lazy import export_lazily
+
+# The game's screens are only imported once they are needed, see Wonderland.setup()
+export_lazily(
+    globals(),
+    {
+        "wonderland.screens.screen_base": ("Screen",),
+        "wonderland.screens.scene": ("Scene",),
+        "wonderland.screens.card_creator": ("CardCreator",),
+        "wonderland.screens.loading": ("LoadingScreen",),
+        "wonderland.screens.manager": ("ReleasePolicy", "ScreenManager"),
+    },
+)
+
+if TYPE_CHECKING:
+    from wonderland.screens.screen_base import Screen  # noqa: F401
+    from wonderland.screens.scene import Scene  # noqa: F401
+    from wonderland.screens.card_creator import CardCreator  # noqa: F401
+    from wonderland.screens.loading import LoadingScreen  # noqa: F401
+    from wonderland.screens.manager import ReleasePolicy, ScreenManager  # noqa: F401
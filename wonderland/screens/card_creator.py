@@ -1,28 +1,42 @@
+import os
 from typing import List, Optional
 
+from wonderland.config import SAVE_PATH
+from wonderland.model import SaveFile, SaveFormatError, save
 from wonderland.screens.screen_base import Screen
-from wonderland.ui import Card, CardType, Button, ButtonChooser
+from wonderland.ui import Card, CardType, Button, ButtonChooser, card_index
+from wonderland.ui.cards import CARD_ASSETS
 
 
 class CardCreator(Screen):
     """
     Create a Wonderland playing card.
 
+    The card is saved when the screen is left, and comes back from the save file the next time the
+    screen is set up.
+
     """
 
+    cacheable = True
+    assets = CARD_ASSETS
+    save_path: str = SAVE_PATH
+
     def __init__(self) -> None:
         self.card: Optional[Card] = None
         self.card_type_chooser: Optional[ButtonChooser] = None
 
     def setup(self, width: int, height: int) -> None:
-        self.card = Card(
-            card_type=CardType.CHARACTER,
-            title="Untitled",
-            subtitle="Card",
-            center_x=width / 2,
-            center_y=height / 2,
-            scale=3.0,
-        )
+        self.card = self._load_card(center_x=width / 2, center_y=height / 2, scale=3.0)
+        if self.card is None:
+            self.card = Card(
+                card_type=CardType.CHARACTER,
+                title="Untitled",
+                subtitle="Card",
+                center_x=width / 2,
+                center_y=height / 2,
+                scale=3.0,
+            )
+        card_index.add(self.card)
         self.ui_elements.append(self.card)
         self.card_type_chooser = ButtonChooser(
             options={
@@ -38,6 +52,25 @@ class CardCreator(Screen):
         )
         self.ui_elements.append(self.card_type_chooser)
 
+    def on_exit(self) -> None:
+        self.save()
+
+    def save(self) -> None:
+        if self.card is not None:
+            save(self.save_path, deck=[self.card.to_record()])
+
+    def _load_card(self, center_x: float, center_y: float, scale: float) -> Optional[Card]:
+        if not os.path.exists(self.save_path):
+            return None
+        try:
+            with SaveFile(self.save_path) as save_file:
+                if save_file.card_count == 0:
+                    return None
+                return Card.from_record(save_file.card(0), center_x=center_x, center_y=center_y, scale=scale)
+        except SaveFormatError:
+            # A save from another version of the game, it gets replaced on the next save
+            return None
+
     def on_card_type_choice(self, option):
         self.card.title = option[1]
         self.card.card_type = option[0]
@@ -0,0 +1,46 @@
+from typing import List
+
+import arcade
+
+from wonderland.screens.screen_base import Screen
+from wonderland.ui.config import FONT
+from wonderland.ui.snapshots import DrawState, LabelState
+
+
+class LoadingScreen(Screen):
+    """
+    Shown while the screen that was switched to is loading its assets and being set up.
+
+    """
+
+    text: str = "Loading"
+
+    def __init__(self) -> None:
+        self.width: int = 0
+        self.height: int = 0
+        self.progress: float = 0.0
+
+    def setup(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+
+    def draw(self) -> None:
+        self.label_state().draw()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        items.append(self.label_state())
+
+    def label_state(self) -> LabelState:
+        return LabelState(
+            text="{} {:.0%}".format(self.text, self.progress),
+            start_x=self.width / 2,
+            start_y=self.height / 2,
+            color=arcade.color.ALICE_BLUE,
+            font_size=24,
+            font_name=FONT,
+            anchor_x="center",
+            anchor_y="center",
+        )
+
+    def update(self, delta_time: float) -> None:
+        pass
@@ -0,0 +1,218 @@
+from collections import OrderedDict
+from enum import Enum
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from wonderland.assets import AssetGroup, AssetPipeline, asset_pipeline
+from wonderland.profiling import profiler
+from wonderland.screens.loading import LoadingScreen
+from wonderland.screens.screen_base import Screen
+from wonderland.ui.snapshots import DrawState
+
+
+class ReleasePolicy(Enum):
+    # Keep everything of inactive screens resident
+    KEEP = 1
+    # Free the GPU resources of inactive screens, they are rebuilt when the screen is drawn again
+    RELEASE_GPU = 2
+    # Drop the UI of inactive screens, they are set up again when activated
+    TEARDOWN = 3
+
+
+class ScreenManager:
+    """
+    Switch between screens, setting each one up only when it is first needed.
+
+    Screens can be added as functions that create them, which are only called once the screen is
+    activated, preloaded or looked up, so that the modules of a screen are imported only by then.
+    A screen that isn't set up yet has its assets requested from the asset pipeline when it is
+    activated. The loading screen stands in for it until the assets are loaded, and the screen is set
+    up on the next update after that. Screens that are likely to be needed next can be preloaded: one
+    of them, with its assets loaded, is set up per update in which no switch is pending. Screens that
+    have been inactive for release_after seconds give up their resources according to the release
+    policy.
+
+    Screens hold GPU resources, so all of this happens on the thread that draws them. A threaded
+    Simulation does it on its own thread instead, where screens are never drawn, only snapshot(). The
+    thread drawing the snapshots reports the ones that showed the loading screen through
+    loading_screen_drawn().
+
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        release_policy: ReleasePolicy = ReleasePolicy.RELEASE_GPU,
+        release_after: float = 30.0,
+        loading_screen: Optional[Screen] = None,
+        assets: Optional[AssetPipeline] = None,
+    ) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.release_policy: ReleasePolicy = release_policy
+        self.release_after: float = release_after
+        # The screens created so far
+        self.screens: Dict[str, Screen] = OrderedDict()
+        self.names: List[str] = list()
+        # How long setting each screen up took, in seconds
+        self.setup_times: Dict[str, float] = OrderedDict()
+        self._factories: Dict[str, Callable[[], Screen]] = dict()
+        self.current_name: Optional[str] = None
+        self.loading_screen: Screen = loading_screen if loading_screen is not None else LoadingScreen()
+        self.assets: AssetPipeline = assets if assets is not None else asset_pipeline
+        self._asset_groups: Dict[str, AssetGroup] = dict()
+        self._pending: Optional[str] = None
+        # How often the loading screen was shown, and which of those times a frame showing it was drawn for
+        self._loading_shown: int = 0
+        self._loading_drawn: int = 0
+        self._preload: List[str] = list()
+        self._clock: float = 0.0
+        self._inactive_since: Dict[str, float] = dict()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.screens or name in self._factories
+
+    def __getitem__(self, name: str) -> Screen:
+        """The named screen, created first if it was added as a function."""
+        screen = self.screens.get(name)
+        if screen is None:
+            if name not in self._factories:
+                raise KeyError("No screen named '{}'".format(name))
+            screen = self.screens[name] = self._factories.pop(name)()
+        return screen
+
+    def add(self, name: str, screen: Union[Screen, Callable[[], Screen]]) -> None:
+        if name not in self.names:
+            self.names.append(name)
+        if isinstance(screen, Screen):
+            self.screens[name] = screen
+        else:
+            self._factories[name] = screen
+
+    @property
+    def current(self) -> Optional[Screen]:
+        return self.screens[self.current_name] if self.current_name is not None else None
+
+    @property
+    def loading_drawn(self) -> bool:
+        """Whether the loading screen has been drawn since it was last shown."""
+        return self._loading_drawn == self._loading_shown
+
+    @property
+    def loading_shown(self) -> int:
+        """Counts the times the loading screen was shown, to tell which of them a snapshot of it belongs to."""
+        return self._loading_shown
+
+    @property
+    def is_loading(self) -> bool:
+        return self._pending is not None
+
+    @property
+    def displayed(self) -> Optional[Screen]:
+        """The screen to draw, which is the loading screen while a switch is pending or none was activated."""
+        if self.is_loading or (self.current is None and self.loading_screen.is_set_up):
+            return self.loading_screen
+        return self.current
+
+    def show_loading(self) -> None:
+        """Show the loading screen until the first screen is activated."""
+        if not self.loading_screen.is_set_up:
+            self._set_up(self.loading_screen, "loading")
+        self._loading_shown += 1
+
+    def activate(self, name: str) -> None:
+        """Make the named screen the current one, right away if it is set up, after loading otherwise."""
+        if name == self.current_name:
+            self._pending = None
+            return
+        if self[name].is_set_up:
+            self._pending = None
+            self._switch(name)
+        else:
+            self._request_assets(name)
+            self.show_loading()
+            self._pending = name
+
+    def preload(self, *names: str) -> None:
+        """Queue screens to be set up ahead of time."""
+        for name in names:
+            if not self[name].is_set_up and name not in self._preload:
+                self._request_assets(name)
+                self._preload.append(name)
+
+    def draw(self) -> None:
+        screen = self.displayed
+        if screen is not None:
+            screen.draw()
+        if screen is self.loading_screen:
+            self._loading_drawn = self._loading_shown
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        """Append the states of what draw() would draw."""
+        screen = self.displayed
+        if screen is not None:
+            screen.snapshot(items)
+
+    def loading_screen_drawn(self, shown: int) -> None:
+        """Note that a snapshot of the loading screen, taken when it was shown for the given time, was drawn."""
+        # A snapshot from before the loading screen was shown again doesn't count for the new time
+        self._loading_drawn = max(self._loading_drawn, shown)
+
+    def update(self, delta_time: float) -> None:
+        self._clock += delta_time
+        if self._pending is not None:
+            assets = self._asset_groups[self._pending]
+            if hasattr(self.loading_screen, "progress"):
+                self.loading_screen.progress = assets.progress  # type: ignore
+            # Set the screen up once its assets are there and the loading screen has been shown
+            if self.loading_drawn and assets.done:
+                name, self._pending = self._pending, None
+                self._set_up(self.screens[name], name)
+                self._switch(name)
+        else:
+            for name in self._preload:
+                if self._asset_groups[name].done:
+                    self._set_up(self.screens[name], name)
+                    break
+        self._release_inactive()
+        if self.current is not None and not self.is_loading:
+            self.current.update(delta_time)
+
+    def _request_assets(self, name: str) -> None:
+        if name not in self._asset_groups:
+            self._asset_groups[name] = self.assets.request(self[name].assets)
+
+    def _set_up(self, screen: Screen, name: str) -> None:
+        start = time.perf_counter()
+        with profiler.span("setup:" + name, "setup"):
+            screen.setup(self.width, self.height)
+        self.setup_times[name] = time.perf_counter() - start
+        screen.is_set_up = True
+        if name in self._preload:
+            self._preload.remove(name)
+
+    def _switch(self, name: str) -> None:
+        previous = self.current
+        if previous is not None:
+            previous.on_exit()
+            self._inactive_since[self.current_name] = self._clock  # type: ignore
+        self.current_name = name
+        self._inactive_since.pop(name, None)
+        self.screens[name].on_enter()
+
+    def _release_inactive(self) -> None:
+        if self.release_policy is ReleasePolicy.KEEP:
+            return
+        for name, since in list(self._inactive_since.items()):
+            if self._clock - since < self.release_after:
+                continue
+            del self._inactive_since[name]
+            screen = self.screens[name]
+            if not screen.is_set_up:
+                continue
+            with profiler.span("release:" + name, "setup"):
+                if self.release_policy is ReleasePolicy.TEARDOWN:
+                    screen.teardown()
+                else:
+                    screen.release_resources()
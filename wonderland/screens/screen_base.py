@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Tuple
 from abc import ABC, abstractmethod
 
 import arcade
@@ -10,8 +10,14 @@ class Screen(UIContainer, ABC):
     """
     Abstract base class for Wonderland screens.
 
+    Screens are set up by the ScreenManager the first time they are needed, once the images listed in
+    assets are loaded, and told when they become the current screen and when they stop being it.
+
     """
 
+    assets: Tuple[str, ...] = ()
+    is_set_up: bool = False
+
     @abstractmethod
     def setup(self, width: int, height: int) -> None:
         raise NotImplementedError
@@ -19,3 +25,15 @@ class Screen(UIContainer, ABC):
     @abstractmethod
     def update(self, delta_time: float) -> None:
         raise NotImplementedError
+
+    def on_enter(self) -> None:
+        """Called when the screen becomes the current screen."""
+
+    def on_exit(self) -> None:
+        """Called when another screen replaces this one."""
+
+    def teardown(self) -> None:
+        """Drop the UI elements created by setup(), so that the next activation sets the screen up again."""
+        self.release_resources()
+        self.ui_elements.clear()
+        self.is_set_up = False
@@ -0,0 +1,132 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+from wonderland.input import InputEvent, InputQueue
+from wonderland.profiling import profiler
+from wonderland.recording import InputRecorder
+from wonderland.ui.snapshots import Snapshot
+
+# Advances the game by the time of a tick, handling the input events that came in since the last one
+Step = Callable[[float, List[InputEvent]], None]
+# Takes a snapshot of the game after the tick with the given number
+Capture = Callable[[int], Snapshot]
+
+
+class SnapshotBuffer:
+    """
+    Hand snapshots from the simulation to the thread that draws them, two buffers deep.
+
+    A snapshot is written to the back buffer, which then becomes the front one. Snapshots are immutable
+    and only published once they are complete, so the drawing thread never sees one that is half
+    written, and reading the latest one takes no lock. The one before it is kept as previous.
+
+    """
+
+    def __init__(self) -> None:
+        self._buffers: List[Optional[Snapshot]] = [None, None]
+        self._front: int = 0
+
+    @property
+    def latest(self) -> Optional[Snapshot]:
+        return self._buffers[self._front]
+
+    @property
+    def previous(self) -> Optional[Snapshot]:
+        return self._buffers[1 - self._front]
+
+    def publish(self, snapshot: Snapshot) -> None:
+        back = 1 - self._front
+        self._buffers[back] = snapshot
+        self._front = back
+
+
+class Simulation:
+    """
+    Run the game logic in ticks, on the thread that draws the game or on a thread of its own.
+
+    Without start(), the owner calls step() itself, and everything happens on its thread in the order it
+    is called, so the game plays out the same way for the same input and times. start() moves the
+    ticks to a worker thread that steps at tick_rate, by the same fixed time every tick. After each
+    tick the worker publishes a snapshot, which is all the drawing thread looks at. Input crosses over
+    through input_queue: the window pushes events, the tick drains them.
+
+    With a recorder, every tick is logged with the input it handled, for replaying the session later.
+
+    A worker that falls more than max_lag seconds behind skips the ticks it missed instead of running
+    them back to back. An exception on the worker stops it, and check() raises it on the drawing thread.
+
+    """
+
+    def __init__(
+        self, step: Step, capture: Optional[Capture] = None, tick_rate: float = 60.0, max_lag: float = 0.25
+    ) -> None:
+        self._step: Step = step
+        self._capture: Optional[Capture] = capture
+        self.tick_rate: float = tick_rate
+        self.max_lag: float = max_lag
+        self.input_queue: InputQueue = InputQueue()
+        self.snapshots: SnapshotBuffer = SnapshotBuffer()
+        self.tick: int = 0
+        self.error: Optional[BaseException] = None
+        self.recorder: Optional[InputRecorder] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping: threading.Event = threading.Event()
+
+    @property
+    def tick_time(self) -> float:
+        return 1 / self.tick_rate
+
+    @property
+    def threaded(self) -> bool:
+        return self._thread is not None
+
+    def step(self, delta_time: Optional[float] = None) -> None:
+        """Run a tick of delta_time seconds, tick_time by default, and publish its snapshot."""
+        delta_time = self.tick_time if delta_time is None else delta_time
+        events = self.input_queue.drain()
+        self._step(delta_time, events)
+        # Logged after the tick, so a recorder attached during it gets the tick as its first frame
+        if self.recorder is not None:
+            self.recorder.record(delta_time, events)
+        self.tick += 1
+        if self._capture is not None:
+            with profiler.span("capture", "update"):
+                self.snapshots.publish(self._capture(self.tick))
+
+    def start(self) -> None:
+        """Run the ticks on a worker thread from now on."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="wonderland-simulation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the worker after the tick it is in, the owner steps the simulation again afterwards."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def check(self) -> None:
+        """Raise the exception that stopped the worker, if one did."""
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("The simulation thread failed") from error
+
+    def _run(self) -> None:
+        next_tick = time.perf_counter()
+        while not self._stopping.is_set():
+            try:
+                self.step()
+            except BaseException as error:
+                self.error = error
+                return
+            next_tick += self.tick_time
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self._stopping.wait(delay)
+            elif delay < -self.max_lag:
+                next_tick = time.perf_counter()
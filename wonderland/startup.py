@@ -0,0 +1,135 @@
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+
+class StartupProfile:
+    """
+    Time what happens between launching the game and it showing its first screen.
+
+    The profile records how long the phases of startup took, how long each screen took to set up,
+    and when the first frame was drawn, which shows the loading screen, and when the first frame
+    showing a screen was. Imports are timed from install() on by wrapping __import__: each module is
+    given the time its own code took, without the modules it imported in turn. Modules imported
+    through importlib.import_module() count towards the module that imported them, and submodules
+    imported with "from package import module" towards the package. Imports on other threads, like the
+    ones decoding images, aren't timed.
+
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock: Callable[[], float] = clock
+        self.start: float = clock()
+        # Seconds each module took to import, without the modules it imported
+        self.imports: Dict[str, float] = OrderedDict()
+        self.phases: Dict[str, float] = OrderedDict()
+        self.setup_times: Dict[str, float] = OrderedDict()
+        # Seconds since the profile was created
+        self.first_frame: Optional[float] = None
+        self.first_screen: Optional[float] = None
+        self._import: Optional[Callable[..., Any]] = None
+        # Only imports on the thread that installed the profile are timed
+        self._thread: Optional[int] = None
+        # For each import in progress, the time spent in the imports it made
+        self._nested: List[float] = list()
+
+    @property
+    def complete(self) -> bool:
+        return self.first_screen is not None
+
+    def install(self) -> None:
+        """Time the imports from now on, until the first screen is drawn."""
+        if self._import is None:
+            self._thread = threading.get_ident()
+            self._import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.phases[name] = self._clock() - start
+
+    def frame_drawn(self, screen_shown: bool, setup_times: Optional[Dict[str, float]] = None) -> bool:
+        """Note that a frame was drawn, returns whether it was the first one showing a screen."""
+        now = self._clock() - self.start
+        if self.first_frame is None:
+            self.first_frame = now
+        if not screen_shown or self.first_screen is not None:
+            return False
+        self.first_screen = now
+        if setup_times is not None:
+            self.setup_times.update(setup_times)
+        self.uninstall()
+        return True
+
+    def slowest_imports(self, count: int = 15) -> List[str]:
+        return sorted(self.imports, key=self.imports.__getitem__, reverse=True)[:count]
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "first_frame": self.first_frame,
+            "first_screen": self.first_screen,
+            "phases": dict(self.phases),
+            "setup": dict(self.setup_times),
+            "imports": dict(self.imports),
+        }
+
+    def format(self, imports: int = 15) -> str:
+        lines = ["Startup, in ms since launch"]
+        for name, value in (("first frame", self.first_frame), ("first screen", self.first_screen)):
+            lines.append("  {:<40} {:>8}".format(name, "-" if value is None else "{:.1f}".format(value * 1000)))
+        for title, times in (("Phases", self.phases), ("Screen setup", self.setup_times)):
+            lines.append(title)
+            lines.extend("  {:<40} {:>8.1f}".format(name, seconds * 1000) for name, seconds in times.items())
+        lines.append(
+            "Slowest of {} imports, {:.1f} ms in total".format(len(self.imports), sum(self.imports.values()) * 1000)
+        )
+        lines.extend(
+            "  {:<40} {:>8.1f}".format(name, self.imports[name] * 1000) for name in self.slowest_imports(imports)
+        )
+        return "\n".join(lines)
+
+    def _timed_import(
+        self,
+        name: str,
+        globals: Optional[Mapping[str, object]] = None,
+        locals: Optional[Mapping[str, object]] = None,
+        fromlist: Optional[Sequence[str]] = (),
+        level: int = 0,
+    ) -> types.ModuleType:
+        original = self._import or builtins.__import__
+        if (not level and not fromlist and name in sys.modules) or threading.get_ident() != self._thread:
+            return original(name, globals, locals, fromlist, level)
+        if level:
+            name = importlib.util.resolve_name("." * level + name, str((globals or {}).get("__package__") or ""))
+            level = 0
+        loaded = name in sys.modules
+        # Names taken from a loaded package only import something if they are submodules that aren't loaded yet
+        missing = [
+            name + "." + item for item in fromlist or () if item != "*" and name + "." + item not in sys.modules
+        ]
+        start = self._clock()
+        self._nested.append(0.0)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = self._clock() - start
+            nested = self._nested.pop()
+            if not loaded or any(submodule in sys.modules for submodule in missing):
+                if self._nested:
+                    self._nested[-1] += elapsed
+                self.imports[name] = self.imports.get(name, 0.0) + elapsed - nested
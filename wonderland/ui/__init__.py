@@ -1,4 +1,32 @@
-from wonderland.ui.cards import Card, CardRow, CardType
-from wonderland.ui.words import Word, WordCloud
-from wonderland.ui.buttons import Button, ButtonChooser
-from wonderland.ui.ui_element_base import UIElement, UIContainer, Rectangle, Clickable, Hoverable
+from typing import TYPE_CHECKING
+
+from wonderland.lazy import export_lazily
+
+# Widgets pull in Pillow, numpy and the model, so they are only imported once something uses them
+export_lazily(
+    globals(),
+    {
+        "wonderland.ui.cards": ("Card", "CardIndex", "CardRow", "CardType", "card_index"),
+        "wonderland.ui.words": ("Word", "WordCloud"),
+        "wonderland.ui.buttons": ("Button", "ButtonChooser"),
+        "wonderland.ui.ui_element_base": ("UIElement", "UIContainer", "Rectangle", "Clickable", "Hoverable"),
+        "wonderland.ui.textures": ("TextureCache", "texture_cache"),
+        "wonderland.ui.labels": ("Label", "LabelCache", "label_cache", "draw_label"),
+        "wonderland.ui.faces": ("CardFaceCache", "card_faces"),
+        "wonderland.ui.metrics": ("FontMetrics", "FontMetricsCache", "font_metrics"),
+        "wonderland.ui.animation": ("Animator", "animator"),
+        "wonderland.ui.snapshots": ("LabelState", "Snapshot", "SnapshotRenderer", "SpriteState"),
+    },
+)
+
+if TYPE_CHECKING:
+    from wonderland.ui.cards import Card, CardIndex, CardRow, CardType, card_index  # noqa: F401
+    from wonderland.ui.words import Word, WordCloud  # noqa: F401
+    from wonderland.ui.buttons import Button, ButtonChooser  # noqa: F401
+    from wonderland.ui.ui_element_base import UIElement, UIContainer, Rectangle, Clickable, Hoverable  # noqa: F401
+    from wonderland.ui.textures import TextureCache, texture_cache  # noqa: F401
+    from wonderland.ui.labels import Label, LabelCache, label_cache, draw_label  # noqa: F401
+    from wonderland.ui.faces import CardFaceCache, card_faces  # noqa: F401
+    from wonderland.ui.metrics import FontMetrics, FontMetricsCache, font_metrics  # noqa: F401
+    from wonderland.ui.animation import Animator, animator  # noqa: F401
+    from wonderland.ui.snapshots import LabelState, Snapshot, SnapshotRenderer, SpriteState  # noqa: F401
@@ -0,0 +1,233 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy
+
+Easing = Callable[[numpy.ndarray], numpy.ndarray]
+# (tween id, target, attribute, end value, duration, easing, delay)
+TweenSpec = Tuple[int, Any, str, float, float, str, float]
+
+
+def _ease_in_out_quad(t: numpy.ndarray) -> numpy.ndarray:
+    return numpy.where(t < 0.5, 2 * t * t, 1 - (2 - 2 * t) ** 2 / 2)
+
+
+def _ease_out_back(t: numpy.ndarray) -> numpy.ndarray:
+    overshoot = 1.70158
+    return 1 + (overshoot + 1) * (t - 1) ** 3 + overshoot * (t - 1) ** 2
+
+
+# Map progress through a tween, from 0 to 1, to how far the value has moved from start to end
+EASINGS: Dict[str, Easing] = {
+    "linear": lambda t: t,
+    "ease_in_quad": lambda t: t * t,
+    "ease_out_quad": lambda t: t * (2 - t),
+    "ease_in_out_quad": _ease_in_out_quad,
+    "ease_out_cubic": lambda t: 1 - (1 - t) ** 3,
+    "ease_out_back": _ease_out_back,
+}
+_EASING_NAMES: List[str] = list(EASINGS)
+
+
+class Animator:
+    """
+    Tween numeric attributes, like center_x, center_y, scale, alpha or angle, of UI elements over time.
+
+    The running tweens are packed into parallel NumPy arrays, so advancing all of them is a handful of
+    vectorized operations no matter how many there are. Time advances in fixed steps, which keeps
+    animations the same regardless of the frame rate, and the values are written back once per update(),
+    only for tweens past their delay. A new tween of an attribute that is already animated replaces the
+    running one.
+
+    At most max_tweens run at the same time: starting one more completes the oldest immediately. After a
+    hitch, at most max_steps time steps are caught up on.
+
+    """
+
+    def __init__(self, timestep: float = 1 / 120, max_steps: int = 8, max_tweens: int = 1024) -> None:
+        self.timestep: float = timestep
+        self.max_steps: int = max_steps
+        self.max_tweens: int = max_tweens
+        self._accumulator: float = 0.0
+        self._next_id: int = 1
+        # Slots 0 to _count - 1 of the arrays and lists hold the running tweens
+        self._count: int = 0
+        self._ids: numpy.ndarray = numpy.zeros(64, dtype=numpy.int64)
+        self._start: numpy.ndarray = numpy.zeros(64)
+        self._end: numpy.ndarray = numpy.zeros(64)
+        self._elapsed: numpy.ndarray = numpy.zeros(64)
+        self._duration: numpy.ndarray = numpy.ones(64)
+        self._easing: numpy.ndarray = numpy.zeros(64, dtype=numpy.int8)
+        self._targets: List[Any] = list()
+        self._attributes: List[str] = list()
+        self._slot_of_id: Dict[int, int] = dict()
+        self._slot_of_attribute: Dict[Tuple[Any, str], int] = dict()
+        # Tweens waiting for another one to complete, by the id of the one they wait for
+        self._chained: Dict[int, List[TweenSpec]] = dict()
+        self._waiting: Dict[int, int] = dict()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def animate(
+        self,
+        target: Any,
+        attribute: str,
+        end: float,
+        duration: float,
+        easing: str = "ease_out_quad",
+        delay: float = 0.0,
+        after: Optional[int] = None,
+    ) -> int:
+        """
+        Tween target.attribute from its current value to end and return the tween's id.
+
+        A delayed tween starts from the value the attribute has once its delay is over. A tween chained
+        after another one starts, from the value the attribute has then, once the other one completes. It is
+        dropped if the other one gets cancelled.
+
+        """
+        if easing not in EASINGS:
+            raise ValueError("Unknown easing '{}', use one of {}".format(easing, ", ".join(EASINGS)))
+        tween_id = self._next_id
+        self._next_id += 1
+        spec = (tween_id, target, attribute, float(end), duration, easing, delay)
+        if after is not None and self.is_running(after):
+            self._chained.setdefault(after, list()).append(spec)
+            self._waiting[tween_id] = after
+        else:
+            self._start_tween(spec)
+        return tween_id
+
+    def is_running(self, tween_id: int) -> bool:
+        """Whether the tween is running or waiting for the tween it is chained after."""
+        return tween_id in self._slot_of_id or tween_id in self._waiting
+
+    def cancel(self, tween_id: int) -> None:
+        """Stop a tween where it is, along with the tweens chained after it."""
+        slot = self._slot_of_id.get(tween_id)
+        if slot is not None:
+            self._finish(slot, completed=False)
+        elif tween_id in self._waiting:
+            after = self._waiting.pop(tween_id)
+            self._chained[after] = [spec for spec in self._chained[after] if spec[0] != tween_id]
+            self._drop_chain(tween_id)
+
+    def cancel_all(self, target: Any) -> None:
+        for tween_id in [self._ids[slot] for slot in range(self._count) if self._targets[slot] is target]:
+            self.cancel(int(tween_id))
+        for specs in list(self._chained.values()):
+            for spec in specs:
+                if spec[1] is target:
+                    self.cancel(spec[0])
+
+    def clear(self) -> None:
+        self._count = 0
+        self._targets.clear()
+        self._attributes.clear()
+        self._slot_of_id.clear()
+        self._slot_of_attribute.clear()
+        self._chained.clear()
+        self._waiting.clear()
+
+    def update(self, delta_time: float) -> None:
+        """Advance time by delta_time, in whole time steps, and write the animated values back."""
+        self._accumulator += delta_time
+        steps = int(self._accumulator / self.timestep)
+        self._accumulator -= steps * self.timestep
+        if steps == 0 or self._count == 0:
+            return
+        count = self._count
+        elapsed = self._elapsed[:count]
+        delayed = elapsed < 0
+        elapsed += min(steps, self.max_steps) * self.timestep
+        # Delayed tweens start from the value their attribute has when the delay is over, not when they were made
+        for slot in numpy.flatnonzero(delayed & (elapsed >= 0)).tolist():
+            self._start[slot] = getattr(self._targets[slot], self._attributes[slot])
+        progress = numpy.clip(elapsed / self._duration[:count], 0.0, 1.0)
+        eased = numpy.empty(count)
+        easing = self._easing[:count]
+        for code in numpy.unique(easing):
+            selected = easing == code
+            eased[selected] = EASINGS[_EASING_NAMES[code]](progress[selected])
+        values = self._start[:count] + (self._end[:count] - self._start[:count]) * eased
+        self._write_back(numpy.flatnonzero(elapsed >= 0).tolist(), values)
+        # Completing a tween can start others and move tweens around the slots
+        for tween_id in self._ids[:count][progress >= 1.0].tolist():
+            slot = self._slot_of_id.get(tween_id)
+            if slot is not None:
+                self._finish(slot, completed=True)
+
+    def _write_back(self, slots: List[int], values: numpy.ndarray) -> None:
+        positions: Dict[Any, List[float]] = dict()
+        for slot, value in zip(slots, values[slots].tolist()):
+            target = self._targets[slot]
+            attribute = self._attributes[slot]
+            if attribute in ("center_x", "center_y") and hasattr(target, "move_to"):
+                # Both coordinates of an element are set together, so it reports a single move
+                if target not in positions:
+                    positions[target] = [target.center_x, target.center_y]
+                positions[target][attribute == "center_y"] = value
+            else:
+                setattr(target, attribute, value)
+        for target, (center_x, center_y) in positions.items():
+            target.move_to(center_x, center_y)
+
+    def _start_tween(self, spec: TweenSpec) -> None:
+        tween_id, target, attribute, end, duration, easing, delay = spec
+        replaced = self._slot_of_attribute.get((target, attribute))
+        if replaced is not None:
+            self._finish(replaced, completed=False)
+        if self._count >= self.max_tweens:
+            oldest = int(numpy.argmin(self._ids[: self._count]))
+            setattr(self._targets[oldest], self._attributes[oldest], float(self._end[oldest]))
+            self._finish(oldest, completed=True)
+        if self._count == len(self._ids):
+            self._grow()
+        slot = self._count
+        self._count += 1
+        self._ids[slot] = tween_id
+        self._start[slot] = getattr(target, attribute)
+        self._end[slot] = end
+        self._elapsed[slot] = -delay
+        self._duration[slot] = max(duration, 1e-9)
+        self._easing[slot] = _EASING_NAMES.index(easing)
+        self._targets.append(target)
+        self._attributes.append(attribute)
+        self._slot_of_id[tween_id] = slot
+        self._slot_of_attribute[(target, attribute)] = slot
+
+    def _finish(self, slot: int, completed: bool) -> None:
+        tween_id = int(self._ids[slot])
+        del self._slot_of_id[tween_id]
+        del self._slot_of_attribute[(self._targets[slot], self._attributes[slot])]
+        last = self._count - 1
+        if slot != last:
+            # Move the last tween into the freed slot to keep the arrays packed
+            for array in (self._ids, self._start, self._end, self._elapsed, self._duration, self._easing):
+                array[slot] = array[last]
+            self._targets[slot] = self._targets[last]
+            self._attributes[slot] = self._attributes[last]
+            self._slot_of_id[int(self._ids[slot])] = slot
+            self._slot_of_attribute[(self._targets[slot], self._attributes[slot])] = slot
+        self._targets.pop()
+        self._attributes.pop()
+        self._count = last
+        if completed:
+            for spec in self._chained.pop(tween_id, ()):
+                del self._waiting[spec[0]]
+                self._start_tween(spec)
+        else:
+            self._drop_chain(tween_id)
+
+    def _drop_chain(self, tween_id: int) -> None:
+        for spec in self._chained.pop(tween_id, ()):
+            del self._waiting[spec[0]]
+            self._drop_chain(spec[0])
+
+    def _grow(self) -> None:
+        for name in ("_ids", "_start", "_end", "_elapsed", "_duration", "_easing"):
+            array = getattr(self, name)
+            setattr(self, name, numpy.concatenate([array, numpy.zeros_like(array)]))
+
+
+animator: Animator = Animator()
@@ -1,9 +1,12 @@
 from enum import Enum
-from typing import Dict, List, Callable, Optional, Any
+from typing import Dict, List, Callable, Optional, Any, Tuple
 
 import arcade
 
 from wonderland.ui.config import FONT
+from wonderland.ui.metrics import font_metrics
+from wonderland.ui.snapshots import DrawState, LabelState, SpriteState
+from wonderland.ui.sprites import release_sprite_list, remove_sprite, solid_texture
 from wonderland.ui.ui_element_base import UIElement, UIContainer, Clickable, Hoverable, Rectangle
 
 
@@ -22,6 +25,8 @@ class Button(UIElement, Rectangle, Clickable, Hoverable):
 
     font: str = FONT
     font_size: int = 16
+    # Space between the text and the edges of a button that is sized to fit its text
+    padding: Tuple[float, float] = (10.0, 3.0)
     color: Dict[ButtonState, Dict[str, arcade.arcade_types.Color]] = {
         ButtonState.NORMAL: {
             "text": arcade.color.BLACK,
@@ -56,40 +61,75 @@ class Button(UIElement, Rectangle, Clickable, Hoverable):
         on_click: Callable[[], None] = None,
     ) -> None:
         self.text: str = text
-        self.center_x = center_x
-        self.center_y = center_y
-        self.width = width if width is not None else len(text) * scale * self.font_size * 0.6
-        self.height = height if height is not None else scale * self.font_size * 1.4
-        self.scale: float = scale
+        self._center_x: float = center_x
+        self._center_y: float = center_y
+        text_width, text_height = font_metrics.text_size(text, self.font, self.font_size)
+        self._width: float = width if width is not None else (text_width + 2 * self.padding[0]) * scale
+        self._height: float = height if height is not None else (text_height + 2 * self.padding[1]) * scale
+        self._scale: float = scale
         self._on_click: Callable[[], None] = on_click if on_click is not None else lambda: None
-        self.state: ButtonState = ButtonState.NORMAL
-        self.background: Dict[ButtonState, arcade.ShapeElementList] = {
-            state: arcade.ShapeElementList() for state in ButtonState
-        }
-        for state in ButtonState:
-            self.background[state].append(
-                arcade.create_rectangle_filled(
-                    center_x=center_x,
-                    center_y=center_y,
-                    width=self.width,
-                    height=self.height,
-                    color=self.color[state]["background"],
-                )
-            )
-            self.background[state].append(
-                arcade.create_rectangle_outline(
-                    center_x=center_x,
-                    center_y=center_y,
-                    width=self.width,
-                    height=self.height,
-                    color=self.color[state]["outline"],
-                    border_width=2.0 * self.scale,
-                )
-            )
+        self._state: ButtonState = ButtonState.NORMAL
+        # The background is drawn as two tinted sprites, the outline behind the filled rectangle
+        self.outline: arcade.Sprite = arcade.Sprite()
+        self.background: arcade.Sprite = arcade.Sprite()
+        for sprite in self.sprites:
+            sprite.texture = solid_texture()
+        self._place_sprites()
+        self._color_sprites()
+        # Sprite list the button draws itself with while it isn't part of a ButtonBatch
+        self.sprite_list: arcade.SpriteList = arcade.SpriteList()
+        for sprite in self.sprites:
+            self.sprite_list.append(sprite)
+        self.batch: Optional[ButtonBatch] = None
+
+    @property
+    def sprites(self) -> Tuple[arcade.Sprite, arcade.Sprite]:
+        return self.outline, self.background
+
+    @property
+    def state(self) -> ButtonState:
+        return self._state
+
+    @state.setter
+    def state(self, value: ButtonState) -> None:
+        if value is not self._state:
+            self._state = value
+            self._color_sprites()
+            self.mark_changed()
+
+    def _place_sprites(self) -> None:
+        border_width = 2.0 * self.scale
+        # The border is centered on the edge of the button, like the lines of a rectangle outline
+        for sprite, grow in ((self.outline, border_width), (self.background, -border_width)):
+            sprite.position = (self.center_x, self.center_y)
+            sprite.width = max(self.width + grow, 0.0)
+            sprite.height = max(self.height + grow, 0.0)
+
+    def _color_sprites(self) -> None:
+        self.outline.color = self.color[self.state]["outline"][:3]
+        self.background.color = self.color[self.state]["background"][:3]
+
+    def _geometry_changed(self) -> None:
+        self._place_sprites()
+        super()._geometry_changed()
+
+    def release_resources(self) -> None:
+        release_sprite_list(self.sprite_list)
 
     def draw(self) -> None:
-        self.background[self.state].draw()
-        arcade.draw_text(
+        if self.batch is None:
+            self.sprite_list.draw()
+        self.draw_text()
+
+    def draw_text(self) -> None:
+        self.label_state().draw()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        items.extend(SpriteState.of(sprite) for sprite in self.sprites)
+        items.append(self.label_state())
+
+    def label_state(self) -> LabelState:
+        return LabelState(
             text=self.text,
             start_x=self.center_x,
             start_y=self.center_y,
@@ -121,11 +161,65 @@ class Button(UIElement, Rectangle, Clickable, Hoverable):
         if not (self.state == ButtonState.INACTIVE or self.state == ButtonState.PRESSED):
             self.state = ButtonState.HOVER
 
+    def on_hover_stay(self):
+        # A click can leave the button NORMAL while the mouse is still on it
+        self.on_hover()
+
     def on_hover_end(self):
         if self.state == ButtonState.HOVER:
             self.state = ButtonState.NORMAL
 
 
+class ButtonBatch:
+    """
+    Draw the backgrounds of many buttons from one shared sprite list.
+
+    The sprites stay in place in the list's vertex buffer: a change of state only rewrites the colors
+    of the button's sprites, and moving or resizing it only their positions and sizes, so all of the
+    backgrounds take a single draw call.
+
+    """
+
+    def __init__(self) -> None:
+        self.sprite_list: arcade.SpriteList = arcade.SpriteList()
+        self._buttons: List[Button] = list()
+
+    def __len__(self) -> int:
+        return len(self._buttons)
+
+    def __contains__(self, button: Button) -> bool:
+        return button in self._buttons
+
+    def add(self, button: Button) -> None:
+        if button.batch is not None:
+            button.batch.remove(button)
+        for sprite in button.sprites:
+            remove_sprite(button.sprite_list, sprite)
+            self.sprite_list.append(sprite)
+        button.batch = self
+        self._buttons.append(button)
+
+    def remove(self, button: Button) -> None:
+        self._buttons.remove(button)
+        button.batch = None
+        for sprite in button.sprites:
+            remove_sprite(self.sprite_list, sprite)
+            button.sprite_list.append(sprite)
+
+    def release(self) -> None:
+        release_sprite_list(self.sprite_list)
+
+    def draw(self) -> None:
+        self.sprite_list.draw()
+        for button in self._buttons:
+            button.draw_text()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        """Append the states of the buttons, in the order draw() draws them."""
+        items.extend(SpriteState.of(sprite) for sprite in self.sprite_list)
+        items.extend(button.label_state() for button in self._buttons)
+
+
 class ButtonChooser(UIContainer):
     def __init__(
         self,
@@ -141,6 +235,7 @@ class ButtonChooser(UIContainer):
         self._choice_taken: bool = False
         self._choice: Any = None
         self.buttons: List[Button] = list()
+        self.batch: ButtonBatch = ButtonBatch()
         for i, (text, option) in enumerate(options.items()):
             button = Button(
                 text=text,
@@ -151,8 +246,19 @@ class ButtonChooser(UIContainer):
             )
             self._assign_on_click(button, option)
             self.buttons.append(button)
+            self.batch.add(button)
             self.ui_elements.append(button)
 
+    def release_resources(self) -> None:
+        super().release_resources()
+        self.batch.release()
+
+    def draw(self) -> None:
+        self.batch.draw()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        self.batch.snapshot(items)
+
     @property
     def choice_taken(self) -> bool:
         return self._choice_taken
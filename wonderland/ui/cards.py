@@ -1,11 +1,25 @@
+import bisect
+import hashlib
 import os
-from typing import List
+import weakref
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from enum import Enum
 
 import arcade
+import PIL.Image
 
 from wonderland.ui.ui_element_base import UIElement, UIContainer, Clickable, Hoverable, Rectangle
+from wonderland.ui.animation import animator
+from wonderland.ui.faces import card_faces
+from wonderland.ui.labels import render_label
+from wonderland.ui.metrics import font_metrics
+from wonderland.ui.snapshots import DrawState, SpriteState
+from wonderland.ui.sprites import insert_sprites, keep_sprites, release_sprite_list, remove_sprite
+from wonderland.ui.textures import TextureKey, texture_cache
+from wonderland.assets import scale_image
 from wonderland.config import RESOURCE_PATH
+from wonderland.model import CardRecord, EntityRecord, EntityStore, EntityType, WordIndex, entity_words
 from wonderland.ui.config import FONT
 
 
@@ -21,15 +35,47 @@ CARD_TYPE_ICONS = {
     CardType.THING: os.path.join(RESOURCE_PATH, "icons/lorc/hand.png"),
 }
 
+CARD_BACKGROUND: str = os.path.join(RESOURCE_PATH, "card_background.png")
+
+# Images a screen showing cards has to load
+CARD_ASSETS: Tuple[str, ...] = (CARD_BACKGROUND,) + tuple(CARD_TYPE_ICONS.values())
+
+# Part of the key of every card face, to be increased whenever faces are composed differently
+CARD_FACE_VERSION: int = 1
+
+
+@lru_cache(maxsize=None)
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
 
 class Card(UIElement, Rectangle, Clickable, Hoverable):
     """
     Represent a game world entity as a card with image and text content.
 
+    The background, type icon and texts of a card are composed into a single face texture, so drawing a
+    card is one textured quad. Faces are composed at the smallest of the face_resolutions at or above
+    the card's scale, from the closest variants of the images, so small cards don't sample large images
+    and large previews aren't upscaled. They are shared through the card face cache with every card that
+    looks the same. Changing the texts or type of a card, or scaling it past the resolution of its face,
+    composes the face again the next time the card is drawn. Until then the card shows its plain
+    background.
+
     """
 
     title_color: arcade.arcade_types.Color = arcade.color.BLACK
     title_font: str = FONT
+    title_font_size: int = 14
+    subtitle_font_size: int = 10
+    # Space kept free on both sides of the texts, which are drawn smaller if they don't fit otherwise
+    text_margin: float = 12.0
+    # Tint of the face of a highlighted card
+    highlight_color: arcade.arcade_types.Color = arcade.color.PALE_GOLDENROD
+    # Scales faces are composed at, the largest one is about where the background image runs out of pixels
+    face_resolutions: Tuple[float, ...] = (0.5, 1.0, 2.0, 3.0)
+    # Id of the EntityStore record the card shows, if it was created from one
+    entity_id: Optional[int] = None
 
     def __init__(
         self,
@@ -41,29 +87,94 @@ class Card(UIElement, Rectangle, Clickable, Hoverable):
         scale: float = 1.0,
     ) -> None:
         self._card_type = card_type
-        self.title: str = title
-        self.subtitle: str = subtitle
+        self._title: str = title
+        self._subtitle: str = subtitle
         self._center_x: float = center_x
         self._center_y: float = center_y
         self._scale: float = scale
-        self.background: arcade.Sprite = arcade.Sprite(
-            filename=os.path.join(RESOURCE_PATH, "card_background.png"),
-            scale=self.scale * 0.3,
-            center_x=center_x,
-            center_y=center_y,
-        )
-        self.type_icon: arcade.Sprite = arcade.Sprite(
-            filename=CARD_TYPE_ICONS[card_type],
-            scale=self.scale * 0.04,
-            center_x=center_x - self.background.width / 2 + self.scale * 22,
-            center_y=center_y + self.background.height / 2 - self.scale * 24,
-        )
-        self.type_icon.alpha = 190
+        # Keys of the textures held by this card, handed back to the cache once the card is garbage collected
+        self._texture_keys: List[TextureKey] = list()
+        weakref.finalize(self, texture_cache.release_all, self._texture_keys)
+        # The plain background stands in for the face until it is composed
+        self._background_scale: float = texture_cache.closest_scale(0.3 * scale)
+        self._background_texture: arcade.Texture = self._acquire_texture(CARD_BACKGROUND, self._background_scale)
+        self.face: arcade.Sprite = arcade.Sprite(center_x=center_x, center_y=center_y)
+        self.face.texture = self._background_texture
+        # Scale of the face sprite relative to the card's, which depends on the resolution of its texture
+        self._face_scale: float = 0.3 / self._background_scale
+        self.face.scale = scale * self._face_scale
+        self._face_resolution: Optional[float] = None
+        self._face_stale: bool = True
+        # Sprite list the card draws itself with while it isn't part of a CardBatch
         self.sprite_list: arcade.SpriteList = arcade.SpriteList()
-        self.sprite_list.center_x = center_x
-        self.sprite_list.center_y = center_y
-        self.sprite_list.append(self.background)
-        self.sprite_list.append(self.type_icon)
+        self.sprite_list.append(self.face)
+        self.batch: Optional[CardBatch] = None
+        self._highlighted: bool = False
+
+    @classmethod
+    def from_record(
+        cls,
+        record: Union[EntityRecord, CardRecord],
+        center_x: float = 0.0,
+        center_y: float = 0.0,
+        scale: float = 1.0,
+    ) -> "Card":
+        """
+        Create a card from a saved CardRecord, or one showing an entity of the world, subtitled with its
+        archetype or type.
+
+        """
+        if isinstance(record, CardRecord):
+            title, subtitle, entity_id = record.title, record.subtitle, record.entity_id
+        else:
+            title, subtitle, entity_id = record.name, record.archetype or record.type.name.title(), record.id
+        card = cls(CardType[record.type.name], title, subtitle, center_x=center_x, center_y=center_y, scale=scale)
+        card.entity_id = entity_id
+        return card
+
+    def to_record(self) -> CardRecord:
+        return CardRecord(EntityType[self.card_type.name], self.title, self.subtitle, self.entity_id)
+
+    @property
+    def sprites(self) -> Tuple[arcade.Sprite]:
+        return (self.face,)
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, value: str) -> None:
+        if value != self._title:
+            self._title = value
+            card_index.update(self)
+            self._invalidate_face()
+
+    @property
+    def subtitle(self) -> str:
+        return self._subtitle
+
+    @subtitle.setter
+    def subtitle(self, value: str) -> None:
+        if value != self._subtitle:
+            self._subtitle = value
+            card_index.update(self)
+            self._invalidate_face()
+
+    @property
+    def _subtitle_text(self) -> str:
+        return "~ " + self.subtitle + " ~"
+
+    @property
+    def highlighted(self) -> bool:
+        return self._highlighted
+
+    @highlighted.setter
+    def highlighted(self, value: bool) -> None:
+        if value != self._highlighted:
+            self._highlighted = value
+            self.face.color = self.highlight_color if value else arcade.color.WHITE
+            self.mark_changed()
 
     @property
     def card_type(self) -> CardType:
@@ -71,34 +182,118 @@ class Card(UIElement, Rectangle, Clickable, Hoverable):
 
     @card_type.setter
     def card_type(self, value: CardType) -> None:
+        if value is self._card_type:
+            return
         self._card_type = value
-        self.type_icon.kill()
-        self.type_icon = arcade.Sprite(
-            filename=CARD_TYPE_ICONS[self._card_type],
-            scale=self.scale * 0.04,
-            center_x=self.center_x - self.background.width / 2 + self.scale * 22,
-            center_y=self.center_y + self.background.height / 2 - self.scale * 24,
+        self._invalidate_face()
+
+    @property
+    def face_resolution(self) -> float:
+        """The scale the face of the card is composed at, for the card's current scale."""
+        for resolution in self.face_resolutions:
+            if resolution >= self.scale:
+                return resolution
+        return self.face_resolutions[-1]
+
+    @property
+    def face_key(self) -> str:
+        """Hash of everything the face of the card is composed from, at the current resolution."""
+        content = (
+            CARD_FACE_VERSION,
+            self.face_resolution,
+            self.card_type.name,
+            self.title,
+            self.subtitle,
+            self.title_font,
+            self.title_font_size,
+            self.subtitle_font_size,
+            tuple(self.title_color),
+            self.text_margin,
+            _file_digest(CARD_BACKGROUND),
+            _file_digest(CARD_TYPE_ICONS[self.card_type]),
         )
-        self.type_icon.alpha = 190
-        self.sprite_list.append(self.type_icon)
+        return hashlib.sha1(repr(content).encode("utf-8")).hexdigest()
+
+    def update_face(self) -> None:
+        """Give the card the face it should have, if it changed since it was last drawn."""
+        if not self._face_stale:
+            return
+        resolution = self.face_resolution
+        self.face.texture = card_faces.get(self.face_key, lambda: self.compose_face(resolution))
+        self._face_resolution = resolution
+        self._face_scale = 1 / resolution
+        self.face.scale = self.scale * self._face_scale
+        self._face_stale = False
+
+    def compose_face(self, resolution: float) -> PIL.Image.Image:
+        """Draw the background, type icon and texts of the card into one image, at a scale of resolution."""
+        face = self._scaled_image(CARD_BACKGROUND, 0.3 * resolution)
+        width = face.width
+        icon = self._scaled_image(CARD_TYPE_ICONS[self.card_type], 0.04 * resolution)
+        icon.putalpha(icon.getchannel("A").point(lambda alpha: alpha * 190 // 255))
+        icon_center = (22 * resolution, 24 * resolution)
+        face.alpha_composite(icon, (round(icon_center[0] - icon.width / 2), round(icon_center[1] - icon.height / 2)))
+        # The labels draw_label would show, with their baselines 30 and 42 pixels below the top at scale 1
+        for text, font_size, italic, baseline in (
+            (self.title, self.title_font_size, False, 30),
+            (self._subtitle_text, self.subtitle_font_size, True, 42),
+        ):
+            font_size = self._fitted_font_size(text, font_size, italic, resolution)
+            label = render_label((text, self.title_font, font_size, tuple(self.title_color), italic, "center", width))
+            image = label.texture.image
+            face.paste(image, (0, round(baseline * resolution - image.height)), image)
+        return face
+
+    def _invalidate_face(self) -> None:
+        self._face_stale = True
+        if self.batch is not None:
+            self.batch.invalidate(self)
+        self.mark_changed()
+
+    @staticmethod
+    def _scaled_image(path: str, scale: float) -> PIL.Image.Image:
+        """An image at a scale, scaled from the closest variant of it."""
+        variant_scale = texture_cache.closest_scale(scale)
+        image = texture_cache.acquire(path, variant_scale).image
+        texture_cache.release(path, variant_scale)
+        image = image.convert("RGBA") if image.mode != "RGBA" else image.copy()
+        return scale_image(image, scale / variant_scale)
+
+    def _acquire_texture(self, path: str, scale: float = 1.0) -> arcade.Texture:
+        self._texture_keys.append((path, scale))
+        return texture_cache.acquire(path, scale)
+
+    @UIElement.z_value.setter  # type: ignore
+    def z_value(self, value: float) -> None:
+        UIElement.z_value.fset(self, value)  # type: ignore
+        if self.batch is not None:
+            self.batch.restack(self)
 
     @Rectangle.center_x.setter  # type: ignore
     def center_x(self, value: float) -> None:
-        self.sprite_list.move(value - self._center_x, 0.0)
+        self.face.center_x = value
         self._center_x = value
+        self._geometry_changed()
 
     @Rectangle.center_y.setter  # type: ignore
     def center_y(self, value: float) -> None:
-        self.sprite_list.move(0.0, value - self._center_y)
+        self.face.center_y = value
         self._center_y = value
+        self._geometry_changed()
+
+    def move_to(self, center_x: float, center_y: float) -> None:
+        self.face.position = (center_x, center_y)
+        self._center_x = center_x
+        self._center_y = center_y
+        self._geometry_changed()
 
     @Rectangle.height.getter  # type: ignore
     def height(self) -> float:
-        return self.background.height
+        return self.face.height
 
     @Rectangle.width.getter  # type: ignore
     def width(self) -> float:
-        return self.background.width
+        return self.face.width
 
     @property
     def scale(self) -> float:
@@ -106,89 +301,329 @@ class Card(UIElement, Rectangle, Clickable, Hoverable):
 
     @scale.setter
     def scale(self, value: float) -> None:
-        factor = value / self._scale
-        for sprite in self.sprite_list:
-            sprite.center_x = (sprite.center_x - self.center_x) * factor + self.center_x
-            sprite.center_y = (sprite.center_y - self.center_y) * factor + self.center_y
-            sprite.scale *= factor
         self._scale = value
+        self.face.scale = value * self._face_scale
+        if not self._face_stale and self.face_resolution != self._face_resolution:
+            self._invalidate_face()
+        self._geometry_changed()
+
+    def release_resources(self) -> None:
+        release_sprite_list(self.sprite_list)
 
     def draw(self) -> None:
-        self.sprite_list.draw()
-        arcade.draw_text(
-            text=self.title,
-            color=self.title_color,
-            start_x=self.center_x - 0.5 * self.width,
-            start_y=self.center_y + 0.5 * self.height - 30 * self.scale,
-            width=int(self.width),
-            align="center",
-            font_name=self.title_font,
-            font_size=int(self.scale * 14),
-        )
-        arcade.draw_text(
-            text="~ " + self.subtitle + " ~",
-            color=self.title_color,
-            start_x=self.center_x - 0.5 * self.width,
-            start_y=self.center_y + 0.5 * self.height - 42 * self.scale,
-            width=int(self.width),
-            align="center",
-            font_name=self.title_font,
-            font_size=int(self.scale * 10),
-            italic=True,
-        )
+        self.update_face()
+        if self.batch is None:
+            self.sprite_list.draw()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        self.update_face()
+        items.append(SpriteState.of(self.face))
+
+    def _fitted_font_size(self, text: str, font_size: int, italic: bool = False, scale: float = 1.0) -> int:
+        """The font size to draw a text at, at a scale, shrunk until the text fits the card."""
+        background_width = self._background_texture.width / self._background_scale
+        available = background_width * 0.3 - 2 * self.text_margin
+        text_width = font_metrics.text_width(text, self.title_font, font_size, italic)
+        if text_width > available > 0:
+            font_size = font_size * available / text_width
+        return max(int(scale * font_size), 1)
 
     def collides_with_point(self, point: arcade.arcade_types.Point) -> bool:
-        return self.background.collides_with_point(point)
+        return self.face.collides_with_point(point)
 
     def on_click(self) -> None:
         pass
 
     def on_hover(self) -> None:
-        pass
+        if isinstance(self.parent, CardRow):
+            self.parent._card_on_hover(self)
 
     def on_hover_end(self) -> None:
-        pass
+        if isinstance(self.parent, CardRow):
+            self.parent._card_on_hover_end(self)
+
+
+class CardBatch:
+    """
+    Draw the sprites of many cards from shared sprite lists, one per z_value.
+
+    Moving or scaling a card updates its sprites in place. Only changing a card's z_value moves its
+    sprites to another sprite list, so a row of cards costs one draw call plus one for a hovered card.
+    Cards whose face has to be composed again report to the batch, which updates just those before
+    drawing.
+
+    """
+
+    def __init__(self) -> None:
+        self._sprite_lists: Dict[float, arcade.SpriteList] = dict()
+        self._layers: List[float] = list()
+        self._cards: Dict[float, List[Card]] = dict()
+        self._z_values: Dict[Card, float] = dict()
+        self._order: Dict[Card, int] = dict()
+        self._next_order: int = 0
+        # Cards with a stale face, as an ordered set
+        self._stale: Dict[Card, None] = dict()
+
+    def __len__(self) -> int:
+        return len(self._z_values)
+
+    def __contains__(self, card: Card) -> bool:
+        return card in self._z_values
+
+    def add(self, card: Card) -> None:
+        if card.batch is not None:
+            card.batch.remove(card)
+        for sprite in card.sprites:
+            remove_sprite(card.sprite_list, sprite)
+        card.batch = self
+        self._insert(card, card.z_value)
+        if card._face_stale:
+            self._stale[card] = None
+
+    def remove(self, card: Card) -> None:
+        self._take_out(card)
+        del self._order[card]
+        self._stale.pop(card, None)
+        card.batch = None
+        for sprite in card.sprites:
+            card.sprite_list.append(sprite)
+
+    def remove_all(self, cards: Iterable[Card]) -> None:
+        """Remove many cards, rebuilding each affected sprite list once instead of once per sprite."""
+        removed = set(cards)
+        z_values = set()
+        for card in removed:
+            z_value = self._z_values.pop(card)
+            z_values.add(z_value)
+            del self._order[card]
+            self._stale.pop(card, None)
+            card.batch = None
+            for sprite in card.sprites:
+                card.sprite_list.append(sprite)
+        for z_value in z_values:
+            cards = self._cards[z_value] = [card for card in self._cards[z_value] if card not in removed]
+            keep_sprites(self._sprite_lists[z_value], [sprite for card in cards for sprite in card.sprites])
+
+    def restack(self, card: Card) -> None:
+        if self._z_values[card] != card.z_value:
+            self._take_out(card)
+            self._insert(card, card.z_value)
+
+    def invalidate(self, card: Card) -> None:
+        self._stale[card] = None
+
+    def release(self) -> None:
+        for sprite_list in self._sprite_lists.values():
+            release_sprite_list(sprite_list)
+
+    def draw(self) -> None:
+        self._update_faces()
+        for z_value in self._layers:
+            self._sprite_lists[z_value].draw()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        """Append the states of the cards' faces, in the order draw() draws them."""
+        self._update_faces()
+        for z_value in self._layers:
+            items.extend(SpriteState.of(card.face) for card in self._cards[z_value])
+
+    def _update_faces(self) -> None:
+        if self._stale:
+            for card in self._stale:
+                card.update_face()
+            self._stale.clear()
+
+    def _insert(self, card: Card, z_value: float) -> None:
+        if z_value not in self._sprite_lists:
+            self._sprite_lists[z_value] = arcade.SpriteList()
+            self._cards[z_value] = list()
+            bisect.insort(self._layers, z_value)
+        cards = self._cards[z_value]
+        self._z_values[card] = z_value
+        if card not in self._order:
+            self._order[card] = self._next_order
+            self._next_order += 1
+        sprite_list = self._sprite_lists[z_value]
+        if cards and self._order[cards[-1]] > self._order[card]:
+            # A card coming back to its layer goes back to its old place in the drawing order. Splicing it
+            # into the existing sprite list keeps the list's texture atlas, only its buffer gets rebuilt.
+            position = bisect.bisect([self._order[layer_card] for layer_card in cards], self._order[card])
+            cards.insert(position, card)
+            insert_sprites(sprite_list, position * len(card.sprites), card.sprites)
+        else:
+            cards.append(card)
+            for sprite in card.sprites:
+                sprite_list.append(sprite)
+
+    def _take_out(self, card: Card) -> None:
+        z_value = self._z_values.pop(card)
+        for sprite in card.sprites:
+            remove_sprite(self._sprite_lists[z_value], sprite)
+        # Empty layers are kept, so that a card hovered again reuses the layer's texture atlas
+        self._cards[z_value].remove(card)
 
 
 class CardRow(UIContainer):
     """
     Row up cards and interact with them via mouse.
 
+    Adding or removing cards re-arranges the row once per call, or once at the end of a batch_update().
+
     """
 
     highlight_scale: float = 1.6
+    hover_duration: float = 0.15
 
     def __init__(self, center_x: float, center_y: float, width: float, cards: List[Card] = None) -> None:
         self.center_x: float = center_x
         self.center_y: float = center_y
         self.width: float = width
         self._cards: List[Card] = list()
+        self.batch: CardBatch = CardBatch()
         if cards is not None:
-            map(self.append, cards)
-        self._arrange_cards()
+            self.extend(cards)
 
     def _card_on_hover(self, card: Card):
-        card.scale = self.highlight_scale
-        card.center_y = self.center_y + card.height * 0.2
+        highlighted_height = card.height / card.scale * self.highlight_scale
+        animator.animate(card, "scale", self.highlight_scale, self.hover_duration)
+        animator.animate(card, "center_y", self.center_y + highlighted_height * 0.2, self.hover_duration)
         card.z_value = 1.0
 
     def _card_on_hover_end(self, card: Card):
-        card.scale = 1.0
-        card.center_y = self.center_y
+        animator.animate(card, "scale", 1.0, self.hover_duration)
+        animator.animate(card, "center_y", self.center_y, self.hover_duration)
         card.z_value = 0.0
 
+    def _arrange(self) -> None:
+        self._arrange_cards()
+
     def _arrange_cards(self) -> None:
+        count = len(self._cards)
         for i, card in enumerate(reversed(self._cards)):
-            card.center_x = (
-                self.center_x + self.width * (i / (len(self._cards) - 1) - 0.5)
-                if len(self._cards) > 1
-                else self.center_x
+            card.move_to(
+                self.center_x + self.width * (i / (count - 1) - 0.5) if count > 1 else self.center_x, self.center_y
             )
-            card.center_y = self.center_y
 
     def append(self, card: Card) -> None:
-        card.on_hover = lambda: self._card_on_hover(card)
-        card.on_hover_end = lambda: self._card_on_hover_end(card)
-        self._cards.append(card)
-        self.ui_elements.append(card)
-        self._arrange_cards()
+        self.extend([card])
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        cards = list(cards)
+        for card in cards:
+            self.batch.add(card)
+            card_index.add(card)
+        self._cards.extend(cards)
+        self.ui_elements.extend(cards)
+        self._layout_changed()
+
+    def remove(self, card: Card) -> None:
+        self.remove_all([card])
+
+    def remove_all(self, cards: Iterable[Card]) -> None:
+        """Remove cards of the row, or none of them if one isn't in the row."""
+        removed = set(cards)
+        taken = [card for card in self._cards if card in removed]
+        if len(taken) != len(removed):
+            raise ValueError("CardRow.remove_all(cards): a card is not in the row")
+        self._cards = [card for card in self._cards if card not in removed]
+        for card in taken:
+            self.ui_elements.remove(card)
+            card_index.discard(card)
+        self.batch.remove_all(taken)
+        self._layout_changed()
+
+    def clear(self) -> None:
+        self.remove_all(self._cards)
+
+    def release_resources(self) -> None:
+        super().release_resources()
+        self.batch.release()
+
+    def draw(self) -> None:
+        self.batch.draw()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        self.batch.snapshot(items)
+
+
+class CardIndex:
+    """
+    Find cards by the words of their titles and subtitles, and of the entities they show.
+
+    Cards are indexed as they are added to a hand or created in the card creator, and re-indexed when
+    their title or subtitle changes. The words of a card's entity are looked up in the world when the
+    card is indexed. The index only holds weak references, a card that is garbage collected drops out
+    of it. Highlighting the cards that match a word only touches those cards and the ones highlighted
+    before, however many cards are indexed.
+
+    """
+
+    def __init__(self, world: Optional[EntityStore] = None) -> None:
+        self.world: Optional[EntityStore] = world
+        self._words: WordIndex = WordIndex()
+        # Cards by their id(), which is what the word index holds
+        self._cards: "weakref.WeakValueDictionary[int, Card]" = weakref.WeakValueDictionary()
+        self._highlighted: List[int] = list()
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, card: Card) -> bool:
+        return id(card) in self._cards
+
+    def add(self, card: Card) -> None:
+        key = id(card)
+        if key not in self._cards:
+            self._cards[key] = card
+            weakref.finalize(card, self._words.discard, key)
+        self._words.add(key, self._texts(card))
+
+    def update(self, card: Card) -> None:
+        """Index a card again after its texts changed, if it is indexed."""
+        if id(card) in self._cards:
+            self._words.add(id(card), self._texts(card))
+
+    def discard(self, card: Card) -> None:
+        key = id(card)
+        if self._cards.pop(key, None) is not None:
+            self._words.remove(key)
+            if key in self._highlighted:
+                self._highlighted.remove(key)
+                card.highlighted = False
+
+    def clear(self) -> None:
+        self.highlight("")
+        self._cards.clear()
+        self._words.clear()
+
+    def match(self, text: str, prefix: bool = False) -> List[Card]:
+        """Cards that have every word of the text, see WordIndex.match()."""
+        return [self._cards[key] for key in self._words.match(text, prefix)]  # type: ignore
+
+    def highlight(self, text: str) -> List[Card]:
+        """
+        Highlight the cards matching the words of the text, and no others. If no card has the words,
+        partial matches are highlighted instead.
+
+        """
+        keys = self._words.match(text) or self._words.match(text, prefix=True)
+        for key in self._highlighted:
+            card = self._cards.get(key)
+            if card is not None:
+                card.highlighted = False
+        cards = [self._cards[key] for key in keys]  # type: ignore
+        for card in cards:
+            card.highlighted = True
+        self._highlighted = keys  # type: ignore
+        return cards
+
+    def _texts(self, card: Card) -> Tuple[str, ...]:
+        texts: Tuple[str, ...] = (card.title, card.subtitle)
+        if card.entity_id is not None and self.world is not None:
+            record = self.world.get(card.entity_id)
+            if record is not None:
+                texts += entity_words(record)
+        return texts
+
+
+card_index = CardIndex()
@@ -1 +1,5 @@
 FONT: str = "Gabriola"
+
+TEXTURE_CACHE_MAX_UNUSED: int = 32
+LABEL_CACHE_BUDGET: int = 16 * 1024 * 1024
+CARD_FACE_CACHE_BUDGET: int = 64 * 1024 * 1024
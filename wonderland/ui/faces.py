@@ -0,0 +1,105 @@
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import arcade
+import PIL.Image
+
+from wonderland.config import CARD_FACE_CACHE_PATH
+from wonderland.ui.config import CARD_FACE_CACHE_BUDGET
+
+
+class CardFaceCache:
+    """
+    Keep the composed faces of cards, keyed by a hash of everything that goes into them.
+
+    A face that isn't in memory is read from the cache directory, and only composed if it isn't there
+    either, after which it is written there for later launches. Faces in memory are evicted in least
+    recently used order once they take up more than budget bytes. Faces are never changed under a key,
+    so evicting one only costs reading or composing it again. Setting directory to None keeps the cache
+    in memory only.
+
+    """
+
+    def __init__(self, budget: int = CARD_FACE_CACHE_BUDGET, directory: Optional[str] = CARD_FACE_CACHE_PATH) -> None:
+        self.budget: int = budget
+        self.directory: Optional[str] = directory
+        self.memory: int = 0
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self._faces: "OrderedDict[str, arcade.Texture]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._faces)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._faces
+
+    def get(self, key: str, compose: Callable[[], PIL.Image.Image]) -> arcade.Texture:
+        """The face stored under key, calling compose to create it if it is neither in memory nor on disk."""
+        texture = self._faces.get(key)
+        if texture is not None:
+            self.hits += 1
+            self._faces.move_to_end(key)
+            return texture
+        image = self._read(key)
+        if image is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            image = compose()
+            self._write(key, image)
+        texture = arcade.Texture("card_face:" + key, image)
+        self._faces[key] = texture
+        self.memory += image.width * image.height * 4
+        self._evict()
+        return texture
+
+    def clear(self) -> None:
+        """Forget the faces in memory, the ones on disk are kept."""
+        self._faces.clear()
+        self.memory = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._faces),
+            "memory": self.memory,
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".png")  # type: ignore
+
+    def _read(self, key: str) -> Optional[PIL.Image.Image]:
+        if self.directory is None:
+            return None
+        try:
+            return PIL.Image.open(self._path(key)).convert("RGBA")
+        except OSError:
+            # Missing, or cut short by a crash while it was written
+            return None
+
+    def _write(self, key: str, image: PIL.Image.Image) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        temporary_path = path + ".tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Faces are cheap to compose again, so writing them fast matters more than small files
+            image.save(temporary_path, format="PNG", compress_level=1)
+            os.replace(temporary_path, path)
+        except OSError:
+            # Not being able to write the cache only costs composing the face again on the next launch
+            pass
+
+    def _evict(self) -> None:
+        while self.memory > self.budget and len(self._faces) > 1:
+            _, texture = self._faces.popitem(last=False)
+            self.memory -= texture.width * texture.height * 4
+
+
+card_faces: CardFaceCache = CardFaceCache()
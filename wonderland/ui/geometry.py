@@ -0,0 +1,129 @@
+from typing import Dict, Hashable, List, Set, Tuple
+
+import numpy
+
+from wonderland.ui.spatial import Bounds, SpatialGrid
+
+# (center_x, center_y, width, height, scale)
+Geometry = Tuple[float, float, float, float, float]
+
+# Rows of GeometryStore._columns
+LEFT, BOTTOM, RIGHT, TOP, SCALE, Z, ORDER = range(7)
+
+
+class GeometryStore:
+    """
+    Geometry of the rectangles of a container, packed into the columns of one NumPy array.
+
+    Every rectangle has a slot with its bounding box, scale, z_value and place in the drawing order,
+    which the container writes whenever one of them changes. Boxes are stored as edges rather than center
+    and size, since the edges are what every query compares against. Removing a rectangle moves the last
+    one into its slot, so the columns stay packed.
+
+    Finding the rectangles under a point, which every mouse event does, only tests the candidates in the
+    cell of a SpatialGrid under the point, against the boxes and ranks kept in plain lists next to the
+    columns. Rectangles that moved are only put into their new cells by the next such query, so arranging
+    or animating many of them costs no grid updates until the cursor needs them. Finding the rectangles
+    inside a region, to cull what a cached layer re-renders, is a single vectorized pass over the columns.
+
+    """
+
+    def __init__(self, capacity: int = 64, cell_size: float = 64.0) -> None:
+        self._columns: numpy.ndarray = numpy.zeros((7, capacity))
+        self._grid: SpatialGrid[Hashable] = SpatialGrid(cell_size)
+        # Items whose box changed since the grid was last brought up to date
+        self._moved: Set[Hashable] = set()
+        self._items: List[Hashable] = list()
+        self._boxes: List[Bounds] = list()
+        self._ranks: List[Tuple[float, int]] = list()
+        self._slots: Dict[Hashable, int] = dict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._slots
+
+    def add(self, item: Hashable, geometry: Geometry, rank: Tuple[float, int]) -> None:
+        """Give the item a slot with its (center_x, center_y, width, height, scale) and (z_value, order)."""
+        slot = len(self._items)
+        if slot == self._columns.shape[1]:
+            self._columns = numpy.concatenate([self._columns, numpy.zeros_like(self._columns)], axis=1)
+        self._items.append(item)
+        self._boxes.append((0.0, 0.0, 0.0, 0.0))
+        self._ranks.append(rank)
+        self._slots[item] = slot
+        self.update(item, geometry)
+        self.update_rank(item, rank)
+
+    def remove(self, item: Hashable) -> None:
+        slot = self._slots.pop(item)
+        self._moved.discard(item)
+        if item in self._grid:
+            self._grid.remove(item)
+        last = len(self._items) - 1
+        if slot != last:
+            moved = self._items[last]
+            self._items[slot] = moved
+            self._boxes[slot] = self._boxes[last]
+            self._ranks[slot] = self._ranks[last]
+            self._columns[:, slot] = self._columns[:, last]
+            self._slots[moved] = slot
+        self._items.pop()
+        self._boxes.pop()
+        self._ranks.pop()
+
+    def clear(self) -> None:
+        self._grid.clear()
+        self._moved.clear()
+        self._items.clear()
+        self._boxes.clear()
+        self._ranks.clear()
+        self._slots.clear()
+
+    def update(self, item: Hashable, geometry: Geometry) -> None:
+        center_x, center_y, width, height, scale = geometry
+        slot = self._slots[item]
+        box = (center_x - width / 2, center_y - height / 2, center_x + width / 2, center_y + height / 2)
+        self._boxes[slot] = box
+        self._moved.add(item)
+        columns = self._columns
+        columns[LEFT, slot], columns[BOTTOM, slot], columns[RIGHT, slot], columns[TOP, slot] = box
+        columns[SCALE, slot] = scale
+
+    def update_rank(self, item: Hashable, rank: Tuple[float, int]) -> None:
+        slot = self._slots[item]
+        self._ranks[slot] = rank
+        self._columns[Z, slot], self._columns[ORDER, slot] = rank
+
+    def bounds(self, item: Hashable) -> Bounds:
+        return self._boxes[self._slots[item]]
+
+    def at_point(self, x: float, y: float) -> List[Hashable]:
+        """Items whose rectangle contains the point, from the top one down."""
+        boxes = self._boxes
+        if self._moved:
+            for moved in self._moved:
+                if moved in self._grid:
+                    self._grid.update(moved, boxes[self._slots[moved]])
+                else:
+                    self._grid.insert(moved, boxes[self._slots[moved]])
+            self._moved.clear()
+        hits = list()
+        for item in self._grid.query_point(x, y):
+            slot = self._slots[item]
+            left, bottom, right, top = boxes[slot]
+            if left < x < right and bottom < y < top:
+                hits.append(slot)
+        if not hits:
+            return []
+        if len(hits) > 1:
+            hits.sort(key=self._ranks.__getitem__, reverse=True)
+        return [self._items[slot] for slot in hits]
+
+    def in_region(self, bounds: Bounds) -> Set[Hashable]:
+        """Items whose rectangle intersects the region."""
+        left, bottom, right, top = bounds
+        columns = self._columns[:, : len(self._items)]
+        inside = (columns[LEFT] < right) & (left < columns[RIGHT]) & (columns[BOTTOM] < top) & (bottom < columns[TOP])
+        return {self._items[slot] for slot in numpy.flatnonzero(inside).tolist()}
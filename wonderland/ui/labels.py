@@ -0,0 +1,196 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import arcade
+import PIL.Image
+import PIL.ImageDraw
+import PIL.ImageFont
+
+from wonderland.ui.config import LABEL_CACHE_BUDGET
+
+# (text, font name, font size, color, italic, align, width)
+LabelKey = Tuple[str, str, int, Tuple[int, ...], bool, str, int]
+
+# Same supersampling arcade.draw_text uses, so cached labels look like the ones it renders
+_FONT_SCALE: float = 1.25
+_SUPERSAMPLING: int = 5
+_FALLBACK_FONTS: Tuple[str, ...] = (
+    "arial.ttf",
+    "NotoSans-Regular.ttf",
+    "/usr/share/fonts/truetype/freefont/FreeMono.ttf",
+    "/System/Library/Fonts/SFNSDisplay.ttf",
+)
+
+
+@lru_cache(maxsize=64)
+def load_font(font_name: str, size: int, italic: bool = False) -> PIL.ImageFont.ImageFont:
+    """Find a TrueType font by name, trying italic variants first if asked to and common system fonts last."""
+    candidates = [font_name, font_name + ".ttf"]
+    if italic:
+        candidates = [font_name + " Italic", font_name + " Italic.ttf", font_name + "i.ttf"] + candidates
+    for candidate in candidates + list(_FALLBACK_FONTS):
+        try:
+            return PIL.ImageFont.truetype(candidate, size)
+        except OSError:
+            pass
+    return PIL.ImageFont.load_default()
+
+
+class Label:
+    """
+    A piece of text rendered into a texture once.
+
+    """
+
+    def __init__(self, key: LabelKey, texture: arcade.Texture) -> None:
+        self.key: LabelKey = key
+        self.texture: arcade.Texture = texture
+
+    @property
+    def width(self) -> int:
+        return self.texture.width
+
+    @property
+    def height(self) -> int:
+        return self.texture.height
+
+    @property
+    def memory(self) -> int:
+        return self.texture.width * self.texture.height * 4
+
+    def draw(self, start_x: float, start_y: float, anchor_x: str = "left", anchor_y: str = "baseline") -> None:
+        if anchor_x == "left":
+            center_x = start_x + self.width / 2
+        elif anchor_x == "center":
+            center_x = start_x
+        elif anchor_x == "right":
+            center_x = start_x - self.width / 2
+        else:
+            raise ValueError("anchor_x should be 'left', 'center', or 'right'. Not '{}'".format(anchor_x))
+        if anchor_y == "top":
+            center_y = start_y - self.height / 2
+        elif anchor_y == "center":
+            center_y = start_y
+        elif anchor_y in ("bottom", "baseline"):
+            center_y = start_y + self.height / 2
+        else:
+            raise ValueError("anchor_y should be 'top', 'center', 'bottom' or 'baseline'. Not '{}'".format(anchor_y))
+        arcade.draw_texture_rectangle(center_x, center_y, self.width, self.height, self.texture)
+
+
+def label_key(
+    text: str,
+    font_name: str,
+    font_size: int,
+    color: arcade.arcade_types.Color,
+    italic: bool = False,
+    align: str = "left",
+    width: int = 0,
+) -> LabelKey:
+    """The key a label is cached under, to invalidate exactly the label a widget drew."""
+    return (text, font_name, font_size, tuple(color), italic, align, width)
+
+
+def render_label(key: LabelKey) -> Label:
+    text, font_name, font_size, color, italic, align, width = key
+    font = load_font(font_name, int(font_size * _FONT_SCALE * _SUPERSAMPLING), italic)
+    text_width, text_height = PIL.ImageDraw.Draw(PIL.Image.new("RGBA", (1, 1))).multiline_textsize(text, font=font)
+    text_width, text_height = max(text_width, 1), max(text_height, 1)
+    image_width = width * _SUPERSAMPLING if width > 0 else text_width
+    start_x = (image_width - text_width) // 2 if width > 0 and align == "center" else 0
+    image = PIL.Image.new("RGBA", (image_width, text_height))
+    PIL.ImageDraw.Draw(image).multiline_text(
+        (start_x, -font_size * _FONT_SCALE * _SUPERSAMPLING * 0.02), text, color, font=font, align=align
+    )
+    image = image.resize(
+        (max(image_width // _SUPERSAMPLING, 1), max(text_height // _SUPERSAMPLING, 1)), resample=PIL.Image.LANCZOS
+    )
+    return Label(key, arcade.Texture("label:{}".format(key), image))
+
+
+class LabelCache:
+    """
+    Keep rendered text labels around, so that widgets don't rasterize their text every frame.
+
+    Labels are evicted in least recently used order once their textures take up more than
+    budget bytes. The cache is guarded by a lock, so labels can be invalidated from the thread running
+    a threaded simulation while another one draws.
+
+    """
+
+    def __init__(self, budget: int = LABEL_CACHE_BUDGET) -> None:
+        self.budget: int = budget
+        self.memory: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._labels: "OrderedDict[LabelKey, Label]" = OrderedDict()
+        self._lock: threading.RLock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def get(
+        self,
+        text: str,
+        font_name: str,
+        font_size: int,
+        color: arcade.arcade_types.Color,
+        italic: bool = False,
+        align: str = "left",
+        width: int = 0,
+    ) -> Label:
+        key = label_key(text, font_name, font_size, color, italic, align, width)
+        with self._lock:
+            label: Optional[Label] = self._labels.get(key)
+            if label is not None:
+                self.hits += 1
+                self._labels.move_to_end(key)
+                return label
+            self.misses += 1
+            label = render_label(key)
+            self._labels[key] = label
+            self.memory += label.memory
+            self._evict()
+            return label
+
+    def invalidate(self, key: LabelKey) -> None:
+        with self._lock:
+            label = self._labels.pop(key, None)
+            if label is not None:
+                self.memory -= label.memory
+
+    def clear(self) -> None:
+        with self._lock:
+            self._labels.clear()
+            self.memory = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._labels), "memory": self.memory}
+
+    def _evict(self) -> None:
+        while self.memory > self.budget and len(self._labels) > 1:
+            _, label = self._labels.popitem(last=False)
+            self.memory -= label.memory
+
+
+label_cache: LabelCache = LabelCache()
+
+
+def draw_label(
+    text: str,
+    start_x: float,
+    start_y: float,
+    color: arcade.arcade_types.Color,
+    font_size: int,
+    font_name: str,
+    width: int = 0,
+    align: str = "left",
+    italic: bool = False,
+    anchor_x: str = "left",
+    anchor_y: str = "baseline",
+) -> None:
+    """Drop-in replacement for arcade.draw_text that draws from the label cache."""
+    label_cache.get(text, font_name, font_size, color, italic, align, width).draw(start_x, start_y, anchor_x, anchor_y)
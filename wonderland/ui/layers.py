@@ -0,0 +1,192 @@
+import ctypes
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import arcade
+import pyglet.gl as gl
+
+from wonderland.ui.geometry import Bounds
+
+# Above this many dirty rectangles per frame, they are merged into their bounding box
+MAX_DIRTY_REGIONS: int = 8
+
+_current_clip: Optional[Bounds] = None
+
+
+def current_clip() -> Optional[Bounds]:
+    """Region of the screen a layer is currently re-rendering, or None outside of layer rendering."""
+    return _current_clip
+
+
+def intersects(first: Bounds, second: Bounds) -> bool:
+    return first[0] < second[2] and second[0] < first[2] and first[1] < second[3] and second[1] < first[3]
+
+
+def union(first: Bounds, second: Bounds) -> Bounds:
+    return min(first[0], second[0]), min(first[1], second[1]), max(first[2], second[2]), max(first[3], second[3])
+
+
+class Framebuffer:
+    """
+    Offscreen color buffer with the size of the window's framebuffer.
+
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width: int = width
+        self.height: int = height
+        self._framebuffer_id = gl.GLuint()
+        self._renderbuffer_id = gl.GLuint()
+        gl.glGenRenderbuffers(1, ctypes.byref(self._renderbuffer_id))
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self._renderbuffer_id)
+        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_RGBA8, width, height)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, 0)
+        gl.glGenFramebuffers(1, ctypes.byref(self._framebuffer_id))
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self._framebuffer_id)
+        gl.glFramebufferRenderbuffer(
+            gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_RENDERBUFFER, self._renderbuffer_id
+        )
+        status = gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        if status != gl.GL_FRAMEBUFFER_COMPLETE:
+            self.release()
+            raise RuntimeError("Offscreen framebuffer is incomplete (status {})".format(status))
+
+    def bind(self) -> None:
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self._framebuffer_id)
+        gl.glViewport(0, 0, self.width, self.height)
+
+    @staticmethod
+    def unbind(width: int, height: int) -> None:
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        gl.glViewport(0, 0, width, height)
+
+    def blit(self, left: int, bottom: int, right: int, top: int) -> None:
+        """Copy a rectangle of pixels to the same place on the window."""
+        gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, self._framebuffer_id)
+        gl.glBindFramebuffer(gl.GL_DRAW_FRAMEBUFFER, 0)
+        gl.glBlitFramebuffer(left, bottom, right, top, left, bottom, right, top, gl.GL_COLOR_BUFFER_BIT, gl.GL_NEAREST)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+
+    def release(self) -> None:
+        if self._framebuffer_id.value:
+            gl.glDeleteFramebuffers(1, ctypes.byref(self._framebuffer_id))
+            self._framebuffer_id = gl.GLuint()
+        if self._renderbuffer_id.value:
+            gl.glDeleteRenderbuffers(1, ctypes.byref(self._renderbuffer_id))
+            self._renderbuffer_id = gl.GLuint()
+
+
+class RenderLayer:
+    """
+    Cache what a container draws in an offscreen framebuffer and only re-render what changed.
+
+    Elements report changes through invalidate(), which marks both the area the element was last
+    painted at and the area it covers now as dirty. On the next frame, only the dirty regions are
+    cleared and redrawn, clipped with a scissor test, and the cached pixels are copied to the window.
+    Cached layers are opaque and cover the whole window, so they suit screens and backdrops that are
+    drawn first.
+
+    """
+
+    def __init__(self) -> None:
+        self._framebuffer: Optional[Framebuffer] = None
+        self._painted: Dict[Hashable, Bounds] = dict()
+        self._dirty: List[Bounds] = list()
+        self._full_redraw: bool = True
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._full_redraw or bool(self._dirty)
+
+    def invalidate(self, element: Hashable, bounds: Optional[Bounds]) -> None:
+        """Mark an element as changed. Elements without bounds invalidate the whole layer."""
+        if bounds is None:
+            self.invalidate_all()
+            return
+        previous = self._painted.get(element)
+        self._painted[element] = bounds
+        self._add_dirty(bounds if previous is None else union(previous, bounds))
+
+    def forget(self, element: Hashable) -> None:
+        bounds = self._painted.pop(element, None)
+        if bounds is not None:
+            self._add_dirty(bounds)
+
+    def _add_dirty(self, region: Bounds) -> None:
+        # Every region is rendered in a pass of its own, so overlapping ones are merged into one
+        kept = list()
+        for dirty in self._dirty:
+            if intersects(dirty, region):
+                region = union(dirty, region)
+            else:
+                kept.append(dirty)
+        kept.append(region)
+        if len(kept) > MAX_DIRTY_REGIONS:
+            for dirty in kept[:-1]:
+                region = union(dirty, region)
+            kept = [region]
+        self._dirty = kept
+
+    def invalidate_all(self) -> None:
+        self._full_redraw = True
+        self._dirty.clear()
+
+    def draw(
+        self, render: Callable[[], None], painted: Callable[[], Iterable[Tuple[Hashable, Optional[Bounds]]]]
+    ) -> None:
+        """
+        Bring the cached pixels up to date with render() where needed and copy them to the window.
+
+        After a full redraw, painted() has to list the drawn elements with their bounds, so that the
+        area they were painted at can be cleared once they move.
+
+        """
+        global _current_clip
+        window = arcade.get_window()
+        width, height = window.get_size()
+        pixel_width, pixel_height = window.get_framebuffer_size()
+        ratio = pixel_width / width
+        if self._framebuffer is None or (self._framebuffer.width, self._framebuffer.height) != (
+            pixel_width,
+            pixel_height,
+        ):
+            self.release()
+            self._framebuffer = Framebuffer(pixel_width, pixel_height)
+            self._full_redraw = True
+        if self.is_dirty:
+            regions = [(0.0, 0.0, float(width), float(height))] if self._full_redraw else self._dirty
+            self._framebuffer.bind()
+            gl.glEnable(gl.GL_SCISSOR_TEST)
+            try:
+                for region in regions:
+                    left, bottom, right, top = self._to_pixels(region, ratio)
+                    gl.glScissor(left, bottom, right - left, top - bottom)
+                    gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+                    _current_clip = None if self._full_redraw else region
+                    render()
+            finally:
+                _current_clip = None
+                gl.glDisable(gl.GL_SCISSOR_TEST)
+                Framebuffer.unbind(pixel_width, pixel_height)
+            if self._full_redraw:
+                self._painted = {element: bounds for element, bounds in painted() if bounds is not None}
+            self._full_redraw = False
+            self._dirty.clear()
+        self._framebuffer.blit(0, 0, pixel_width, pixel_height)
+
+    def release(self) -> None:
+        if self._framebuffer is not None:
+            self._framebuffer.release()
+            self._framebuffer = None
+        self._full_redraw = True
+
+    @staticmethod
+    def _to_pixels(region: Bounds, ratio: float) -> Tuple[int, int, int, int]:
+        left, bottom, right, top = region
+        # Widen by a pixel to catch anti-aliased edges
+        return (
+            max(int(left * ratio) - 1, 0),
+            max(int(bottom * ratio) - 1, 0),
+            int(right * ratio) + 2,
+            int(top * ratio) + 2,
+        )
@@ -0,0 +1,191 @@
+import math
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy
+
+# (width, height)
+Size = Tuple[float, float]
+
+
+class SpiralLayout:
+    """
+    Place rectangles inside an area without overlaps, starting from its center.
+
+    Single rectangles are added with place(), which tries the points of a spiral running outwards from
+    the center, stretched to the aspect ratio of the area, and takes the first point where the rectangle
+    doesn't overlap any of the ones placed before. Many points are tested at once against arrays of the
+    placed bounding boxes. For every rectangle size it remembers where the search ended, so rectangles of
+    the same or a bigger size pick up from there instead of searching the crowded center again.
+
+    arrange() lays out a whole set of rectangles at once, packing them in shuffled order into rows that
+    fill an ellipse around the center, without any per-rectangle Python work.
+
+    Once the area is full, rectangles end up around it. The layout only depends on the sizes, their order
+    and the seed.
+
+    """
+
+    chunk_size: int = 32
+    max_chunk_size: int = 1024
+
+    def __init__(
+        self,
+        center_x: float,
+        center_y: float,
+        width: float,
+        height: float,
+        padding: float = 2.0,
+        step: float = 4.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.center_x: float = center_x
+        self.center_y: float = center_y
+        self.width: float = width
+        self.height: float = height
+        self.padding: float = padding
+        self.step: float = step
+        self._random: numpy.random.RandomState = numpy.random.RandomState(seed)
+        self._angle: float = self._random.uniform(0, 2 * math.pi)
+        # Padded bounding boxes as (left, bottom, right, top), the first _count rows are in use
+        self._boxes: numpy.ndarray = numpy.empty((64, 4))
+        self._count: int = 0
+        self._items: List[Hashable] = list()
+        self._index: Dict[Hashable, int] = dict()
+        # Spiral index where the search for a size found a free spot
+        self._hints: Dict[Size, int] = dict()
+        self._first_free: int = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._index
+
+    @property
+    def aspect(self) -> float:
+        return self.width / self.height if self.width > 0 and self.height > 0 else 1.0
+
+    def place(self, item: Hashable, width: float, height: float) -> Tuple[float, float]:
+        """Find a free spot for a rectangle of the given size, claim it for the item and return its center."""
+        if item in self._index:
+            self.remove(item)
+        half_width = (width + self.padding) / 2
+        half_height = (height + self.padding) / 2
+        # Spots where smaller rectangles didn't fit can't take this one either
+        hints = [
+            index
+            for (hint_width, hint_height), index in self._hints.items()
+            if hint_width <= width and hint_height <= height
+        ]
+        start = max(hints + [self._first_free])
+        chunk_size = self.chunk_size
+        while True:
+            xs, ys = self._spiral(start, start + chunk_size)
+            boxes = self._boxes[: self._count]
+            # Only the boxes around this stretch of the spiral can get in the way
+            boxes = boxes[
+                (boxes[:, 0] < xs.max() + half_width)
+                & (boxes[:, 2] > xs.min() - half_width)
+                & (boxes[:, 1] < ys.max() + half_height)
+                & (boxes[:, 3] > ys.min() - half_height)
+            ]
+            xs, ys = xs[:, numpy.newaxis], ys[:, numpy.newaxis]
+            blocked = (
+                (boxes[:, 0] < xs + half_width)
+                & (boxes[:, 2] > xs - half_width)
+                & (boxes[:, 1] < ys + half_height)
+                & (boxes[:, 3] > ys - half_height)
+            ).any(axis=1)
+            free = numpy.flatnonzero(~blocked)
+            if len(free):
+                break
+            start += chunk_size
+            chunk_size = min(chunk_size * 2, self.max_chunk_size)
+        found = int(free[0])
+        self._hints[(width, height)] = start + found
+        center_x, center_y = float(xs[found, 0]), float(ys[found, 0])
+        self._add(item, (center_x - half_width, center_y - half_height, center_x + half_width, center_y + half_height))
+        return center_x, center_y
+
+    def arrange(self, items: Sequence[Hashable], sizes: Sequence[Size]) -> numpy.ndarray:
+        """Forget all placed rectangles, lay out the given ones and return their centers as an (n, 2) array."""
+        self.clear()
+        count = len(items)
+        if count == 0:
+            return numpy.empty((0, 2))
+        dimensions = numpy.asarray(sizes, dtype=float).reshape(count, 2)
+        order = self._random.permutation(count)
+        widths = dimensions[order, 0] + self.padding
+        row_height = dimensions[:, 1].max() + self.padding
+
+        # Grow the ellipse until its rows can take all the rectangles
+        total_width = widths.sum()
+        semi_minor = max(self.height / 2, row_height / 2)
+        semi_major = semi_minor * self.aspect
+        semi_minor *= max(1.0, math.sqrt(total_width * row_height / (math.pi * semi_major * semi_minor)))
+        while True:
+            half_rows = int(semi_minor / row_height)
+            # Rows alternate around the center line: 0, 1, -1, 2, -2, ...
+            offsets = numpy.arange(1, 2 * half_rows + 2) // 2 * numpy.resize([1, -1], 2 * half_rows + 1)
+            heights = numpy.clip(1 - (offsets * row_height / semi_minor) ** 2, 0, 1)
+            capacities = 2 * semi_minor * self.aspect * numpy.sqrt(heights)
+            capacities = numpy.maximum(capacities, widths.max())
+            if capacities.sum() >= total_width:
+                break
+            semi_minor *= 1.1
+
+        starts = numpy.cumsum(widths) - widths
+        rows = numpy.searchsorted(numpy.cumsum(capacities), starts, side="right")
+        first = numpy.searchsorted(rows, rows, side="left")
+        last = numpy.searchsorted(rows, rows, side="right") - 1
+        row_widths = starts[last] + widths[last] - starts[first]
+        centers = numpy.empty((count, 2))
+        centers[order, 0] = self.center_x - row_widths / 2 + starts - starts[first] + widths / 2
+        centers[order, 1] = self.center_y + offsets[rows] * row_height
+
+        half_sizes = (dimensions + self.padding) / 2
+        self._boxes = numpy.concatenate([centers - half_sizes, centers + half_sizes], axis=1)
+        self._count = count
+        self._items = list(items)
+        self._index = {item: index for index, item in enumerate(self._items)}
+        # The rows inside the outermost one are full, so searching the spiral can start outside of them
+        inner_radius = max(int(numpy.abs(offsets[rows[-1]])) - 1, 0) * row_height
+        self._first_free = int(math.pi * (inner_radius / self.step) * (inner_radius / self.step))
+        return centers
+
+    def remove(self, item: Hashable) -> None:
+        index = self._index.pop(item)
+        last = self._count - 1
+        if index != last:
+            moved = self._items[last]
+            self._items[index] = moved
+            self._boxes[index] = self._boxes[last]
+            self._index[moved] = index
+        self._items.pop()
+        self._count = last
+        # Freed space could be taken by sizes that didn't fit before
+        self._hints.clear()
+        self._first_free = 0
+
+    def clear(self) -> None:
+        self._count = 0
+        self._items = list()
+        self._index = dict()
+        self._hints.clear()
+        self._first_free = 0
+
+    def _add(self, item: Hashable, box: Tuple[float, float, float, float]) -> None:
+        if self._count == len(self._boxes):
+            self._boxes = numpy.concatenate([self._boxes, numpy.empty_like(self._boxes)])
+        self._boxes[self._count] = box
+        self._index[item] = self._count
+        self._items.append(item)
+        self._count += 1
+
+    def _spiral(self, start: int, end: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Points start to end of an Archimedean spiral whose turns and points are step apart."""
+        # With r = step * theta / 2pi, the arc length up to theta is about step * theta^2 / 4pi
+        theta = numpy.sqrt(4 * math.pi * numpy.arange(start, end))
+        radius = self.step * theta / (2 * math.pi)
+        angle = theta + self._angle
+        return self.center_x + radius * numpy.cos(angle) * self.aspect, self.center_y + radius * numpy.sin(angle)
@@ -0,0 +1,218 @@
+import json
+import os
+import string
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import PIL.ImageFont
+
+from wonderland.config import FONT_METRICS_PATH
+from wonderland.ui.labels import _FONT_SCALE, _SUPERSAMPLING, load_font
+
+# (font name, font size, italic)
+FontKey = Tuple[str, int, bool]
+
+FONT_METRICS_VERSION: int = 1
+# Measured by warm_up() unless told otherwise
+WARM_UP_CHARACTERS: str = string.ascii_letters + string.digits + string.punctuation + " "
+
+
+def _font_path(font: PIL.ImageFont.ImageFont) -> Optional[str]:
+    # The bitmap font PIL falls back to has no path
+    return getattr(font, "path", None)
+
+
+class FontMetrics:
+    """
+    Advance widths of the glyphs of a font at one size, in pixels as draw_label() renders them.
+
+    Glyphs are measured the first time they are asked for and remembered, so the extents of a text are
+    a sum of lookups. Kerning is not taken into account.
+
+    """
+
+    # Text widths remembered, on top of the glyphs
+    max_texts: int = 4096
+
+    def __init__(
+        self,
+        font_name: str,
+        font_size: int,
+        italic: bool = False,
+        advances: Optional[Dict[str, float]] = None,
+        line_height: Optional[float] = None,
+    ) -> None:
+        self.font_name: str = font_name
+        self.font_size: int = font_size
+        self.italic: bool = italic
+        self.advances: Dict[str, float] = advances if advances is not None else dict()
+        self._line_height: Optional[float] = line_height
+        self._font_path: Optional[str] = None
+        self._widths: Dict[str, float] = dict()
+        # Whether glyphs were measured since the metrics were loaded
+        self.changed: bool = advances is None
+
+    @property
+    def key(self) -> FontKey:
+        return self.font_name, self.font_size, self.italic
+
+    @property
+    def font(self) -> PIL.ImageFont.ImageFont:
+        return load_font(self.font_name, int(self.font_size * _FONT_SCALE * _SUPERSAMPLING), self.italic)
+
+    @property
+    def font_path(self) -> Optional[str]:
+        if self._font_path is None:
+            self._font_path = _font_path(self.font)
+        return self._font_path
+
+    @property
+    def line_height(self) -> float:
+        if self._line_height is None:
+            self.measure("")
+        return self._line_height  # type: ignore
+
+    def measure(self, characters: Iterable[str]) -> None:
+        """Measure the characters and the line height, unless they are known already."""
+        missing = [character for character in dict.fromkeys(characters) if character not in self.advances]
+        if not missing and self._line_height is not None:
+            return
+        font = self.font
+        for character in missing:
+            self.advances[character] = font.getsize(character)[0] / _SUPERSAMPLING
+        if self._line_height is None:
+            if hasattr(font, "getmetrics"):
+                ascent, descent = font.getmetrics()
+                self._line_height = (ascent + descent) / _SUPERSAMPLING
+            else:
+                self._line_height = font.getsize("Ag")[1] / _SUPERSAMPLING
+        self.changed = True
+
+    def text_width(self, text: str) -> float:
+        """Width of the widest line of the text."""
+        width = self._widths.get(text)
+        if width is None:
+            advances = self.advances
+            if not all(character in advances for character in text):
+                self.measure(text)
+            width = max(sum(advances[character] for character in line) for line in text.split("\n"))
+            if len(self._widths) >= self.max_texts:
+                self._widths.clear()
+            self._widths[text] = width
+        return width
+
+    def text_size(self, text: str) -> Tuple[float, float]:
+        return self.text_width(text), self.line_height * (text.count("\n") + 1)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "font_name": self.font_name,
+            "font_size": self.font_size,
+            "italic": self.italic,
+            "font_path": self.font_path,
+            "line_height": self.line_height,
+            "advances": self.advances,
+        }
+
+
+class FontMetricsCache:
+    """
+    Share the FontMetrics of every font and size the UI uses.
+
+    Text extents are computed from measured glyphs without rendering anything, so elements can lay
+    themselves out before their labels exist. warm_up() measures the characters a font is likely to
+    show ahead of time. The measurements can be saved to path and loaded on the next launch, which then
+    only measures glyphs it hasn't seen yet. Saved metrics of a font that now resolves to another font
+    file are measured again.
+
+    """
+
+    def __init__(self, path: Optional[str] = FONT_METRICS_PATH) -> None:
+        self.path: Optional[str] = path
+        self._metrics: Dict[FontKey, FontMetrics] = dict()
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def __contains__(self, key: FontKey) -> bool:
+        return key in self._metrics
+
+    def get(self, font_name: str, font_size: int, italic: bool = False) -> FontMetrics:
+        key = (font_name, font_size, italic)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = FontMetrics(font_name, font_size, italic)
+        return metrics
+
+    def text_width(self, text: str, font_name: str, font_size: int, italic: bool = False) -> float:
+        return self.get(font_name, font_size, italic).text_width(text)
+
+    def text_size(self, text: str, font_name: str, font_size: int, italic: bool = False) -> Tuple[float, float]:
+        return self.get(font_name, font_size, italic).text_size(text)
+
+    def line_height(self, font_name: str, font_size: int, italic: bool = False) -> float:
+        return self.get(font_name, font_size, italic).line_height
+
+    def warm_up(
+        self,
+        font_name: str,
+        font_sizes: Iterable[int],
+        italic: bool = False,
+        characters: str = WARM_UP_CHARACTERS,
+    ) -> None:
+        for font_size in font_sizes:
+            self.get(font_name, font_size, italic).measure(characters)
+
+    @property
+    def changed(self) -> bool:
+        return any(metrics.changed for metrics in self._metrics.values())
+
+    def clear(self) -> None:
+        self._metrics.clear()
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """Take over the metrics saved to a file, returns whether there were any."""
+        path = path if path is not None else self.path
+        if path is None or not os.path.exists(path):
+            return False
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != FONT_METRICS_VERSION:
+            return False
+        for entry in data["fonts"]:
+            metrics = FontMetrics(
+                entry["font_name"],
+                entry["font_size"],
+                entry["italic"],
+                advances=entry["advances"],
+                line_height=entry["line_height"],
+            )
+            # The font might have been installed or replaced since
+            if entry["font_path"] == metrics.font_path and metrics.key not in self._metrics:
+                self._metrics[metrics.key] = metrics
+        return True
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path if path is not None else self.path
+        if path is None:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(
+                {
+                    "version": FONT_METRICS_VERSION,
+                    "fonts": [metrics.to_json() for metrics in self._metrics.values()],
+                },
+                file,
+            )
+        os.replace(temporary_path, path)
+        for metrics in self._metrics.values():
+            metrics.changed = False
+
+
+font_metrics: FontMetricsCache = FontMetricsCache()
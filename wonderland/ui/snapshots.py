@@ -0,0 +1,153 @@
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import arcade
+
+from wonderland.ui.labels import draw_label
+from wonderland.ui.sprites import keep_sprites, release_sprite_list
+
+
+class SpriteState(NamedTuple):
+    """
+    How a sprite is drawn: its texture, where, how large and tinted with which color.
+
+    """
+
+    texture: arcade.Texture
+    center_x: float
+    center_y: float
+    width: float
+    height: float
+    color: Tuple[int, int, int] = (255, 255, 255)
+    alpha: int = 255
+
+    @classmethod
+    def of(cls, sprite: arcade.Sprite) -> "SpriteState":
+        return cls(
+            sprite.texture, sprite.center_x, sprite.center_y, sprite.width, sprite.height, sprite.color, sprite.alpha
+        )
+
+
+class LabelState(NamedTuple):
+    """
+    The arguments of a draw_label() call.
+
+    """
+
+    text: str
+    start_x: float
+    start_y: float
+    color: arcade.arcade_types.Color
+    font_size: int
+    font_name: str
+    width: int = 0
+    align: str = "left"
+    italic: bool = False
+    anchor_x: str = "left"
+    anchor_y: str = "baseline"
+
+    def draw(self) -> None:
+        draw_label(*self)
+
+
+DrawState = Union[SpriteState, LabelState]
+
+
+class Snapshot(NamedTuple):
+    """
+    What the screen looks like after a tick of the simulation, as the states of what is drawn, bottom to top.
+
+    """
+
+    tick: int
+    items: Tuple[DrawState, ...]
+    # Which time the loading screen was shown, see ScreenManager.loading_shown, if the snapshot shows it, else 0
+    loading: int = 0
+
+
+class SnapshotRenderer:
+    """
+    Draw snapshots, on the thread that owns the OpenGL context.
+
+    Runs of consecutive sprites are drawn from sprite lists of the renderer's own, one per run, and
+    labels in between them through the label cache. The sprites of a run are kept from frame to frame
+    and only the ones whose state differs from the previous snapshot are updated, so a snapshot that
+    is drawn again, or that only moved a few sprites, costs little more than the draw calls.
+
+    on_loading_drawn is called with Snapshot.loading after drawing a snapshot that shows the loading
+    screen, so that the simulation only starts heavy work once the loading screen really is on screen.
+
+    """
+
+    def __init__(self, on_loading_drawn: Optional[Callable[[int], None]] = None) -> None:
+        self.on_loading_drawn: Optional[Callable[[int], None]] = on_loading_drawn
+        self._sprite_lists: List[arcade.SpriteList] = list()
+        self._states: List[List[SpriteState]] = list()
+        self._drawn: Optional[Snapshot] = None
+        self._steps: List[Union[int, LabelState]] = list()
+
+    def draw(self, snapshot: Optional[Snapshot]) -> None:
+        if snapshot is None:
+            return
+        if snapshot is not self._drawn:
+            self._prepare(snapshot.items)
+            self._drawn = snapshot
+        for step in self._steps:
+            if isinstance(step, LabelState):
+                step.draw()
+            else:
+                self._sprite_lists[step].draw()
+        if snapshot.loading and self.on_loading_drawn is not None:
+            self.on_loading_drawn(snapshot.loading)
+
+    def release(self) -> None:
+        """Free the GPU resources of the sprite lists. They are rebuilt on the next draw."""
+        for sprite_list in self._sprite_lists:
+            release_sprite_list(sprite_list)
+
+    def _prepare(self, items: Sequence[DrawState]) -> None:
+        self._steps = list()
+        run: List[SpriteState] = list()
+        runs = 0
+        for item in items:
+            if isinstance(item, SpriteState):
+                run.append(item)
+                continue
+            if run:
+                self._sync(runs, run)
+                self._steps.append(runs)
+                runs += 1
+                run = list()
+            self._steps.append(item)
+        if run:
+            self._sync(runs, run)
+            self._steps.append(runs)
+            runs += 1
+        for index in range(runs, len(self._sprite_lists)):
+            self._sync(index, [])
+
+    def _sync(self, index: int, states: List[SpriteState]) -> None:
+        """Make the sprites of a run match the states, touching only the ones that changed."""
+        if index == len(self._sprite_lists):
+            self._sprite_lists.append(arcade.SpriteList())
+            self._states.append(list())
+        sprite_list = self._sprite_lists[index]
+        previous = self._states[index]
+        for position, state in enumerate(states):
+            if position < len(previous):
+                if state == previous[position]:
+                    continue
+                sprite = sprite_list[position]
+            else:
+                sprite = arcade.Sprite()
+            if sprite.texture is not state.texture:
+                sprite.texture = state.texture
+            sprite.position = (state.center_x, state.center_y)
+            sprite.width = state.width
+            sprite.height = state.height
+            sprite.color = state.color
+            sprite.alpha = state.alpha
+            if position >= len(previous):
+                sprite_list.append(sprite)
+        if len(states) < len(previous):
+            keep_sprites(sprite_list, [sprite_list[position] for position in range(len(states))])
+        self._states[index] = states
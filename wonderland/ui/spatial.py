@@ -0,0 +1,73 @@
+import math
+from typing import Dict, Generic, Hashable, Iterator, List, Set, Tuple, TypeVar
+
+# (left, bottom, right, top)
+Bounds = Tuple[float, float, float, float]
+Cell = Tuple[int, int]
+CellRange = Tuple[int, int, int, int]
+
+T = TypeVar("T", bound=Hashable)
+
+
+class SpatialGrid(Generic[T]):
+    """
+    Uniform grid over axis-aligned bounding boxes for finding the items under a point.
+
+    Each item is registered in every cell its bounding box touches, so a point query only has to
+    look at the items of a single cell.
+
+    """
+
+    def __init__(self, cell_size: float = 64.0) -> None:
+        self.cell_size: float = cell_size
+        self._cells: Dict[Cell, Set[T]] = dict()
+        self._cell_ranges: Dict[T, CellRange] = dict()
+
+    def __len__(self) -> int:
+        return len(self._cell_ranges)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._cell_ranges
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._cell_ranges)
+
+    def insert(self, item: T, bounds: Bounds) -> None:
+        cell_range = self._cell_range(bounds)
+        self._cell_ranges[item] = cell_range
+        for cell in self._cells_in(cell_range):
+            self._cells.setdefault(cell, set()).add(item)
+
+    def remove(self, item: T) -> None:
+        for cell in self._cells_in(self._cell_ranges.pop(item)):
+            items = self._cells[cell]
+            items.discard(item)
+            if not items:
+                del self._cells[cell]
+
+    def update(self, item: T, bounds: Bounds) -> None:
+        if self._cell_ranges.get(item) != self._cell_range(bounds):
+            self.remove(item)
+            self.insert(item, bounds)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._cell_ranges.clear()
+
+    def query_point(self, x: float, y: float) -> Set[T]:
+        """Items whose cells contain the point. Callers still have to check the items' exact shape."""
+        return self._cells.get((math.floor(x / self.cell_size), math.floor(y / self.cell_size)), set())
+
+    def _cell_range(self, bounds: Bounds) -> CellRange:
+        left, bottom, right, top = bounds
+        return (
+            math.floor(left / self.cell_size),
+            math.floor(bottom / self.cell_size),
+            math.floor(right / self.cell_size),
+            math.floor(top / self.cell_size),
+        )
+
+    @staticmethod
+    def _cells_in(cell_range: CellRange) -> List[Cell]:
+        left, bottom, right, top = cell_range
+        return [(i, j) for i in range(left, right + 1) for j in range(bottom, top + 1)]
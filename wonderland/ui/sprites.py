@@ -0,0 +1,110 @@
+"""
+Helpers for arcade sprites, and the one place that reaches into the internals of arcade's SpriteList.
+
+arcade 2.1.3 has no public way to free a sprite list's GPU buffers, to change many of its sprites with
+a single rebuild of its buffers, or to take a sprite out of a list without the sprite still pushing
+updates to it. The functions below do that through attributes of SpriteList and Sprite that are private
+and may change between arcade versions. They check those attributes are there and otherwise fall back
+to the public API, which is slower, and importing this module with another arcade version warns.
+
+"""
+
+import warnings
+from typing import List, Optional, Sequence
+
+import arcade
+import PIL.Image
+
+# The arcade version whose SpriteList internals this module was written against, the one poetry.lock pins
+ARCADE_VERSION: str = "2.1.3"
+
+# Private SpriteList attributes used to rebuild a list once, instead of once per changed sprite
+_SPRITE_LIST_INTERNALS = ("sprite_list", "sprite_idx", "vao")
+# Private SpriteList attributes holding its GPU buffers and texture atlas, with the values of a list not drawn yet
+_SPRITE_LIST_BUFFERS = (
+    ("vao", None),
+    ("sprite_data_buf", None),
+    ("vbo_buf", None),
+    ("_texture", None),
+    ("array_of_texture_names", list),
+    ("array_of_images", None),
+)
+
+if arcade.VERSION != ARCADE_VERSION:
+    warnings.warn(
+        "wonderland.ui.sprites was written against the SpriteList internals of arcade {}, found arcade {}".format(
+            ARCADE_VERSION, arcade.VERSION
+        )
+    )
+
+_solid_texture: Optional[arcade.Texture] = None
+
+
+def solid_texture() -> arcade.Texture:
+    """Plain white texture, for drawing rectangles as sprites tinted with their color."""
+    global _solid_texture
+    if _solid_texture is None:
+        _solid_texture = arcade.Texture("wonderland:solid", PIL.Image.new("RGBA", (4, 4), (255, 255, 255, 255)))
+    return _solid_texture
+
+
+def remove_sprite(sprite_list: arcade.SpriteList, sprite: arcade.Sprite) -> None:
+    sprite_list.remove(sprite)
+    # SpriteList.remove leaves the list registered with the sprite, which would keep pushing updates to it
+    _unregister(sprite_list, sprite)
+
+
+def keep_sprites(sprite_list: arcade.SpriteList, kept: Sequence[arcade.Sprite]) -> None:
+    """Remove every sprite but the kept ones from the list, which rebuilds its buffers once, not once per sprite."""
+    keep = set(kept)
+    if not _has_internals(sprite_list):
+        for sprite in list(sprite_list):
+            if sprite not in keep:
+                remove_sprite(sprite_list, sprite)
+        return
+    for sprite in sprite_list.sprite_list:
+        if sprite not in keep:
+            _unregister(sprite_list, sprite)
+    _set_sprites(sprite_list, list(kept))
+
+
+def insert_sprites(sprite_list: arcade.SpriteList, index: int, sprites: Sequence[arcade.Sprite]) -> None:
+    """Insert sprites at index. The list keeps its texture atlas, only its buffers get rebuilt."""
+    if not _has_internals(sprite_list):
+        following = list(sprite_list)[index:]
+        for sprite in following:
+            remove_sprite(sprite_list, sprite)
+        for sprite in list(sprites) + following:
+            sprite_list.append(sprite)
+        return
+    items = list(sprite_list.sprite_list)
+    items[index:index] = sprites
+    _set_sprites(sprite_list, items)
+    for sprite in sprites:
+        sprite.register_sprite_list(sprite_list)
+
+
+def release_sprite_list(sprite_list: arcade.SpriteList) -> None:
+    # Dropping the texture atlas and buffers makes the next draw() build them again. With internals this
+    # module doesn't know, the list keeps its buffers rather than being left half reset.
+    if not all(hasattr(sprite_list, name) for name, _ in _SPRITE_LIST_BUFFERS):
+        return
+    for name, empty in _SPRITE_LIST_BUFFERS:
+        setattr(sprite_list, name, empty() if callable(empty) else empty)
+
+
+def _has_internals(sprite_list: arcade.SpriteList) -> bool:
+    return all(hasattr(sprite_list, name) for name in _SPRITE_LIST_INTERNALS)
+
+
+def _unregister(sprite_list: arcade.SpriteList, sprite: arcade.Sprite) -> None:
+    sprite_lists = getattr(sprite, "sprite_lists", None)
+    if sprite_lists is not None and sprite_list in sprite_lists:
+        sprite_lists.remove(sprite_list)
+
+
+def _set_sprites(sprite_list: arcade.SpriteList, sprites: List[arcade.Sprite]) -> None:
+    sprite_list.sprite_list = sprites
+    sprite_list.sprite_idx = {sprite: i for i, sprite in enumerate(sprites)}
+    # The buffers are rebuilt from the sprites on the next draw
+    sprite_list.vao = None
@@ -0,0 +1,152 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Set, Tuple
+
+import arcade
+import PIL.Image
+
+from wonderland.assets import scale_image
+from wonderland.config import TEXTURE_VARIANT_SCALES
+from wonderland.ui.config import TEXTURE_CACHE_MAX_UNUSED
+
+TextureKey = Tuple[str, float]
+
+
+class _TextureEntry:
+    def __init__(self, texture: arcade.Texture, memory: int) -> None:
+        self.texture: arcade.Texture = texture
+        self.memory: int = memory
+        self.ref_count: int = 0
+
+
+class TextureCache:
+    """
+    Process-wide registry of textures keyed by image path and scale.
+
+    Every acquire() has to be paired with a release(). Textures that are no longer referenced
+    are kept for reuse, and the least recently released ones are evicted once more than
+    max_unused of them pile up. Textures the asset pipeline preloads with add() are not evicted
+    before they have been acquired once, however many images a screen preloads, or the elements
+    they were loaded for would decode them again on the main thread.
+
+    Images are meant to be used at one of the variant_scales, which the asset pipeline scales them to
+    as it loads them. Drawing an image scaled down a lot samples far more pixels than are shown, and
+    aliases, so closest_scale() picks the smallest variant that is still at least as large as needed.
+
+    The asset pipeline adds textures on the thread that draws, while a threaded simulation acquires and
+    releases them on its own, so the cache is guarded by a lock.
+
+    """
+
+    def __init__(
+        self, max_unused: int = TEXTURE_CACHE_MAX_UNUSED, variant_scales: Tuple[float, ...] = TEXTURE_VARIANT_SCALES
+    ) -> None:
+        self.max_unused: int = max_unused
+        self.variant_scales: Tuple[float, ...] = tuple(sorted(variant_scales))
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._entries: Dict[TextureKey, _TextureEntry] = dict()
+        self._unused: "OrderedDict[TextureKey, None]" = OrderedDict()
+        # Textures added by the asset pipeline that haven't been acquired yet
+        self._preloaded: Set[TextureKey] = set()
+        self._lock: threading.RLock = threading.RLock()
+
+    @property
+    def memory(self) -> int:
+        """Decoded size of all cached textures in bytes."""
+        with self._lock:
+            return sum(entry.memory for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: TextureKey) -> bool:
+        return key in self._entries
+
+    def closest_scale(self, scale: float) -> float:
+        """The smallest variant scale at least as large as scale, or the largest variant for anything above it."""
+        for variant_scale in self.variant_scales:
+            if variant_scale >= scale:
+                return variant_scale
+        return self.variant_scales[-1]
+
+    def acquire(self, path: str, scale: float = 1.0) -> arcade.Texture:
+        key = (path, scale)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                entry = self._load(path, scale)
+                self._entries[key] = entry
+            else:
+                self.hits += 1
+                self._unused.pop(key, None)
+                self._preloaded.discard(key)
+            entry.ref_count += 1
+            return entry.texture
+
+    def add(self, path: str, image: PIL.Image.Image, scale: float = 1.0) -> arcade.Texture:
+        """Put an image decoded, and scaled to scale, elsewhere in the cache, unless it is cached already."""
+        key = (path, scale)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._create_entry(path, scale, image)
+                self._entries[key] = entry
+                self._preloaded.add(key)
+            return entry.texture
+
+    def release(self, path: str, scale: float = 1.0) -> None:
+        key = (path, scale)
+        with self._lock:
+            entry = self._entries[key]
+            entry.ref_count -= 1
+            if entry.ref_count <= 0:
+                entry.ref_count = 0
+                self._unused[key] = None
+                self._evict()
+
+    def release_all(self, keys: Iterable[TextureKey]) -> None:
+        with self._lock:
+            for path, scale in keys:
+                self.release(path, scale)
+
+    def clear_unused(self) -> None:
+        with self._lock:
+            for key in self._unused:
+                del self._entries[key]
+                self.evictions += 1
+            self._unused.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "unused": len(self._unused),
+                "preloaded": len(self._preloaded),
+                "memory": self.memory,
+            }
+
+    def _evict(self) -> None:
+        while len(self._unused) > self.max_unused:
+            key, _ = self._unused.popitem(last=False)
+            del self._entries[key]
+            self.evictions += 1
+
+    def _load(self, path: str, scale: float) -> _TextureEntry:
+        # Variants that weren't preloaded are scaled from the full size image, if that is cached
+        original = self._entries.get((path, 1.0))
+        image = original.texture.image if original is not None else PIL.Image.open(path).convert("RGBA")
+        return self._create_entry(path, scale, scale_image(image, scale))
+
+    @staticmethod
+    def _create_entry(path: str, scale: float, image: PIL.Image.Image) -> _TextureEntry:
+        texture = arcade.Texture("{}@{}".format(path, scale), image)
+        return _TextureEntry(texture, image.width * image.height * len(image.getbands()))
+
+
+texture_cache: TextureCache = TextureCache()
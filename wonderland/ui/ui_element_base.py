@@ -1,29 +1,53 @@
-from typing import List, Optional
+import bisect
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
 from abc import ABC, abstractmethod
 
 import arcade
 
+from wonderland.profiling import profiler
+from wonderland.ui.geometry import Bounds, GeometryStore
+from wonderland.ui.layers import RenderLayer, current_clip
+from wonderland.ui.snapshots import DrawState
+
 
 class UIElement(ABC):
     """
     Abstract base class for Wonderland UI elements.
 
+    The base classes give their attributes class level defaults, so reading them needs no hasattr()
+    checks.
+
     """
 
+    parent: Optional["UIContainer"] = None
+    _z_value: float = 0.0
+
     @property
     def z_value(self) -> float:
-        if not hasattr(self, "_z_value"):
-            self._z_value = 0.0
         return self._z_value
 
     @z_value.setter
     def z_value(self, value: float) -> None:
         self._z_value = value
+        if self.parent is not None:
+            self.parent.update_z_value(self)
 
     @abstractmethod
     def draw(self) -> None:
         raise NotImplementedError
 
+    def snapshot(self, items: List[DrawState]) -> None:
+        """Append the states of what draw() would draw, so that another thread can draw them."""
+
+    def mark_changed(self) -> None:
+        """Report a change in how the element looks to the containers drawing it."""
+        if self.parent is not None:
+            self.parent.child_changed(self)
+
+    def release_resources(self) -> None:
+        """Free the GPU resources the element holds. They are created again the next time it is drawn."""
+
 
 class Clickable(ABC):
     """
@@ -44,12 +68,15 @@ class Hoverable(ABC):
     """
     Abstract base class for stuff that the mouse can hover over.
 
+    on_hover() is called when the mouse enters the element and on_hover_end() when it leaves, once
+    each. Moving the mouse within the element calls on_hover_stay() instead.
+
     """
 
+    _hover_is_active: bool = False
+
     @property
     def hover_is_active(self) -> bool:
-        if not hasattr(self, "_hover_is_active"):
-            self._hover_is_active = False
         return self._hover_is_active
 
     @abstractmethod
@@ -64,10 +91,89 @@ class Hoverable(ABC):
     def on_hover_end(self) -> None:
         raise NotImplementedError
 
+    def on_hover_stay(self) -> None:
+        pass
+
+
+class UIElementList(list):
+    """
+    List of the UI elements of a container that keeps the container's hit-testing index up to date.
+
+    """
+
+    def __init__(self, container: "UIContainer") -> None:
+        super().__init__()
+        self._container: UIContainer = container
+
+    def append(self, ui_element: UIElement) -> None:
+        super().append(ui_element)
+        self._container._on_element_added(ui_element)
+
+    def extend(self, ui_elements: Iterable[UIElement]) -> None:
+        for ui_element in ui_elements:
+            self.append(ui_element)
+
+    def insert(self, index: Any, ui_element: UIElement) -> None:
+        super().insert(index, ui_element)
+        self._container._on_element_added(ui_element)
+
+    def remove(self, ui_element: UIElement) -> None:
+        super().remove(ui_element)
+        self._container._on_element_removed(ui_element)
+
+    def pop(self, index: Any = -1) -> UIElement:
+        ui_element = super().pop(index)
+        self._container._on_element_removed(ui_element)
+        return ui_element
+
+    def clear(self) -> None:
+        while self:
+            self.pop()
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__setitem__(index, value)
+        for ui_element in removed:
+            self._container._on_element_removed(ui_element)
+        for ui_element in value if isinstance(index, slice) else [value]:
+            self._container._on_element_added(ui_element)
+
+    def __delitem__(self, index: Any) -> None:
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for ui_element in removed:
+            self._container._on_element_removed(ui_element)
+
+    def __iadd__(self, ui_elements: Iterable[UIElement]) -> "UIElementList":  # type: ignore
+        self.extend(ui_elements)
+        return self
+
 
 class UIContainer(UIElement, ABC):
+    """
+    Base class for UI elements that hold other UI elements.
+
+    The geometry of Rectangle elements is kept in a GeometryStore, so that finding the elements under
+    the cursor only tests the ones in the grid cell under it, and finding the ones a cached layer has to
+    re-render is a vectorized pass over all of them.
+    Where elements overlap, the topmost one gets the event.
+
+    The render order is kept sorted by z_value as elements are added, removed or change their z_value,
+    so drawing a frame needs no sorting. Elements with equal z_value are drawn in the order they were added.
+
+    Cacheable containers draw into a RenderLayer and only re-render the regions of elements that
+    reported a change since the last frame.
+
+    Containers that arrange their children implement _arrange() and call _layout_changed() whenever
+    the arrangement is out of date. Inside batch_update(), arranging is put off until the batch ends.
+
+    """
 
     active_hoverable: Optional[Hoverable] = None
+    cacheable: bool = False
+    _layer: Optional[RenderLayer] = None
+    _batch_depth: int = 0
+    _layout_pending: bool = False
 
     @classmethod
     def _set_active_hoverable(cls, value: Hoverable):
@@ -76,77 +182,307 @@ class UIContainer(UIElement, ABC):
     @property
     def ui_elements(self) -> List[UIElement]:
         if not hasattr(self, "_ui_elements"):
-            self._ui_elements: List[UIElement] = list()
+            self._geometry: GeometryStore = GeometryStore()
+            self._unindexed: List[UIElement] = list()
+            self._containers: List[UIContainer] = list()
+            self._hovered: List[Hoverable] = list()
+            self._render_order: List[UIElement] = list()
+            self._render_keys: List[Tuple[float, int]] = list()
+            self._render_key: Dict[UIElement, Tuple[float, int]] = dict()
+            self._next_sequence: int = 0
+            self._ui_elements: List[UIElement] = UIElementList(self)
         return self._ui_elements
 
+    @property
+    def render_order(self) -> Sequence[UIElement]:
+        """Children from bottom to top."""
+        return self._render_order if hasattr(self, "_render_order") else ()
+
+    def top_down(self) -> Iterator[UIElement]:
+        """Iterate over the children from top to bottom."""
+        return reversed(self.render_order)
+
     def draw(self) -> None:
-        for ui_element in sorted(self.ui_elements, key=lambda el: el.z_value):
-            ui_element.draw()
+        if self.cacheable:
+            if self._layer is None:
+                self._layer = RenderLayer()
+            self._layer.draw(self._draw_elements, self._painted_elements)
+        else:
+            self._draw_elements()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        for ui_element in self.render_order:
+            ui_element.snapshot(items)
+
+    def release_layer(self) -> None:
+        """Free the offscreen framebuffer of a cacheable container. It is rebuilt on the next draw."""
+        if self._layer is not None:
+            self._layer.release()
+
+    def release_resources(self) -> None:
+        self.release_layer()
+        for ui_element in self.ui_elements:
+            ui_element.release_resources()
+
+    @contextmanager
+    def batch_update(self) -> Iterator["UIContainer"]:
+        """Put off arranging the children until the outermost batch ends, then arrange them once."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._layout_pending:
+                self._layout_pending = False
+                self._arrange()
+
+    def _layout_changed(self) -> None:
+        if self._batch_depth:
+            self._layout_pending = True
+        else:
+            self._arrange()
+
+    def _arrange(self) -> None:
+        """Position the children. Containers that lay out their children override this."""
+
+    def child_changed(self, ui_element: UIElement) -> None:
+        """Called when a descendant element changed, to mark its region of cached layers as dirty."""
+        if self._layer is not None:
+            self._layer.invalidate(ui_element, ui_element.bounds if isinstance(ui_element, Rectangle) else None)
+        if self.parent is not None:
+            self.parent.child_changed(ui_element)
+
+    def child_removed(self, ui_element: UIElement) -> None:
+        """Called when a descendant element was removed, to clear its region of cached layers."""
+        if self._layer is not None:
+            if isinstance(ui_element, Rectangle):
+                self._layer.forget(ui_element)
+            else:
+                self._layer.invalidate_all()
+        if self.parent is not None:
+            self.parent.child_removed(ui_element)
+
+    def update_z_value(self, ui_element: UIElement) -> None:
+        """Called by child elements whenever their z_value changes."""
+        _, sequence = self._render_key[ui_element]
+        self._remove_from_render_order(ui_element)
+        self._insert_into_render_order(ui_element, (ui_element.z_value, sequence))
+        if ui_element in self._geometry:
+            self._geometry.update_rank(ui_element, self._render_key[ui_element])
+        self.child_changed(ui_element)
+
+    def update_bounds(self, ui_element: "Rectangle") -> None:
+        """Called by Rectangle elements whenever their position or size changes."""
+        if ui_element in self._geometry:
+            self._geometry.update(ui_element, ui_element.geometry)
+        self.child_changed(ui_element)  # type: ignore
+
+    def element_at(self, x: float, y: float, kind: Type = UIElement) -> Optional[Any]:
+        """Return the topmost direct child of the given kind that collides with the point."""
+        if not self.ui_elements:
+            return None
+        top_element = None
+        top_rank = None
+        # The store hands out the rectangles under the point from the top one down
+        for ui_element in self._geometry.at_point(x, y):
+            if isinstance(ui_element, kind) and ui_element.collides_with_point((x, y)):
+                top_element, top_rank = ui_element, self._render_key[ui_element]
+                break
+        for ui_element in self._unindexed:
+            if isinstance(ui_element, kind) and ui_element.collides_with_point((x, y)):
+                rank = self._render_key[ui_element]
+                if top_rank is None or rank > top_rank:
+                    top_element, top_rank = ui_element, rank
+        return top_element
 
     def on_mouse_motion(self, x: float, y: float) -> None:
-        for ui_element in self.ui_elements:
-            if isinstance(ui_element, Hoverable) and ui_element.collides_with_point((x, y)):
-                if ui_element is not self.active_hoverable:
-                    if self.active_hoverable is not None:
-                        self.active_hoverable.on_hover_end()
-                        self.active_hoverable._hover_is_active = False
-                    self._set_active_hoverable(ui_element)
-                ui_element._hover_is_active = True
-                ui_element.on_hover()
-            elif isinstance(ui_element, Hoverable) and ui_element.hover_is_active:
+        if not self.ui_elements:
+            return
+        if profiler.enabled:
+            with profiler.span(type(self).__name__ + ".hit_test", "input"):
+                hovered = self.element_at(x, y, Hoverable)
+        else:
+            hovered = self.element_at(x, y, Hoverable)
+        for ui_element in self._hovered:
+            if ui_element is not hovered and ui_element.hover_is_active:
                 ui_element._hover_is_active = False
                 ui_element.on_hover_end()
-            if hasattr(ui_element, "_ui_elements") and hasattr(ui_element, "on_mouse_motion"):
-                ui_element.on_mouse_motion(x, y)  # type: ignore
+        self._hovered.clear()
+        if hovered is not None:
+            if hovered is not self.active_hoverable:
+                if self.active_hoverable is not None and self.active_hoverable.hover_is_active:
+                    self.active_hoverable._hover_is_active = False
+                    self.active_hoverable.on_hover_end()
+                self._set_active_hoverable(hovered)
+            if hovered.hover_is_active:
+                hovered.on_hover_stay()
+            else:
+                hovered._hover_is_active = True
+                hovered.on_hover()
+            self._hovered.append(hovered)
+        for container in self._containers:
+            container.on_mouse_motion(x, y)
 
     def on_mouse_press(self, x: float, y: float, button: int) -> None:
-        for ui_element in self.ui_elements:
-            if isinstance(ui_element, Clickable) and ui_element.collides_with_point((x, y)):
-                if button is arcade.MOUSE_BUTTON_LEFT:
-                    ui_element.on_click()
-            if hasattr(ui_element, "_ui_elements") and hasattr(ui_element, "on_mouse_press"):
-                ui_element.on_mouse_press(x, y, button)  # type: ignore
+        if not self.ui_elements:
+            return
+        if button is arcade.MOUSE_BUTTON_LEFT:
+            if profiler.enabled:
+                with profiler.span(type(self).__name__ + ".hit_test", "input"):
+                    clicked = self.element_at(x, y, Clickable)
+            else:
+                clicked = self.element_at(x, y, Clickable)
+            if clicked is not None:
+                clicked.on_click()
+        for container in self._containers:
+            container.on_mouse_press(x, y, button)
+
+    def _draw_elements(self) -> None:
+        clip = current_clip()
+        visible = self._geometry.in_region(clip) if clip is not None and self.ui_elements else None
+        profiling = profiler.enabled
+        for ui_element in self.render_order:
+            if visible is not None and ui_element not in visible and ui_element in self._geometry:
+                continue
+            if profiling:
+                with profiler.span(type(ui_element).__name__ + ".draw", "draw"):
+                    ui_element.draw()
+            else:
+                ui_element.draw()
+
+    def _painted_elements(self) -> Iterator[Tuple[UIElement, Optional[Bounds]]]:
+        for ui_element in self.render_order:
+            if isinstance(ui_element, UIContainer):
+                yield from ui_element._painted_elements()
+            else:
+                yield ui_element, ui_element.bounds if isinstance(ui_element, Rectangle) else None
+
+    def _on_element_added(self, ui_element: UIElement) -> None:
+        ui_element.parent = self
+        self._insert_into_render_order(ui_element, (ui_element.z_value, self._next_sequence))
+        self._next_sequence += 1
+        if isinstance(ui_element, UIContainer):
+            self._containers.append(ui_element)
+        elif isinstance(ui_element, Rectangle):
+            self._geometry.add(ui_element, ui_element.geometry, self._render_key[ui_element])
+        elif isinstance(ui_element, (Hoverable, Clickable)):
+            self._unindexed.append(ui_element)
+        self.child_changed(ui_element)
+
+    def _on_element_removed(self, ui_element: UIElement) -> None:
+        if ui_element.parent is self:
+            ui_element.parent = None
+        self.child_removed(ui_element)
+        self._remove_from_render_order(ui_element)
+        if ui_element in self._containers:
+            self._containers.remove(ui_element)
+        elif ui_element in self._geometry:
+            self._geometry.remove(ui_element)
+        elif ui_element in self._unindexed:
+            self._unindexed.remove(ui_element)
+        if isinstance(ui_element, Hoverable) and ui_element in self._hovered:
+            self._hovered.remove(ui_element)
+
+    def _insert_into_render_order(self, ui_element: UIElement, key: Tuple[float, int]) -> None:
+        index = bisect.bisect(self._render_keys, key)
+        self._render_keys.insert(index, key)
+        self._render_order.insert(index, ui_element)
+        self._render_key[ui_element] = key
+
+    def _remove_from_render_order(self, ui_element: UIElement) -> None:
+        index = bisect.bisect_left(self._render_keys, self._render_key.pop(ui_element))
+        del self._render_keys[index]
+        del self._render_order[index]
 
 
 class Rectangle:
     """
-    Mixin that implements center_x, center_y, width and height properties and collides_with_point.
+    Mixin that implements center_x, center_y, width, height and scale properties and collides_with_point.
+
+    Changes to the geometry are reported to the parent container, to keep its GeometryStore up to date.
 
     """
 
+    _center_x: float = 0.0
+    _center_y: float = 0.0
+    _width: float = 0.0
+    _height: float = 0.0
+    _scale: float = 1.0
+
     @property
     def center_x(self) -> float:
-        return self._center_x if hasattr(self, "_center_x") else 0.0
+        return self._center_x
 
     @center_x.setter
     def center_x(self, value: float) -> None:
         self._center_x = value
+        self._geometry_changed()
 
     @property
     def center_y(self) -> float:
-        return self._center_y if hasattr(self, "_center_y") else 0.0
+        return self._center_y
 
     @center_y.setter
     def center_y(self, value: float) -> None:
         self._center_y: float = value
+        self._geometry_changed()
 
     @property
     def width(self) -> float:
-        return self._width if hasattr(self, "_width") else 0.0
+        return self._width
 
     @width.setter
     def width(self, value: float) -> None:
         self._width: float = value
+        self._geometry_changed()
 
     @property
     def height(self) -> float:
-        return self._height if hasattr(self, "_height") else 0.0
+        return self._height
 
     @height.setter
     def height(self, value: float) -> None:
         self._height = value
+        self._geometry_changed()
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+    @scale.setter
+    def scale(self, value: float) -> None:
+        self._scale: float = value
+        self._geometry_changed()
+
+    def move_to(self, center_x: float, center_y: float) -> None:
+        """Set both center coordinates, reporting a single geometry change."""
+        self._center_x = center_x
+        self._center_y = center_y
+        self._geometry_changed()
+
+    @property
+    def geometry(self) -> Tuple[float, float, float, float, float]:
+        """The geometry as (center_x, center_y, width, height, scale)."""
+        return self.center_x, self.center_y, self.width, self.height, self.scale
+
+    @property
+    def bounds(self) -> Bounds:
+        """Axis-aligned bounding box as (left, bottom, right, top)."""
+        half_width = self.width / 2
+        half_height = self.height / 2
+        return (
+            self.center_x - half_width,
+            self.center_y - half_height,
+            self.center_x + half_width,
+            self.center_y + half_height,
+        )
 
     def collides_with_point(self, point: arcade.arcade_types.Point) -> bool:
         return (self.center_x - self.width / 2 < point[0] < self.center_x + self.width / 2) and (
             self.center_y - self.height / 2 < point[1] < self.center_y + self.height / 2
         )
+
+    def _geometry_changed(self) -> None:
+        parent = getattr(self, "parent", None)
+        if parent is not None:
+            parent.update_bounds(self)
@@ -1,10 +1,14 @@
-import random
-from typing import List
+from typing import Iterable, List, Optional
 
 import arcade
 
 from wonderland.ui.ui_element_base import UIElement, UIContainer, Clickable, Hoverable, Rectangle
+from wonderland.ui.animation import animator
+from wonderland.ui.cards import card_index
 from wonderland.ui.config import FONT
+from wonderland.ui.metrics import font_metrics
+from wonderland.ui.layout import SpiralLayout
+from wonderland.ui.snapshots import DrawState, LabelState
 
 
 class Word(UIElement, Rectangle, Clickable, Hoverable):
@@ -17,21 +21,30 @@ class Word(UIElement, Rectangle, Clickable, Hoverable):
     font_size: int = 15
 
     def __init__(self, text: str, center_x: float = 0.0, center_y: float = 0.0):
+        self.parent: Optional[UIContainer] = None
+        self._z_value: float = 0.0
+        self._hover_is_active: bool = False
         self.text: str = text
         self.center_x = center_x
         self.center_y = center_y
-        self.scale: float = 1.0
+        self.scale = 1.0
 
     @Rectangle.width.getter  # type: ignore
     def width(self) -> float:
-        return len(self.text) * self.scale * self.font_size * 0.5
+        return font_metrics.text_width(self.text, FONT, self.font_size) * self.scale
 
     @Rectangle.height.getter  # type: ignore
     def height(self) -> float:
-        return self.scale * self.font_size * 1.25
+        return font_metrics.line_height(FONT, self.font_size) * self.scale
 
     def draw(self) -> None:
-        arcade.text.draw_text(
+        self.label_state().draw()
+
+    def snapshot(self, items: List[DrawState]) -> None:
+        items.append(self.label_state())
+
+    def label_state(self) -> LabelState:
+        return LabelState(
             text=self.text,
             start_x=self.center_x,
             start_y=self.center_y,
@@ -43,51 +56,95 @@ class Word(UIElement, Rectangle, Clickable, Hoverable):
         )
 
     def on_click(self) -> None:
-        pass
+        card_index.highlight(self.text)
 
     def on_hover(self) -> None:
-        pass
+        if isinstance(self.parent, WordCloud):
+            self.parent._word_on_hover(self)
 
     def on_hover_end(self) -> None:
-        pass
+        if isinstance(self.parent, WordCloud):
+            self.parent._word_on_hover_end(self)
 
 
 class WordCloud(UIContainer):
     """
     Arrange words in an interactive word cloud
 
+    Words don't overlap. Appended words are fitted in around the ones already in the cloud, the others
+    keep their place. Words added to an empty cloud, or within a batch_update() on one, are laid out all
+    at once. Passing a seed makes the layout reproducible.
+
     """
 
     highlight_scale: float = 2.0
+    hover_duration: float = 0.1
 
     def __init__(
-        self, center_x: float, center_y: float, width: float, height: float, words: List[Word] = None
+        self,
+        center_x: float,
+        center_y: float,
+        width: float,
+        height: float,
+        words: List[Word] = None,
+        seed: Optional[int] = None,
     ) -> None:
         self.center_x: float = center_x
         self.center_y: float = center_y
         self.width: float = width
         self.height: float = height
+        self.layout: SpiralLayout = SpiralLayout(center_x, center_y, width, height, seed=seed)
         self._words: List[Word] = list()
+        # Words that were added, but haven't been given a place by the layout yet
+        self._unplaced: List[Word] = list()
         if words is not None:
-            map(self.append, words)
-        self._arrange_words()
+            self.extend(words)
 
     @classmethod
     def _word_on_hover(cls, word: Word):
-        word.scale = cls.highlight_scale
+        animator.animate(word, "scale", cls.highlight_scale, cls.hover_duration)
+
+    @classmethod
+    def _word_on_hover_end(cls, word: Word):
+        animator.animate(word, "scale", 1.0, cls.hover_duration)
 
-    @staticmethod
-    def _word_on_hover_end(word: Word):
-        word.scale = 1.0
+    def _arrange(self) -> None:
+        if len(self.layout) == 0:
+            self._arrange_words()
+        else:
+            for word in self._unplaced:
+                word.move_to(*self.layout.place(word, word.width, word.height))
+        self._unplaced.clear()
 
     def _arrange_words(self) -> None:
-        for word in self._words:
-            word.center_x = self.center_x + (random.random() - 0.5) * self.width
-            word.center_y = self.center_y + (random.random() - 0.5) * self.height
+        centers = self.layout.arrange(self._words, [(word.width, word.height) for word in self._words])
+        for word, (center_x, center_y) in zip(self._words, centers.tolist()):
+            word.move_to(center_x, center_y)
 
     def append(self, word: Word) -> None:
-        word.on_hover = lambda: self._word_on_hover(word)
-        word.on_hover_end = lambda: self._word_on_hover_end(word)
-        self._words.append(word)
-        self.ui_elements.append(word)
-        self._arrange_words()
+        self.extend([word])
+
+    def extend(self, words: Iterable[Word]) -> None:
+        words = list(words)
+        self._words.extend(words)
+        self._unplaced.extend(words)
+        # Placing the words before they join ui_elements spares updating the container's GeometryStore for each move
+        self._layout_changed()
+        self.ui_elements.extend(words)
+
+    def remove(self, word: Word) -> None:
+        self.remove_all([word])
+
+    def remove_all(self, words: Iterable[Word]) -> None:
+        """Remove words, leaving the others where they are."""
+        removed = set(words)
+        self._words = [word for word in self._words if word not in removed]
+        self._unplaced = [word for word in self._unplaced if word not in removed]
+        for word in removed:
+            if word in self.layout:
+                self.layout.remove(word)
+            self.ui_elements.remove(word)
+
+    def clear(self) -> None:
+        self.remove_all(self._words)
+        self.layout.clear()